@@ -19,7 +19,34 @@ from .settings import (
     EPOCHS,
     DECREASING_LR,
     GAMMA,
-    GPU_ID
+    GPU_ID,
+    PREFIX_CACHE_DTYPE,
+    PREFIX_CACHE_MAX_MEMORY_BYTES,
+    PREFIX_CACHE_DIR,
+    EVAL_FOLD_BN,
+    EVAL_COMPILE,
+    EVAL_MODEL_CACHE_SIZE,
+    QUANT_BACKEND,
+    QUANT_CALIBRATION_SIZE,
+    QUANT_PROBE_SIZE,
+    QUANT_MAX_ACCURACY_DELTA,
+    MODEL_POOL_MAX_BYTES,
+    CHECKPOINT_FORMAT,
+    MODEL_STORE_DIR,
+    CHECKPOINT_DELTA,
+    CHECKPOINT_DELTA_TOLERANCE,
+    CHECKPOINT_DELTA_ZSTD_LEVEL,
+    RESULTS_GZIP_LEVEL,
+    EXPERIMENT_DB_PATH,
+    IMAGE_ATLAS_DIR,
+    IMAGE_ATLAS_COLUMNS,
+    IMAGE_BATCH_LIMIT,
+    STARTUP_WARMUP,
+    REFERENCE_CACHE_DIR,
+    PREWARM_ON_IDLE,
+    PREWARM_POLL_SECONDS,
+    PROFILE_SORT_BY,
+    PROFILE_ROW_LIMIT
 )
 
 __all__ = [
@@ -46,5 +73,54 @@ __all__ = [
     'GAMMA',
     
     # GPU Configuration
-    'GPU_ID'
+    'GPU_ID',
+
+    # Frozen-prefix activation caching
+    'PREFIX_CACHE_DTYPE',
+    'PREFIX_CACHE_MAX_MEMORY_BYTES',
+    'PREFIX_CACHE_DIR',
+
+    # Evaluation inference models
+    'EVAL_FOLD_BN',
+    'EVAL_COMPILE',
+    'EVAL_MODEL_CACHE_SIZE',
+
+    # INT8 evaluation
+    'QUANT_BACKEND',
+    'QUANT_CALIBRATION_SIZE',
+    'QUANT_PROBE_SIZE',
+    'QUANT_MAX_ACCURACY_DELTA',
+
+    # Checkpoint pool
+    'MODEL_POOL_MAX_BYTES',
+
+    # Checkpoint storage
+    'CHECKPOINT_FORMAT',
+    'MODEL_STORE_DIR',
+
+    # Delta checkpoints
+    'CHECKPOINT_DELTA',
+    'CHECKPOINT_DELTA_TOLERANCE',
+    'CHECKPOINT_DELTA_ZSTD_LEVEL',
+
+    # Results API
+    'RESULTS_GZIP_LEVEL',
+    'EXPERIMENT_DB_PATH',
+
+    # Image atlases
+    'IMAGE_ATLAS_DIR',
+    'IMAGE_ATLAS_COLUMNS',
+    'IMAGE_BATCH_LIMIT',
+
+    # Startup
+    'STARTUP_WARMUP',
+
+    # Reference artifacts
+    'REFERENCE_CACHE_DIR',
+    'PREWARM_ON_IDLE',
+    'PREWARM_POLL_SECONDS',
+
+    # Job profiling
+    'PROFILE_SORT_BY',
+    'PROFILE_ROW_LIMIT'
 ] 
\ No newline at end of file
@@ -18,4 +18,57 @@ DECREASING_LR = [80, 120]
 GAMMA = 0.2
 
 # GPU Configuration
-GPU_ID = 1
\ No newline at end of file
+GPU_ID = 1
+
+# Frozen-prefix activation caching
+PREFIX_CACHE_DTYPE = 'float16'
+PREFIX_CACHE_MAX_MEMORY_BYTES = 2 * 1024 ** 3
+PREFIX_CACHE_DIR = None
+
+# Evaluation inference models (BatchNorm folding, optional 'trace' or 'inductor' compilation)
+EVAL_FOLD_BN = True
+EVAL_COMPILE = None
+EVAL_MODEL_CACHE_SIZE = 2
+
+# INT8 evaluation (bulk re-scoring)
+QUANT_BACKEND = 'x86'
+QUANT_CALIBRATION_SIZE = 1000
+QUANT_PROBE_SIZE = 2000
+QUANT_MAX_ACCURACY_DELTA = 0.02
+
+# Process-wide pool of loaded checkpoints
+MODEL_POOL_MAX_BYTES = 1024 ** 3
+
+# Checkpoint storage format ('safetensors' or 'pth'); both are always readable
+CHECKPOINT_FORMAT = 'safetensors'
+
+# Content-addressed checkpoint store (blobs hardlinked into unlearned_models/, trained_models/, uploaded_models/)
+MODEL_STORE_DIR = 'model_store'
+
+# Delta checkpoints relative to the base weights ('lossless', 'fp16', 'sparse' or None for full state dicts)
+CHECKPOINT_DELTA = 'lossless'
+CHECKPOINT_DELTA_TOLERANCE = 1e-5
+CHECKPOINT_DELTA_ZSTD_LEVEL = 3
+
+# Cached /data/{forget_class}/all responses
+RESULTS_GZIP_LEVEL = 6
+
+# SQLite index of experiment results
+EXPERIMENT_DB_PATH = 'data/experiments.db'
+
+# CIFAR-10 image atlases (sprite sheets of the UMAP subset) and batched image requests
+IMAGE_ATLAS_DIR = 'data/atlas'
+IMAGE_ATLAS_COLUMNS = 20
+IMAGE_BATCH_LIMIT = 1024
+
+# Background warm-up after startup (hub download, CIFAR-10, subset images, service imports)
+STARTUP_WARMUP = True
+
+# Per-forget-class reference artifacts (retrain metrics, MIA classifier), prefetched while no job runs
+REFERENCE_CACHE_DIR = 'data/reference'
+PREWARM_ON_IDLE = True
+PREWARM_POLL_SECONDS = 5.0
+
+# On-demand torch.profiler capture of jobs requested with `profile` (operator summary tables)
+PROFILE_SORT_BY = 'self_cpu_time_total'
+PROFILE_ROW_LIMIT = 50
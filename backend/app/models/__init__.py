@@ -1,13 +1,37 @@
 """
 This module contains neural network model architectures and related data structures.
-It includes implementations of ResNet and status tracking classes for training and unlearning processes.
+It includes implementations of ResNet, LoRA adapters and status tracking classes for training and unlearning processes.
+
+The status classes are imported eagerly; the model code (torch, torchvision) is
+imported on first access.
 """
+import importlib
 
-from app.models.resnet import get_resnet18
 from app.models.status import TrainingStatus, UnlearningStatus
 
+_EXPORTS = {
+    'get_resnet18': 'resnet',
+    'set_execution_mode': 'resnet',
+    'fp32_execution': 'resnet',
+    'attach_lora_adapters': 'lora',
+    'has_lora_adapters': 'lora',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"app.models.{_EXPORTS[name]}"), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     'get_resnet18',
+    'set_execution_mode',
+    'fp32_execution',
+    'attach_lora_adapters',
+    'has_lora_adapters',
     'TrainingStatus',
     'UnlearningStatus'
-]
\ No newline at end of file
+]
@@ -0,0 +1,175 @@
+"""
+Low-rank adapters (LoRA) for the ResNet18 model.
+
+Adapters wrap the conv and linear layers of a model, keep the original weights
+frozen and learn a low-rank update W + (alpha / rank) * B @ A instead. Only the
+adapter matrices (and the BatchNorm statistics, which still change in train
+mode) need to be saved; the full weights are recovered by merging the update
+into the base checkpoint.
+"""
+import torch.nn as nn
+
+
+LORA_CHECKPOINT_FORMAT = "lora-adapter"
+
+
+class LoRAConv2d(nn.Module):
+    """Conv2d with a frozen base kernel and a trainable low-rank update."""
+
+    def __init__(self, base, rank, alpha):
+        super().__init__()
+        self.base = base
+        self.rank = rank
+        self.scaling = alpha / rank
+        # A reduces to `rank` channels with the base kernel geometry, B expands back with 1x1
+        self.lora_A = nn.Conv2d(
+            base.in_channels, rank, base.kernel_size,
+            stride=base.stride, padding=base.padding, dilation=base.dilation, bias=False
+        )
+        self.lora_B = nn.Conv2d(rank, base.out_channels, 1, bias=False)
+        nn.init.kaiming_uniform_(self.lora_A.weight, a=5 ** 0.5)
+        nn.init.zeros_(self.lora_B.weight)
+
+    def forward(self, x):
+        return self.base(x) + self.lora_B(self.lora_A(x)) * self.scaling
+
+    def delta_weight(self):
+        return lora_delta_weight(
+            self.lora_A.weight, self.lora_B.weight, self.base.weight.shape, self.scaling
+        )
+
+
+class LoRALinear(nn.Module):
+    """Linear layer with a frozen base weight and a trainable low-rank update."""
+
+    def __init__(self, base, rank, alpha):
+        super().__init__()
+        self.base = base
+        self.rank = rank
+        self.scaling = alpha / rank
+        self.lora_A = nn.Linear(base.in_features, rank, bias=False)
+        self.lora_B = nn.Linear(rank, base.out_features, bias=False)
+        nn.init.kaiming_uniform_(self.lora_A.weight, a=5 ** 0.5)
+        nn.init.zeros_(self.lora_B.weight)
+
+    def forward(self, x):
+        return self.base(x) + self.lora_B(self.lora_A(x)) * self.scaling
+
+    def delta_weight(self):
+        return lora_delta_weight(
+            self.lora_A.weight, self.lora_B.weight, self.base.weight.shape, self.scaling
+        )
+
+
+def lora_delta_weight(lora_A, lora_B, weight_shape, scaling):
+    """
+    Compute the dense weight update of an adapter.
+
+    Args:
+        lora_A: Down-projection weight ([r, in] or [r, in, kh, kw])
+        lora_B: Up-projection weight ([out, r] or [out, r, 1, 1])
+        weight_shape: Shape of the base weight
+        scaling: alpha / rank
+
+    Returns:
+        Tensor with the same shape as the base weight
+    """
+    rank = lora_A.shape[0]
+    delta = lora_B.reshape(lora_B.shape[0], rank) @ lora_A.reshape(rank, -1)
+    return (delta * scaling).reshape(weight_shape)
+
+
+def attach_lora_adapters(model, rank, alpha=None, base_weights_path=None):
+    """
+    Replace the conv and linear layers of a model with LoRA-wrapped versions.
+
+    All original parameters are frozen; only the adapter matrices are trainable.
+
+    Args:
+        model: Model to modify in place
+        rank: Adapter rank
+        alpha: Adapter scaling numerator (defaults to rank, i.e. scaling 1)
+        base_weights_path: Checkpoint the model was initialised from, recorded
+            so that adapter checkpoints can be merged back on load
+
+    Returns:
+        int: Number of trainable adapter parameters
+    """
+    alpha = alpha if alpha is not None else rank
+    for param in model.parameters():
+        param.requires_grad = False
+
+    targets = [
+        (name, module) for name, module in model.named_modules()
+        if isinstance(module, (nn.Conv2d, nn.Linear))
+    ]
+    for name, module in targets:
+        wrapper_cls = LoRAConv2d if isinstance(module, nn.Conv2d) else LoRALinear
+        wrapper = wrapper_cls(module, rank, alpha).to(module.weight.device)
+        parent_name, _, child_name = name.rpartition('.')
+        parent = model.get_submodule(parent_name) if parent_name else model
+        setattr(parent, child_name, wrapper)
+
+    model.lora_config = {
+        "rank": rank,
+        "alpha": alpha,
+        "base_weights": base_weights_path
+    }
+
+    num_adapter_params = sum(p.numel() for p in model.parameters() if p.requires_grad)
+    print(f"Attached rank-{rank} LoRA adapters to {len(targets)} layers "
+          f"({num_adapter_params:,} trainable parameters)")
+    return num_adapter_params
+
+
+def has_lora_adapters(model):
+    return getattr(model, "lora_config", None) is not None
+
+
+def lora_state_dict(model):
+    """
+    Collect the adapter weights and BatchNorm buffers of an adapted model.
+
+    Keys use the original (unwrapped) module names, e.g. 'layer1.0.conv1.lora_A'.
+    """
+    state = {}
+    for name, module in model.named_modules():
+        if isinstance(module, (LoRAConv2d, LoRALinear)):
+            state[f"{name}.lora_A"] = module.lora_A.weight.detach().cpu()
+            state[f"{name}.lora_B"] = module.lora_B.weight.detach().cpu()
+        elif isinstance(module, nn.modules.batchnorm._BatchNorm):
+            for buffer_name, buffer in module.named_buffers(recurse=False):
+                state[f"{name}.{buffer_name}"] = buffer.detach().cpu()
+    return state
+
+
+def merge_lora_state_dict(base_state_dict, adapter_state_dict, rank, alpha):
+    """
+    Merge saved adapters into a full base state dict.
+
+    Args:
+        base_state_dict: State dict of the base model
+        adapter_state_dict: Output of lora_state_dict
+        rank: Adapter rank
+        alpha: Adapter scaling numerator
+
+    Returns:
+        New state dict loadable by get_resnet18()
+    """
+    merged = {key: value.clone() for key, value in base_state_dict.items()}
+    scaling = alpha / rank
+
+    for key, value in adapter_state_dict.items():
+        if key.endswith(".lora_A"):
+            layer_name = key[:-len(".lora_A")]
+            weight_key = f"{layer_name}.weight"
+            lora_B = adapter_state_dict[f"{layer_name}.lora_B"].to(merged[weight_key].device)
+            delta = lora_delta_weight(
+                value.to(merged[weight_key].device), lora_B, merged[weight_key].shape, scaling
+            )
+            merged[weight_key] += delta.to(merged[weight_key].dtype)
+        elif not key.endswith(".lora_B"):
+            # BatchNorm statistics are stored as-is
+            merged[key] = value.to(merged[key].device)
+
+    return merged
@@ -1,9 +1,73 @@
+from contextlib import contextmanager
+
+import torch
 import torch.nn as nn
 from torchvision import models
+from torchvision.models.resnet import BasicBlock
+
+PRECISIONS = ("fp32", "bf16")
+
+
+class CIFARResNet18(models.ResNet):
+    """
+    ResNet18 for 32x32 inputs with a configurable execution mode.
+
+    `precision="bf16"` runs the forward pass under bfloat16 autocast and
+    `channels_last=True` feeds the convolutions NHWC tensors. Logits are
+    always returned in float32, so losses and metrics are unaffected by the
+    execution mode. The state dict is identical to torchvision's resnet18.
+    """
+
+    def __init__(self, num_classes=10):
+        super().__init__(BasicBlock, [2, 2, 2, 2])
+        self.conv1 = nn.Conv2d(3, 64, kernel_size=3, stride=1, padding=1, bias=False)
+        self.maxpool = nn.Identity()
+        self.fc = nn.Linear(self.fc.in_features, num_classes)
+        self.precision = "fp32"
+        self.channels_last = False
+
+    def forward(self, x):
+        if self.channels_last:
+            x = x.contiguous(memory_format=torch.channels_last)
+        if self.precision == "bf16":
+            with torch.autocast(device_type=x.device.type, dtype=torch.bfloat16):
+                return super().forward(x).float()
+        return super().forward(x)
+
+
+def set_execution_mode(model, precision="fp32", channels_last=False):
+    """
+    Set the precision and memory format of a model created by get_resnet18.
+
+    Args:
+        model: CIFARResNet18 model
+        precision: 'fp32' or 'bf16' (bfloat16 autocast)
+        channels_last: Whether to use the channels_last memory format
+
+    Returns:
+        The model (modified in place)
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}' (expected one of {PRECISIONS})")
+    model.precision = precision
+    model.channels_last = channels_last
+    model.to(memory_format=torch.channels_last if channels_last else torch.contiguous_format)
+    return model
+
+
+@contextmanager
+def fp32_execution(model):
+    """Temporarily run a model in fp32 (e.g. for reference metrics or CKA features)."""
+    previous = getattr(model, "precision", "fp32")
+    if hasattr(model, "precision"):
+        model.precision = "fp32"
+    try:
+        yield model
+    finally:
+        if hasattr(model, "precision"):
+            model.precision = previous
+
 
-def get_resnet18(num_classes=10):
-    model = models.resnet18(weights=None)
-    model.conv1 = nn.Conv2d(3, 64, kernel_size=3, stride=1, padding=1, bias=False)
-    model.maxpool = nn.Identity()
-    model.fc = nn.Linear(model.fc.in_features, num_classes)
-    return model
\ No newline at end of file
+def get_resnet18(num_classes=10, precision="fp32", channels_last=False):
+    model = CIFARResNet18(num_classes=num_classes)
+    return set_execution_mode(model, precision=precision, channels_last=channels_last)
@@ -5,6 +5,7 @@ Available routers:
 - train_router: Handles model training related endpoints
 - unlearn_router: Manages model unlearning operations
 - data_router: Manages data operations and preprocessing
+- metrics_router: Exposes job stage timings for Prometheus
 
 These routers are used to organize and structure the API endpoints
 for different functionalities of the application.
@@ -12,6 +13,7 @@ for different functionalities of the application.
 
 from .train import router as train_router
 from .unlearn import router as unlearn_router
-from .data import router as data_router	
+from .data import router as data_router
+from .metrics import router as metrics_router
 
-__all__ = ['train_router', 'unlearn_router', 'data_router']
\ No newline at end of file
+__all__ = ['train_router', 'unlearn_router', 'data_router', 'metrics_router']
\ No newline at end of file
@@ -1,88 +1,249 @@
 # Python standard libraries
-import base64
-import io
-import json
 import os
-from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, Response
-from PIL import Image
-import numpy as np
 
-from app.utils import load_cifar10_data
-from app.utils.data_loader import get_fixed_umap_indices
+from app.config import IMAGE_ATLAS_COLUMNS, IMAGE_BATCH_LIMIT
+from app.utils.checkpoint_io import (
+    CHECKPOINT_FORMATS,
+    MEDIA_TYPES,
+    checkpoint_format,
+    checkpoint_stem,
+    list_checkpoint_files,
+    read_checkpoint,
+    remove_checkpoint,
+    resolve_checkpoint_path,
+    serialize_checkpoint
+)
+from app.utils.experiment_index import dependent_experiments, query_experiments, remove_experiment
+from app.utils.image_atlas import (
+    IMMUTABLE_CACHE_CONTROL,
+    TILE_SIZE,
+    encode_batch,
+    encode_png,
+    get_atlas
+)
+from app.utils.point_columns import (
+    ALL_COLUMNS,
+    POINT_COLUMNS,
+    PROB_COLUMNS,
+    encode_point_columns,
+    points_sidecar_path,
+    read_result_columns
+)
+from app.utils.profiling import profile_paths, remove_profile
+from app.utils.results_cache import (
+    cache_headers,
+    get_all_results,
+    is_not_modified,
+    query_results,
+    read_result_bytes
+)
+from app.utils.subset_images import get_subset_images
 
 router = APIRouter()
-x_train, y_train = load_cifar10_data()
+
+
+def _cifar10_train():
+    # Loaded on first use (or by the startup warm-up), not when the router is imported
+    from app.utils.data_loader import get_cifar10_train
+    return get_cifar10_train()
+
+
+@lru_cache(maxsize=4096)
+def _image_png(index):
+    x_train, _ = _cifar10_train()
+    return encode_png(x_train[index])
+
 
 @router.get("/data/{forget_class}/all")
-async def get_all_json_files(forget_class: str):
-    data_dir = os.path.join('data', forget_class)
-    if not os.path.exists(data_dir):
+async def get_all_json_files(
+    forget_class: str,
+    request: Request,
+    fields: Optional[str] = None,
+    sort: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """
+    All results of a forget class, keyed by ID.
+
+    `fields` (comma-separated, or "summary" for every scalar field), `sort`
+    (a field name, "-" prefix for descending), `offset` and `limit` select a
+    projected page of the results, served from the summary index; the total
+    number of results is returned in the X-Total-Count header.
+    """
+    is_query = fields is not None or sort is not None or offset > 0 or limit is not None
+    try:
+        if is_query:
+            field_names = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+            cached = await run_in_threadpool(
+                query_results, forget_class, field_names, sort, offset, limit
+            )
+        else:
+            cached = await run_in_threadpool(get_all_results, forget_class)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Directory for {forget_class} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
     
-    json_files = [f for f in os.listdir(data_dir) if f.endswith('.json')]
-    if not json_files:
+    if cached is None:
         raise HTTPException(status_code=404, detail=f"No JSON files found in {forget_class}")
     
-    def sort_key(filename):
-        if filename.startswith(f'000{forget_class}'):
-            return (0, filename)
-        elif filename.startswith(f'a00{forget_class}'):
-            return (1, filename)
-        else:
-            return (2, filename)
-    
-    json_files.sort(key=sort_key)
+    # Unchanged results are revalidated with a 304 instead of being sent again
+    headers = cache_headers(cached)
+    if is_query:
+        headers["X-Total-Count"] = str(cached["total"])
+        headers["Access-Control-Expose-Headers"] = "X-Total-Count"
+    if is_not_modified(request.headers, cached):
+        return Response(status_code=304, headers=headers)
     
-    all_data = OrderedDict()
-    for filename in json_files:
-        file_path = os.path.join(data_dir, filename)
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                key = filename[:-5]
-                all_data[key] = json.load(f)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error reading file {filename}: {str(e)}")
-    
-    return all_data
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=cached["gzip"], media_type="application/json", headers=headers)
+    return Response(content=cached["body"], media_type="application/json", headers=headers)
+
+@router.get("/experiments")
+async def list_experiments(
+    forget_class: Optional[str] = None,
+    filter: List[str] = Query([]),
+    sort: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """
+    Query the experiment index.
+
+    `filter` may be repeated ('UA<=0.1', 'Method=GA', any scalar result field)
+    and `sort` is a field name with a "-" prefix for descending order.
+    """
+    try:
+        total, experiments = await run_in_threadpool(
+            query_experiments, forget_class, filter, sort, offset, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"total": total, "experiments": experiments}
 
 @router.get("/data/{forget_class}/all_weights_name")
-async def get_all_weights_name(forget_class: str):
+def get_all_weights_name(forget_class: str):
     """
     Retrieve all existing weight file names for the provided forget_class.
-    It looks in the 'unlearned_models/{forget_class}' directory for .pth files.
+    It looks in the 'unlearned_models/{forget_class}' directory for checkpoint
+    files (.safetensors or .pth), one name per checkpoint.
     """
+    # Declared as a plain function so FastAPI lists the directory in its threadpool
     model_dir = os.path.join('unlearned_models', forget_class)
     
     if not os.path.exists(model_dir):
         raise HTTPException(status_code=404, detail=f"Directory for {forget_class} not found")
     
-    # List all .pth files
-    weight_files = [f for f in os.listdir(model_dir) if f.endswith('.pth')]
+    # Checkpoint files, sorted alphabetically
+    weight_files = list_checkpoint_files(model_dir)
     
     if not weight_files:
         raise HTTPException(status_code=404, detail=f"No weight files found in {forget_class}")
     
-    # Sort the file names alphabetically
-    weight_files.sort()
-    
     return weight_files
 
 
+def _checkpoint_response(file_path, fmt):
+    """Serve a checkpoint as a plain ResNet18 state dict in the requested format."""
+    from app.utils.helpers import load_model_state_dict, needs_base_weights
+
+    filename = os.path.basename(checkpoint_stem(file_path)) + CHECKPOINT_FORMATS[fmt]
+    
+    if checkpoint_format(file_path) == fmt and not needs_base_weights(read_checkpoint(file_path, map_location='cpu')):
+        return FileResponse(file_path, media_type=MEDIA_TYPES[fmt], filename=filename)
+    
+    # Adapter and delta checkpoints are merged and other formats converted on the fly
+    return Response(
+        content=serialize_checkpoint(load_model_state_dict(file_path, map_location='cpu'), fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/data/{forget_class}/{filename}/weights")
-async def get_model_file(forget_class: str, filename: str):
-    if not filename.endswith('.pth'):
-        filename = f"{filename}.pth"
+async def get_model_file(
+    forget_class: str,
+    filename: str,
+    request: Request,
+    format: Optional[Literal["pth", "safetensors"]] = None
+):
+    """
+    Download a checkpoint. The format is taken from the `format` query parameter,
+    else from the Accept header (application/vnd.safetensors), and defaults to .pth.
+    """
+    file_path = resolve_checkpoint_path(os.path.join('unlearned_models', forget_class, filename))
+    if file_path is None:
+        raise HTTPException(status_code=404, detail=f"Model file {filename} not found")
     
-    model_dir = os.path.join('unlearned_models', forget_class)
-    file_path = os.path.join(model_dir, filename)
+    if format is None:
+        format = "safetensors" if "safetensors" in request.headers.get("accept", "") else "pth"
     
+    # Reading, merging and converting checkpoints runs off the event loop
+    return await run_in_threadpool(_checkpoint_response, file_path, format)
+
+@router.get("/data/{forget_class}/{filename}/points")
+async def get_points(
+    forget_class: str,
+    filename: str,
+    columns: Optional[str] = None,
+    format: Literal["json", "npz"] = "json"
+):
+    """
+    Detailed per-sample results of an experiment as columns.
+
+    `columns` is a comma-separated subset of gt, pred, img, forget, x, y and
+    prob (the CSR probability block prob_indptr/prob_classes/prob_values);
+    all columns are returned by default. The response is a JSON object of
+    arrays, or an NPZ archive with format=npz.
+    """
+    names = []
+    for column in (columns.split(",") if columns else POINT_COLUMNS + ("prob",)):
+        column = column.strip()
+        if column == "prob":
+            names.extend(PROB_COLUMNS)
+        elif column in ALL_COLUMNS:
+            names.append(column)
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown column '{column}'")
+    
+    result_id = filename[:-5] if filename.endswith('.json') else filename
+    result_path = os.path.join('data', forget_class, f"{result_id}.json")
+    try:
+        point_columns = await run_in_threadpool(read_result_columns, result_path, names)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"File {result_id}.json not found")
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    
+    media_type = "application/octet-stream" if format == "npz" else "application/json"
+    content = await run_in_threadpool(encode_point_columns, point_columns, format)
+    return Response(content=content, media_type=media_type)
+
+@router.get("/data/{forget_class}/{filename}/profile")
+async def get_profile(
+    forget_class: str,
+    filename: str,
+    part: Literal["operators", "train", "evaluation"] = "operators"
+):
+    """
+    Download the torch.profiler capture of a job run with `profile`: the
+    operator summary table (default) or the gzipped Chrome trace of the
+    `train` or `evaluation` phase.
+    """
+    result_id = filename[:-5] if filename.endswith('.json') else filename
+    file_path = profile_paths(forget_class, result_id)[part]
     if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail=f"Model file {filename} not found")
+        raise HTTPException(status_code=404, detail=f"No {part} profile of {result_id}")
     
-    return FileResponse(file_path, media_type='application/octet-stream', filename=filename)
+    media_type = "text/plain" if part == "operators" else "application/gzip"
+    return FileResponse(file_path, media_type=media_type, filename=os.path.basename(file_path))
 
 @router.get("/data/{forget_class}/{filename}")
 async def get_json_file(forget_class: str, filename: str):
@@ -96,15 +257,25 @@ async def get_json_file(forget_class: str, filename: str):
         raise HTTPException(status_code=404, detail=f"File {filename} not found")
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
+        content = await run_in_threadpool(read_result_bytes, file_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading file: {str(e)}")
+    return Response(content=content, media_type="application/json")
 
 @router.delete("/data/{forget_class}/{filename}")
-async def delete_files(forget_class: str, filename: str):
+def delete_files(forget_class: str, filename: str):
+    # Declared as a plain function so FastAPI deletes the files in its threadpool
     response_messages = []
+    checkpoint_path = os.path.join('unlearned_models', forget_class, filename)
+    
+    # Adapter and delta checkpoints of other experiments cannot be loaded without this one
+    dependents = dependent_experiments(checkpoint_path)
+    if dependents:
+        dependent_ids = ", ".join(f"{fc}/{experiment_id}" for fc, experiment_id in dependents)
+        raise HTTPException(
+            status_code=409,
+            detail=f"Checkpoint {filename} is the base weights of {dependent_ids}; delete those first"
+        )
     
     # JSON delete
     json_filename = f"{filename}.json" if not filename.endswith('.json') else filename
@@ -116,62 +287,133 @@ async def delete_files(forget_class: str, filename: str):
         except Exception as e:
             response_messages.append(f"Error deleting JSON file: {str(e)}")
     
-    # PTH delete
-    pth_filename = f"{filename}.pth" if not filename.endswith('.pth') else filename
-    pth_path = os.path.join('unlearned_models', forget_class, pth_filename)
-    if os.path.exists(pth_path):
-        try:
-            os.remove(pth_path)
-            response_messages.append(f"Model file {pth_filename} successfully deleted")
-        except Exception as e:
-            response_messages.append(f"Error deleting model file: {str(e)}")
+    # Detailed points sidecar delete
+    points_path = points_sidecar_path(json_path)
+    if os.path.exists(points_path):
+        os.remove(points_path)
+    
+    # Profile capture delete
+    for profile_filename in remove_profile(forget_class, json_filename[:-5]):
+        response_messages.append(f"Profile file {profile_filename} successfully deleted")
+    
+    # Experiment index row delete
+    remove_experiment(forget_class, json_filename[:-5])
+    
+    # Checkpoint delete (every stored format)
+    try:
+        removed = remove_checkpoint(checkpoint_path)
+        for model_filename in removed:
+            response_messages.append(f"Model file {model_filename} successfully deleted")
+    except Exception as e:
+        response_messages.append(f"Error deleting model file: {str(e)}")
     
     if not response_messages:
         raise HTTPException(status_code=404, detail="No files found to delete")
     
     return {"messages": response_messages}
 
+@router.get("/image/cifar10/atlas")
+async def get_image_atlas_map(request: Request):
+    """
+    Index map of the UMAP subset atlas: the `offsets` of every image as
+    [class, x, y] in the sheet of its class, served by
+    /image/cifar10/atlas/{class_id}?v={version}.
+    """
+    x_train, y_train = await run_in_threadpool(_cifar10_train)
+    atlas = await run_in_threadpool(get_atlas, x_train, y_train)
+    headers = {"ETag": f'"{atlas["version"]}"', "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=atlas["map_body"], media_type="application/json", headers=headers)
+
+@router.get("/image/cifar10/atlas/{class_id}")
+async def get_image_atlas_sheet(class_id: int, v: Optional[str] = None):
+    """PNG sprite sheet of the UMAP subset images of one class."""
+    x_train, y_train = await run_in_threadpool(_cifar10_train)
+    atlas = await run_in_threadpool(get_atlas, x_train, y_train)
+    sheet = atlas["sheets"].get(str(class_id))
+    if sheet is None:
+        raise HTTPException(status_code=404, detail="No atlas for this class")
+
+    # Only versioned URLs are immutable; the layout changes with UMAP_DATA_SIZE or the seed
+    cache_control = IMMUTABLE_CACHE_CONTROL if v == atlas["version"] else "no-cache"
+    return Response(
+        content=sheet,
+        media_type="image/png",
+        headers={"ETag": f'"{atlas["version"]}-{class_id}"', "Cache-Control": cache_control}
+    )
+
+@router.get("/image/cifar10/batch")
+async def get_image_batch(
+    indices: str,
+    format: Literal["json", "png"] = "json",
+    columns: int = Query(IMAGE_ATLAS_COLUMNS, ge=1)
+):
+    """
+    Many CIFAR-10 training images in one response.
+
+    `indices` is a comma-separated list of dataset indices. The "json" format
+    returns {"images": [{"index", "base64"}]}; the "png" format returns one
+    sprite sheet with the images in request order, `columns` 32x32 tiles per row.
+    """
+    try:
+        index_list = [int(index) for index in indices.split(",") if index.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="indices must be a comma-separated list of integers")
+    if not index_list:
+        raise HTTPException(status_code=400, detail="No indices given")
+    if len(index_list) > IMAGE_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {IMAGE_BATCH_LIMIT} images per request")
+    x_train, _ = await run_in_threadpool(_cifar10_train)
+    if min(index_list) < 0 or max(index_list) >= len(x_train):
+        raise HTTPException(status_code=404, detail="Image index out of range")
+
+    body = await run_in_threadpool(encode_batch, x_train, index_list, format, columns)
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if format == "png":
+        headers["X-Atlas-Columns"] = str(min(columns, len(index_list)))
+        headers["X-Atlas-Tile-Size"] = str(TILE_SIZE)
+    return Response(
+        content=body,
+        media_type="image/png" if format == "png" else "application/json",
+        headers=headers
+    )
+
 @router.get("/image/cifar10/{index}")
 async def get_image(index: int):
+    x_train, _ = await run_in_threadpool(_cifar10_train)
     if index < 0 or index >= len(x_train):
         raise HTTPException(status_code=404, detail="Image index out of range")
 
-    img_data = x_train[index]
-    
-    img = Image.fromarray(img_data)
-    
-    img_byte_arr = io.BytesIO()
-    img.save(img_byte_arr, format='PNG')
-    img_byte_arr = img_byte_arr.getvalue()
-
-    return Response(content=img_byte_arr, media_type="image/png")
+    return Response(
+        content=await run_in_threadpool(_image_png, index),
+        media_type="image/png",
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    )
 
 @router.get("/trained_models")
 async def get_trained_model():
     """Download the trained model file (0000.pth)"""
-    model_dir = 'unlearned_models/0'
-    file_path = os.path.join(model_dir, '0000.pth')
+    file_path = resolve_checkpoint_path(os.path.join('unlearned_models', '0', '0000'))
     
-    if not os.path.exists(file_path):
+    if file_path is None:
         raise HTTPException(status_code=404, detail="Trained model file not found")
     
-    return FileResponse(
-        path=file_path,
-        media_type='application/octet-stream',
-        filename='0000.pth'
-    )
+    return await run_in_threadpool(_checkpoint_response, file_path, "pth")
 
 
 @router.get("/image/all_subset/{forget_class}")
-async def get_all_subset_images(forget_class: str):
+async def get_all_subset_images(forget_class: str, request: Request):
     """
     Retrieve 200 CIFAR-10 images for the given forget_class as a single API call.
     
-    The original images (32x32x3) are resized to 12x12 pixels using bilinear interpolation,
+    The original images (32x32x3) are resized to 30x30 pixels using bilinear interpolation,
     compressed in PNG format, and then base64-encoded. The selected indices are determined
     using get_fixed_umap_indices(total_samples=2000, seed=2048) (i.e., 200 images per class).
     
-    The result is cached on disk as a JSON file at: data/subset/{forget_class}_all_base64.json.
+    The responses of all ten classes are built in parallel (in the background at startup,
+    or on the first request) and served from memory; they are also cached on disk at
+    data/subset/{forget_class}/{forget_class}_base64.json.
     
     The returned JSON format is:
     {
@@ -190,55 +432,19 @@ async def get_all_subset_images(forget_class: str):
 
     if class_id < 0 or class_id >= 10:
         raise HTTPException(status_code=400, detail="forget_class must be between 0 and 9")
-    
-    # Set up the cache file path in the data/subset directory
-    cache_dir = os.path.join("data", "subset", str(class_id))
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_file = os.path.join(cache_dir, f"{class_id}_base64.json")
 
-    # If cached file exists, load and return it
-    if os.path.exists(cache_file):
-        try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cached_data = json.load(f)
-            return cached_data
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error reading cached file: {str(e)}")
-
-    # Global variables x_train and y_train are assumed to be loaded via load_cifar10_data() at startup
-    global x_train, y_train
-
-    # Get indices using a fixed seed (2048) such that each class gets 200 images for a total of 2000 samples
-    indices_dict = get_fixed_umap_indices(total_samples=2000, seed=2048)
-    if class_id not in indices_dict:
-        raise HTTPException(status_code=404, detail="Indices not found for this class.")
-
-    selected_indices = indices_dict[class_id]
-
-    images_data = []
-    for idx in selected_indices:
-        orig_img = x_train[idx]  # Original image as a numpy array (32x32x3)
-        img = Image.fromarray(orig_img)
-        # Resize image to 12x12 using bilinear interpolation
-        img_resized = img.resize((30, 30), Image.BILINEAR)
-        buffer = io.BytesIO()
-        # Save the resized image as PNG
-        img_resized.save(buffer, format="PNG")
-        base64_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
-        images_data.append({
-            "index": int(idx),
-            "base64": base64_str
-        })
-
-    response_data = {"images": images_data}
-
-    # Cache the result on disk for future requests
     try:
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(response_data, f)
+        x_train, y_train = await run_in_threadpool(_cifar10_train)
+        cached = await run_in_threadpool(get_subset_images, x_train, y_train, class_id)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error saving cached file: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error building subset images: {str(e)}")
 
-    return response_data
+    headers = {"ETag": cached["etag"], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == cached["etag"]:
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=cached["gzip"], media_type="application/json", headers=headers)
+    return Response(content=cached["body"], media_type="application/json", headers=headers)
 
 
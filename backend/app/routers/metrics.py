@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.utils.instrumentation import PROMETHEUS_CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics():
+    """Stage timings of all jobs since startup, in the Prometheus text format."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
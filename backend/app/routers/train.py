@@ -1,7 +1,9 @@
 from fastapi import APIRouter, BackgroundTasks, HTTPException
+from typing import Literal
 from pydantic import BaseModel, Field
-from app.services import run_training
+from app import services
 from app.models import TrainingStatus
+from app.utils.prewarm import register_busy_check
 from app.config import (
 	BATCH_SIZE, 
 	LEARNING_RATE, 
@@ -10,19 +12,26 @@ from app.config import (
 
 router = APIRouter()
 status = TrainingStatus()
+register_busy_check(lambda: status.is_training)
 
 class TrainingRequest(BaseModel):
     # seed: int = Field(default=1111, description="Random seed for reproducibility")
     batch_size: int = Field(default=BATCH_SIZE, description="Batch size for training")
     learning_rate: float = Field(default=LEARNING_RATE, description="Learning rate for optimizer")
     epochs: int = Field(default=EPOCHS, description="Number of training epochs")
+    num_processes: int = Field(default=1, ge=1, description="Number of CPU processes for data-parallel (gloo) training, 1 disables")
+    precision: Literal["fp32", "bf16"] = Field(default="fp32", description="Execution precision: fp32 or bfloat16 autocast")
+    channels_last: bool = Field(default=False, description="Run convolutions in channels_last memory format")
+    profile: bool = Field(default=False, description="Capture torch.profiler traces of a window of training epochs and the evaluation after it")
+    profile_start_epoch: int = Field(default=0, ge=0, description="Training epochs to run before the profiled window")
+    profile_epochs: int = Field(default=1, ge=1, description="Number of training epochs in the profiled window")
 
 @router.post("/train")
 async def start_training(request: TrainingRequest, background_tasks: BackgroundTasks):
     if status.is_training:
         raise HTTPException(status_code=400, detail="Training is already in progress")
     status.reset()  # Reset status before starting new training
-    background_tasks.add_task(run_training, request, status)
+    background_tasks.add_task(services.run_training, request, status)
     return {"message": "Training started"}
 
 @router.get("/train/status")
@@ -1,30 +1,26 @@
 import os
+from typing import List, Literal, Optional
 from fastapi import (
     APIRouter, 
     BackgroundTasks, 
     HTTPException, 
     UploadFile, 
     File, 
-    Form
+    Form,
+    Query
 )
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from app.services import (
-	run_unlearning_retrain,
-	run_unlearning_RL,
-	run_unlearning_GA,
-	run_unlearning_FT,
-	run_unlearning_GA_FT,
-	run_unlearning_GA_SL_FT,
-	run_unlearning_GA_SL_FT_V2,
-	run_unlearning_SCRUB,
-	run_unlearning_SalUn,
-	run_unlearning_custom
-)
+from app.utils.checkpoint_io import resolve_checkpoint_path
+from app.utils.model_store import store_fileobj
+from app.utils.prewarm import prewarm, prewarm_status, register_busy_check
+from app import services
 from app.models import UnlearningStatus
 
 
 router = APIRouter()
 status = UnlearningStatus()
+register_busy_check(lambda: status.is_unlearning)
 
 class UnlearningRequest(BaseModel):
     # seed: int = UNLEARN_SEED
@@ -61,6 +57,103 @@ class UnlearningRequest(BaseModel):
         ge=0, 
         description="Number of last layers to reinitialize (0-9)"
     )
+    adapter_rank: int = Field(
+        default=0, 
+        ge=0, 
+        description="Rank of LoRA adapters to train instead of all weights (0 disables, FT/GA/RL/SCRUB only)"
+    )
+    num_processes: int = Field(
+        default=1, 
+        ge=1, 
+        description="Number of CPU processes for data-parallel (gloo) retraining, 1 disables (retrain only)"
+    )
+    precision: Literal["fp32", "bf16"] = Field(
+        default="fp32", 
+        description="Execution precision: fp32 or bfloat16 autocast"
+    )
+    channels_last: bool = Field(
+        default=False, 
+        description="Run convolutions in channels_last memory format"
+    )
+    profile: bool = Field(
+        default=False, 
+        description="Capture torch.profiler traces of a window of training epochs and the final evaluation"
+    )
+    profile_start_epoch: int = Field(
+        default=0, 
+        ge=0, 
+        description="Training epochs to run before the profiled window"
+    )
+    profile_epochs: int = Field(
+        default=1, 
+        ge=1, 
+        description="Number of training epochs in the profiled window"
+    )
+
+class HeadOnlyUnlearningRequest(UnlearningRequest):
+    head_method: Literal["FT", "GA", "RL", "SalUn"] = Field(
+        default="FT", 
+        description="Loss used to train the fc layer on cached penultimate features"
+    )
+    head_batch_size: Optional[int] = Field(
+        default=None, 
+        ge=1, 
+        description="Mini-batch size over cached features, None for full-batch steps"
+    )
+
+class HeadSweepRequest(BaseModel):
+    forget_class: int = Field(
+        default=4, 
+        ge=0, 
+        lt=10, 
+        description="Class to forget (0-9)"
+    )
+    base_weights: str = Field(
+        default="0000.pth", 
+        description="Filename of the weights in unlearned_models folder"
+    )
+    batch_size: int = Field(
+        default=256, 
+        description="Batch size for feature extraction"
+    )
+    head_method: Literal["FT", "GA", "RL", "SalUn"] = Field(
+        default="FT", 
+        description="Loss used to train the fc layer on cached penultimate features"
+    )
+    learning_rates: List[float] = Field(
+        default=[0.001, 0.01, 0.1], 
+        min_length=1, 
+        description="Learning rates to sweep"
+    )
+    epochs: List[int] = Field(
+        default=[5, 10, 20], 
+        min_length=1, 
+        description="Epoch counts to sweep"
+    )
+    head_batch_size: Optional[int] = Field(
+        default=None, 
+        ge=1, 
+        description="Mini-batch size over cached features, None for full-batch steps"
+    )
+    saliency_threshold: float = Field(
+        default=0.5, 
+        gt=0, 
+        le=1, 
+        description="Fraction of fc parameters updated by SalUn"
+    )
+
+def _reject_unsupported_options(request, method, adapters=False, processes=False):
+    # Fields shared by every UnlearningRequest that only some methods implement
+    if request.adapter_rank > 0 and not adapters:
+        raise HTTPException(
+            status_code=422, 
+            detail=f"adapter_rank is not supported by {method} (FT, GA, RL and SCRUB only)"
+        )
+    if request.num_processes > 1 and not processes:
+        raise HTTPException(
+            status_code=422, 
+            detail=f"num_processes is not supported by {method} (retrain only)"
+        )
 
 @router.post("/unlearn/ga")
 async def start_unlearning_ga(
@@ -72,16 +165,17 @@ async def start_unlearning_ga(
             status_code=400, 
             detail="Unlearning is already in progress"
         )
+    _reject_unsupported_options(request, "GA", adapters=True)
     status.reset()
     base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
-    base_weights_path = f'unlearned_models/{request.forget_class}/{base_weights_name}'
-    if not os.path.exists(base_weights_path):
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
         raise HTTPException(
             status_code=404, 
-            detail=f"Weights '{base_weights_path}' not found in unlearned_models/ folder"
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
         )
 
-    background_tasks.add_task(run_unlearning_GA, request, status, base_weights_path)
+    background_tasks.add_task(services.run_unlearning_GA, request, status, base_weights_path)
     return {"message": "GA Unlearning started"}
 
 @router.post("/unlearn/rl")
@@ -94,16 +188,17 @@ async def start_unlearning_rl(
             status_code=400, 
             detail="Unlearning is already in progress"
         )
+    _reject_unsupported_options(request, "RL", adapters=True)
     status.reset()
     base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
-    base_weights_path = f'unlearned_models/{request.forget_class}/{base_weights_name}'
-    if not os.path.exists(base_weights_path):  
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
         raise HTTPException(
             status_code=404, 
-            detail=f"Weights '{base_weights_path}' not found in unlearned_models/ folder"
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
         )
 
-    background_tasks.add_task(run_unlearning_RL, request, status, base_weights_path)
+    background_tasks.add_task(services.run_unlearning_RL, request, status, base_weights_path)
     return {"message": "RL Unlearning started"}
 
 @router.post("/unlearn/ft")
@@ -116,16 +211,17 @@ async def start_unlearning_ft(
             status_code=400, 
             detail="Unlearning is already in progress"
         )
+    _reject_unsupported_options(request, "FT", adapters=True)
     status.reset()
     base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
-    base_weights_path = f'unlearned_models/{request.forget_class}/{base_weights_name}'
-    if not os.path.exists(base_weights_path):
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
         raise HTTPException(
             status_code=404, 
-            detail=f"Weights '{base_weights_path}' not found in unlearned_models/ folder"
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
         )
     print(f"start unlearning ft with base_weights_path: {base_weights_path}")
-    background_tasks.add_task(run_unlearning_FT, request, status, base_weights_path)
+    background_tasks.add_task(services.run_unlearning_FT, request, status, base_weights_path)
     return {"message": "FT Unlearning started"}
 
 @router.post("/unlearn/ga_ft")
@@ -138,16 +234,17 @@ async def start_unlearning_ga_ft(
             status_code=400, 
             detail="Unlearning is already in progress"
         )
+    _reject_unsupported_options(request, "GA+FT")
     status.reset()
     base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
-    base_weights_path = f'unlearned_models/{request.forget_class}/{base_weights_name}'
-    if not os.path.exists(base_weights_path):
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
         raise HTTPException(
             status_code=404, 
-            detail=f"Weights '{base_weights_path}' not found in unlearned_models/ folder"
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
         )
     print(f"start unlearning GA+FT with base_weights_path: {base_weights_path}")
-    background_tasks.add_task(run_unlearning_GA_FT, request, status, base_weights_path)
+    background_tasks.add_task(services.run_unlearning_GA_FT, request, status, base_weights_path)
     return {"message": "GA+FT Unlearning started"}
 
 @router.post("/unlearn/ga_sl_ft")
@@ -160,16 +257,17 @@ async def start_unlearning_ga_sl_ft(
             status_code=400, 
             detail="Unlearning is already in progress"
         )
+    _reject_unsupported_options(request, "GA+SL+FT")
     status.reset()
     base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
-    base_weights_path = f'unlearned_models/{request.forget_class}/{base_weights_name}'
-    if not os.path.exists(base_weights_path):
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
         raise HTTPException(
             status_code=404, 
-            detail=f"Weights '{base_weights_path}' not found in unlearned_models/ folder"
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
         )
     print(f"start unlearning GA+SL+FT with base_weights_path: {base_weights_path}")
-    background_tasks.add_task(run_unlearning_GA_SL_FT, request, status, base_weights_path)
+    background_tasks.add_task(services.run_unlearning_GA_SL_FT, request, status, base_weights_path)
     return {"message": "GA+SL+FT Unlearning started"}
 
 @router.post("/unlearn/ga_sl_ft_v2")
@@ -182,17 +280,18 @@ async def start_unlearning_ga_sl_ft_v2(
             status_code=400, 
             detail="Unlearning is already in progress"
         )
+    _reject_unsupported_options(request, "GA+SL+FT V2")
     status.reset()
     base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
-    base_weights_path = f'unlearned_models/{request.forget_class}/{base_weights_name}'
-    if not os.path.exists(base_weights_path):
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
         raise HTTPException(
             status_code=404, 
-            detail=f"Weights '{base_weights_path}' not found in unlearned_models/ folder"
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
         )
     print(f"start unlearning GA+SL+FT V2 with base_weights_path: {base_weights_path}")
     print(f"Layer modifications - Freeze first {request.freeze_first_k_layers} layers, Reinit last {request.reinit_last_k_layers} layers")
-    background_tasks.add_task(run_unlearning_GA_SL_FT_V2, request, status, base_weights_path)
+    background_tasks.add_task(services.run_unlearning_GA_SL_FT_V2, request, status, base_weights_path)
     return {"message": "GA+SL+FT V2 Unlearning started"}
 
 @router.post("/unlearn/scrub")
@@ -205,16 +304,17 @@ async def start_unlearning_scrub(
             status_code=400, 
             detail="Unlearning is already in progress"
         )
+    _reject_unsupported_options(request, "SCRUB", adapters=True)
     status.reset()
     base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
-    base_weights_path = f'unlearned_models/{request.forget_class}/{base_weights_name}'
-    if not os.path.exists(base_weights_path):
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
         raise HTTPException(
             status_code=404, 
-            detail=f"Weights '{base_weights_path}' not found in unlearned_models/ folder"
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
         )
     print(f"start unlearning SCRUB with base_weights_path: {base_weights_path}")
-    background_tasks.add_task(run_unlearning_SCRUB, request, status, base_weights_path)
+    background_tasks.add_task(services.run_unlearning_SCRUB, request, status, base_weights_path)
     return {"message": "SCRUB Unlearning started"}
 
 @router.post("/unlearn/salun")
@@ -227,18 +327,89 @@ async def start_unlearning_salun(
             status_code=400, 
             detail="Unlearning is already in progress"
         )
+    _reject_unsupported_options(request, "SalUn")
     status.reset()
     base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
-    base_weights_path = f'unlearned_models/{request.forget_class}/{base_weights_name}'
-    if not os.path.exists(base_weights_path):
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
         raise HTTPException(
             status_code=404, 
-            detail=f"Weights '{base_weights_path}' not found in unlearned_models/ folder"
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
         )
     print(f"start unlearning SalUn with base_weights_path: {base_weights_path}")
-    background_tasks.add_task(run_unlearning_SalUn, request, status, base_weights_path)
+    background_tasks.add_task(services.run_unlearning_SalUn, request, status, base_weights_path)
     return {"message": "SalUn Unlearning started"}
 
+@router.post("/unlearn/fisher")
+async def start_unlearning_fisher(
+    background_tasks: BackgroundTasks,
+    request: UnlearningRequest
+):
+    if status.is_unlearning:
+        raise HTTPException(
+            status_code=400, 
+            detail="Unlearning is already in progress"
+        )
+    _reject_unsupported_options(request, "Fisher")
+    status.reset()
+    base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
+        raise HTTPException(
+            status_code=404, 
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
+        )
+
+    background_tasks.add_task(services.run_unlearning_fisher, request, status, base_weights_path)
+    return {"message": "Fisher Unlearning started"}
+
+@router.post("/unlearn/head")
+async def start_unlearning_head(
+    background_tasks: BackgroundTasks,
+    request: HeadOnlyUnlearningRequest
+):
+    if status.is_unlearning:
+        raise HTTPException(
+            status_code=400, 
+            detail="Unlearning is already in progress"
+        )
+    _reject_unsupported_options(request, "head-only unlearning")
+    status.reset()
+    base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
+        raise HTTPException(
+            status_code=404, 
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
+        )
+
+    background_tasks.add_task(services.run_unlearning_head, request, status, base_weights_path)
+    return {"message": f"Head-only {request.head_method} Unlearning started"}
+
+@router.post("/unlearn/head/sweep")
+def sweep_unlearning_head(request: HeadSweepRequest):
+    # Declared as a plain function so FastAPI runs the sweep in its threadpool
+    # It reseeds the global RNG, so it must not run under an unlearning job
+    if status.is_unlearning:
+        raise HTTPException(
+            status_code=400, 
+            detail="Unlearning is already in progress"
+        )
+    base_weights_name = f"000{request.forget_class}.pth" if request.base_weights == "0000.pth" else request.base_weights
+    base_weights_path = resolve_checkpoint_path(f'unlearned_models/{request.forget_class}/{base_weights_name}')
+    if base_weights_path is None:
+        raise HTTPException(
+            status_code=404, 
+            detail=f"Weights '{base_weights_name}' not found in unlearned_models/{request.forget_class}/ folder"
+        )
+
+    results = services.run_head_sweep(request, base_weights_path)
+    return {
+        "method": request.head_method,
+        "base_weights": base_weights_name,
+        "results": results
+    }
+
 @router.post("/unlearn/retrain")
 async def start_unlearning_retrain(
     request: UnlearningRequest, 
@@ -249,8 +420,9 @@ async def start_unlearning_retrain(
             status_code=400, 
             detail="Unlearning is already in progress"
         )
+    _reject_unsupported_options(request, "retrain", processes=True)
     status.reset()
-    background_tasks.add_task(run_unlearning_retrain, request, status)
+    background_tasks.add_task(services.run_unlearning_retrain, request, status)
     return {"message": "Unlearning (retrain) started"}
 
 @router.get("/unlearn/status")
@@ -287,15 +459,14 @@ async def start_unlearning_custom(
 
     weights_filename = f"custom_weights_{weights_file.filename}"
     weights_path = os.path.join('uploaded_models', weights_filename)
-    os.makedirs('uploaded_models', exist_ok=True)
     
-    with open(weights_path, "wb") as buffer:
-        content = await weights_file.read()
-        buffer.write(content)
+    # Streamed to disk in chunks through the model store, so re-uploading a
+    # known model adds no new blob
+    await run_in_threadpool(store_fileobj, weights_file.file, weights_path)
     
     base_weights = f"000{forget_class}.pth" if base_weights == "0000.pth" else base_weights
     background_tasks.add_task(
-        run_unlearning_custom, 
+        services.run_unlearning_custom, 
         forget_class, 
         status,
         weights_path,
@@ -314,4 +485,19 @@ async def cancel_unlearning():
     status.cancel_requested = True
     return {
         "message": "Cancellation requested. Unlearning will stop soon."
-    }
\ No newline at end of file
+    }
+
+@router.post("/prewarm")
+async def start_prewarm(
+    forget_class: Optional[int] = Query(None, ge=0, lt=10)
+):
+    """
+    Build the reference artifacts of a forget class (all ten if omitted) in
+    the background while no job runs, so its first job runs at steady-state speed.
+    """
+    queued = prewarm(None if forget_class is None else [forget_class])
+    return {"message": "Prewarming started", "queued": queued}
+
+@router.get("/prewarm")
+async def get_prewarm_status():
+    return prewarm_status()
@@ -6,6 +6,7 @@ The service modules define recipes that are executed by separate threads to hand
 
 Available services:
     train: Model training with configurable hyperparameters
+    distributed_train: Multi-process CPU (gloo) data-parallel training used by train and retrain
     unlearn_GA: Unlearning using gradient ascent method
     unlearn_RL: Unlearning using random labeling method  
     unlearn_FT: Unlearning using fine-tuning method
@@ -14,6 +15,8 @@ Available services:
     unlearn_GA_SL_FT_V2: Unlearning using GA+SL+FT V2 method with layer modifications and initial FT
     unlearn_SCRUB: Unlearning using SCRUB method
     unlearn_SalUn: Unlearning using SalUn gradient saliency method
+    unlearn_fisher: One-shot unlearning with a retain-Fisher preconditioned forget gradient step
+    unlearn_head: Head-only FT/GA/RL/SalUn unlearning on cached penultimate features
     unlearn_custom: Custom unlearning method for inference
 
 Each service module follows a similar pattern:
@@ -21,18 +24,37 @@ Each service module follows a similar pattern:
 2. Sets up the model, data, and optimization components
 3. Passes the configuration to a dedicated execution thread
 4. Provides status tracking and result handling
+
+Service modules (and with them torch, the thread modules, umap, matplotlib and
+sklearn) are imported on first access to one of their run_* functions, not
+when the routers are imported.
 """
+import importlib
+
+_EXPORTS = {
+    'run_training': 'train',
+    'run_unlearning_GA': 'unlearn_GA',
+    'run_unlearning_RL': 'unlearn_RL',
+    'run_unlearning_FT': 'unlearn_FT',
+    'run_unlearning_GA_FT': 'unlearn_GA_FT',
+    'run_unlearning_GA_SL_FT': 'unlearn_GA_SL_FT',
+    'run_unlearning_GA_SL_FT_V2': 'unlearn_GA_SL_FT_V2',
+    'run_unlearning_SCRUB': 'unlearn_SCRUB',
+    'run_unlearning_SalUn': 'unlearn_SalUn',
+    'run_unlearning_fisher': 'unlearn_fisher',
+    'run_unlearning_head': 'unlearn_head',
+    'run_head_sweep': 'unlearn_head',
+    'run_unlearning_retrain': 'unlearn_retrain',
+    'run_unlearning_custom': 'unlearn_custom',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
 
-from .train import run_training
-from .unlearn_GA import run_unlearning_GA
-from .unlearn_RL import run_unlearning_RL
-from .unlearn_FT import run_unlearning_FT
-from .unlearn_GA_FT import run_unlearning_GA_FT
-from .unlearn_GA_SL_FT import run_unlearning_GA_SL_FT
-from .unlearn_GA_SL_FT_V2 import run_unlearning_GA_SL_FT_V2
-from .unlearn_SCRUB import run_unlearning_SCRUB
-from .unlearn_SalUn import run_unlearning_SalUn
-from .unlearn_retrain import run_unlearning_retrain
-from .unlearn_custom import run_unlearning_custom
-
-__all__ = ['run_training', 'run_unlearning_GA', 'run_unlearning_RL', 'run_unlearning_FT', 'run_unlearning_GA_FT', 'run_unlearning_GA_SL_FT', 'run_unlearning_GA_SL_FT_V2', 'run_unlearning_SCRUB', 'run_unlearning_SalUn', 'run_unlearning_retrain', 'run_unlearning_custom']
\ No newline at end of file
+__all__ = ['run_training', 'run_unlearning_GA', 'run_unlearning_RL', 'run_unlearning_FT', 'run_unlearning_GA_FT', 'run_unlearning_GA_SL_FT', 'run_unlearning_GA_SL_FT_V2', 'run_unlearning_SCRUB', 'run_unlearning_SalUn', 'run_unlearning_fisher', 'run_unlearning_head', 'run_head_sweep', 'run_unlearning_retrain', 'run_unlearning_custom']
\ No newline at end of file
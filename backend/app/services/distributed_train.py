@@ -0,0 +1,45 @@
+import asyncio
+
+from app.threads import DistributedTrainingThread
+
+
+async def distributed_training(request, status, forget_class, model_name, is_training=False):
+    """
+    Train ResNet18 from scratch with request.num_processes gloo processes.
+
+    Used by the training and retrain services when num_processes > 1.
+    """
+    print(
+        f"Starting distributed training on {request.num_processes} CPU processes "
+        f"with {request.epochs} epochs..."
+    )
+
+    distributed_thread = DistributedTrainingThread(
+        status=status,
+        num_processes=request.num_processes,
+        batch_size=request.batch_size,
+        learning_rate=request.learning_rate,
+        epochs=request.epochs,
+        forget_class=forget_class,
+        model_name=model_name,
+        precision=request.precision,
+        channels_last=request.channels_last,
+        is_training=is_training
+    )
+    distributed_thread.start()
+
+    while distributed_thread.is_alive():
+        await asyncio.sleep(0.5)
+        if status.cancel_requested:
+            distributed_thread.stop()
+            print("Cancel requested. Stopping distributed training...")
+            break
+
+    # Wait for the ranks to shut down before reporting
+    while distributed_thread.is_alive():
+        await asyncio.sleep(0.5)
+
+    if distributed_thread.exception:
+        print(f"An error occurred during distributed training: {str(distributed_thread.exception)}")
+
+    return status
@@ -4,8 +4,10 @@ import torch.nn as nn
 import torch.optim as optim
 
 from app.threads import TrainingThread
+from app.services.distributed_train import distributed_training
 from app.models import get_resnet18
 from app.utils import set_seed, get_data_loaders
+from app.utils.thread_operations import run_in_worker_loop
 from app.config import (
     MOMENTUM,
     WEIGHT_DECAY,
@@ -14,6 +16,11 @@ from app.config import (
 )
 
 async def training(request, status):
+    if request.num_processes > 1:
+        return await distributed_training(
+            request, status, forget_class=-1, model_name="ffff", is_training=True
+        )
+
     print(f"Starting training with {request.epochs} epochs...")
     set_seed(UNLEARN_SEED)
     device = torch.device(
@@ -31,7 +38,10 @@ async def training(request, status):
         batch_size=request.batch_size,
         augmentation=True
     )
-    model = get_resnet18().to(device=device)
+    model = get_resnet18(
+        precision=request.precision,
+        channels_last=request.channels_last
+    ).to(device=device)
 
     criterion = nn.CrossEntropyLoss()
     optimizer = optim.SGD(
@@ -75,7 +85,7 @@ async def run_training(request, status):
     try:
         status.is_training = True
         status.cancel_requested = False
-        updated_status = await training(request, status)
+        updated_status = await run_in_worker_loop(training, request, status)
         return updated_status
     finally:
         status.is_training = False
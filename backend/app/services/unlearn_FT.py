@@ -5,9 +5,11 @@ import torch.nn as nn
 import torch.optim as optim
 
 from app.threads import UnlearningFTThread
-from app.models import get_resnet18
+from app.models import get_resnet18, attach_lora_adapters
 from app.utils.helpers import set_seed
-from app.utils.data_loader import get_data_loaders
+from app.utils.model_pool import get_state_dict
+from app.utils.data_loader import get_data_loaders, split_class_indices
+from app.utils.thread_operations import run_in_worker_loop
 from app.config import (
     MOMENTUM,
     WEIGHT_DECAY,
@@ -20,11 +22,13 @@ async def unlearning_FT(request, status, base_weights_path):
     print(f"Starting FT unlearning for class {request.forget_class} with {request.epochs} epochs...")
     
     # Layer modification configuration
-    freeze_first_k_layers = 0  # Freeze first K layer groups
+    freeze_first_k_layers = request.freeze_first_k_layers  # Freeze first K layer groups
     reinit_last_k_layers = 0    # Reinitialize last K layer groups
     
     ETA_MIN = 0.01
     AUGMENTATION = False
+    # Frozen prefix outputs are only reusable across epochs without augmentation
+    use_prefix_cache = not AUGMENTATION
     
     # Epoch metrics configuration
     enable_epoch_metrics = False  # Enable comprehensive epoch-wise metrics (UA, RA, TUA, TRA, PS, MIA)
@@ -44,10 +48,13 @@ async def unlearning_FT(request, status, base_weights_path):
     )
 
     # Create Unlearning Settings
-    model_after = get_resnet18().to(device)
+    model_after = get_resnet18(
+        precision=request.precision,
+        channels_last=request.channels_last
+    ).to(device)
     
     print(f"Loading model_after (base) from: {base_weights_path}")
-    base_state_dict = torch.load(base_weights_path, map_location=device)
+    base_state_dict = get_state_dict(base_weights_path)
     model_after.load_state_dict(base_state_dict)
     
     # Verify base model loaded correctly by checking a sample parameter
@@ -65,10 +72,9 @@ async def unlearning_FT(request, status, base_weights_path):
     )
 
     # Create retain loader (excluding forget class)
-    retain_indices = [
-        i for i, (_, label) in enumerate(train_set)
-        if label != request.forget_class
-    ]
+    retain_indices, forget_indices = split_class_indices(
+        train_set.targets, request.forget_class
+    )
     retain_subset = torch.utils.data.Subset(
         dataset=train_set,
         indices=retain_indices
@@ -80,10 +86,6 @@ async def unlearning_FT(request, status, base_weights_path):
     )
 
     # Create forget loader (only forget class)
-    forget_indices = [
-        i for i, (_, label) in enumerate(train_set)
-        if label == request.forget_class
-    ]
     forget_subset = torch.utils.data.Subset(
         dataset=train_set,
         indices=forget_indices
@@ -95,8 +97,12 @@ async def unlearning_FT(request, status, base_weights_path):
     )
 
     criterion = nn.CrossEntropyLoss()
+    # Train only low-rank adapters (saved as small delta checkpoints) when requested
+    if request.adapter_rank > 0:
+        attach_lora_adapters(model_after, request.adapter_rank, base_weights_path=base_weights_path)
+
     optimizer = optim.SGD(
-        params=model_after.parameters(),
+        params=[p for p in model_after.parameters() if p.requires_grad],
         lr=request.learning_rate,
         momentum=MOMENTUM,
         weight_decay=WEIGHT_DECAY
@@ -141,6 +147,7 @@ async def unlearning_FT(request, status, base_weights_path):
         device=device,
         base_weights_path=base_weights_path,
         freeze_first_k_layers=freeze_first_k_layers,
+        use_prefix_cache=use_prefix_cache,
         reinit_last_k_layers=reinit_last_k_layers,
         enable_epoch_metrics=enable_epoch_metrics
     )
@@ -185,7 +192,7 @@ async def run_unlearning_FT(request, status, base_weights_path):
     try:
         status.is_unlearning = True
         status.progress = "Unlearning"
-        updated_status = await unlearning_FT(request, status, base_weights_path)
+        updated_status = await run_in_worker_loop(unlearning_FT, request, status, base_weights_path)
         return updated_status
     finally:
         status.cancel_requested = False
@@ -5,9 +5,11 @@ import torch.nn as nn
 import torch.optim as optim
 
 from app.threads import UnlearningGAThread
-from app.models import get_resnet18
+from app.models import get_resnet18, attach_lora_adapters
 from app.utils.helpers import set_seed
-from app.utils.data_loader import get_data_loaders
+from app.utils.model_pool import get_state_dict
+from app.utils.data_loader import get_data_loaders, split_class_indices
+from app.utils.thread_operations import run_in_worker_loop
 from app.config import (
 	MOMENTUM, 
 	WEIGHT_DECAY, 
@@ -20,13 +22,15 @@ async def unlearning_GA(request, status, base_weights_path):
     print(f"Starting GA unlearning for class {request.forget_class} with {request.epochs} epochs...")
     
     # Layer modification configuration (similar to SalUn config style)
-    freeze_first_k_layers = 0  # Freeze first K layer groups
+    freeze_first_k_layers = request.freeze_first_k_layers  # Freeze first K layer groups
     freeze_last_k_layers = 0   # Freeze last K layer groups  
     reinit_last_k_layers = 0   # Reinitialize last K layer groups
     
     # Epoch metrics configuration
     enable_epoch_metrics = False  # Enable comprehensive epoch-wise metrics (UA, RA, TUA, TRA, PS, MIA)
     AUGMENTATION = False
+    # Frozen prefix outputs are only reusable across epochs without augmentation
+    use_prefix_cache = not AUGMENTATION
 
     if freeze_first_k_layers > 0 or freeze_last_k_layers > 0 or reinit_last_k_layers > 0:
         print(f"Layer modifications: freeze_first_k={freeze_first_k_layers}, freeze_last_k={freeze_last_k_layers}, reinit_last_k={reinit_last_k_layers}")
@@ -43,8 +47,11 @@ async def unlearning_GA(request, status, base_weights_path):
     )
 
     # Create Unlearning Settings
-    model_after = get_resnet18().to(device)
-    model_after.load_state_dict(torch.load(base_weights_path, map_location=device))
+    model_after = get_resnet18(
+        precision=request.precision,
+        channels_last=request.channels_last
+    ).to(device)
+    model_after.load_state_dict(get_state_dict(base_weights_path))
 
     (
         train_loader, 
@@ -56,10 +63,9 @@ async def unlearning_GA(request, status, base_weights_path):
         augmentation=AUGMENTATION
     )
     
-    forget_indices = [
-        i for i, (_, label) in enumerate(train_set)
-        if label == request.forget_class
-    ]
+    _, forget_indices = split_class_indices(
+        train_set.targets, request.forget_class
+    )
     forget_subset = torch.utils.data.Subset(
         dataset=train_set, 
         indices=forget_indices
@@ -71,8 +77,12 @@ async def unlearning_GA(request, status, base_weights_path):
     )
     
     criterion = nn.CrossEntropyLoss()
+    # Train only low-rank adapters (saved as small delta checkpoints) when requested
+    if request.adapter_rank > 0:
+        attach_lora_adapters(model_after, request.adapter_rank, base_weights_path=base_weights_path)
+
     optimizer = optim.SGD(
-        params=model_after.parameters(),
+        params=[p for p in model_after.parameters() if p.requires_grad],
         lr=request.learning_rate, 
         momentum=MOMENTUM,
         weight_decay=WEIGHT_DECAY
@@ -98,6 +108,7 @@ async def unlearning_GA(request, status, base_weights_path):
         device=device, 
         base_weights_path=base_weights_path,
         freeze_first_k_layers=freeze_first_k_layers,
+        use_prefix_cache=use_prefix_cache,
         freeze_last_k_layers=freeze_last_k_layers,
         reinit_last_k_layers=reinit_last_k_layers,
         enable_epoch_metrics=enable_epoch_metrics
@@ -140,7 +151,7 @@ async def run_unlearning_GA(request, status, base_weights_path):
     try:
         status.is_unlearning = True
         status.progress = "Unlearning"
-        updated_status = await unlearning_GA(request, status, base_weights_path)
+        updated_status = await run_in_worker_loop(unlearning_GA, request, status, base_weights_path)
         return updated_status
     finally:
         status.cancel_requested = False
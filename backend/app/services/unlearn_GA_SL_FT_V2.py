@@ -8,7 +8,9 @@ import torch.optim as optim
 from app.threads import UnlearningGASLFTV2Thread
 from app.models import get_resnet18
 from app.utils.helpers import set_seed
-from app.utils.data_loader import get_data_loaders
+from app.utils.model_pool import get_state_dict
+from app.utils.data_loader import get_data_loaders, split_class_indices
+from app.utils.thread_operations import run_in_worker_loop
 from app.config import (
     MOMENTUM,
     WEIGHT_DECAY,
@@ -53,8 +55,11 @@ async def unlearning_GA_SL_FT_V2(request, status, base_weights_path):
     set_seed(UNLEARN_SEED)
     
     # Create Unlearning Settings
-    model_after = get_resnet18().to(device)
-    model_after.load_state_dict(torch.load(base_weights_path, map_location=device))
+    model_after = get_resnet18(
+        precision=request.precision,
+        channels_last=request.channels_last
+    ).to(device)
+    model_after.load_state_dict(get_state_dict(base_weights_path))
     
     # Layer modification configuration
     freeze_first_k_layers = 0  # Freeze first K layer groups
@@ -94,10 +99,9 @@ async def unlearning_GA_SL_FT_V2(request, status, base_weights_path):
     )
 
     # Create retain loader for FT (excluding forget class)
-    retain_indices = [
-        i for i, (_, label) in enumerate(train_set)
-        if label != request.forget_class
-    ]
+    retain_indices, forget_indices = split_class_indices(
+        train_set.targets, request.forget_class
+    )
     retain_subset = torch.utils.data.Subset(
         dataset=train_set,
         indices=retain_indices
@@ -109,10 +113,6 @@ async def unlearning_GA_SL_FT_V2(request, status, base_weights_path):
     )
 
     # Create forget loader for GA (only forget class)
-    forget_indices = [
-        i for i, (_, label) in enumerate(train_set)
-        if label == request.forget_class
-    ]
     forget_subset = torch.utils.data.Subset(
         dataset=train_set,
         indices=forget_indices
@@ -280,7 +280,7 @@ async def run_unlearning_GA_SL_FT_V2(request, status, base_weights_path):
     try:
         status.is_unlearning = True
         status.progress = "Unlearning"
-        updated_status = await unlearning_GA_SL_FT_V2(request, status, base_weights_path)
+        updated_status = await run_in_worker_loop(unlearning_GA_SL_FT_V2, request, status, base_weights_path)
         return updated_status
     finally:
         status.cancel_requested = False
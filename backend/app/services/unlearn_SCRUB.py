@@ -6,9 +6,11 @@ import torch.optim as optim
 import os
 
 from app.threads import UnlearningSCRUBThread
-from app.models import get_resnet18
+from app.models import get_resnet18, attach_lora_adapters
 from app.utils.helpers import set_seed
-from app.utils.data_loader import get_data_loaders
+from app.utils.model_pool import get_state_dict
+from app.utils.data_loader import get_data_loaders, split_class_indices
+from app.utils.thread_operations import run_in_worker_loop
 from app.config import (
     MOMENTUM,
     WEIGHT_DECAY,
@@ -30,8 +32,11 @@ async def unlearning_SCRUB(request, status, base_weights_path):
     )
 
     # Create Unlearning Settings
-    model_after = get_resnet18().to(device)
-    model_after.load_state_dict(torch.load(base_weights_path, map_location=device))
+    model_after = get_resnet18(
+        precision=request.precision,
+        channels_last=request.channels_last
+    ).to(device)
+    model_after.load_state_dict(get_state_dict(base_weights_path))
     
     (
         train_loader,
@@ -44,10 +49,9 @@ async def unlearning_SCRUB(request, status, base_weights_path):
     )
 
     # Create retain loader (excluding forget class)
-    retain_indices = [
-        i for i, (_, label) in enumerate(train_set)
-        if label != request.forget_class
-    ]
+    retain_indices, forget_indices = split_class_indices(
+        train_set.targets, request.forget_class
+    )
     retain_subset = torch.utils.data.Subset(
         dataset=train_set,
         indices=retain_indices
@@ -59,10 +63,6 @@ async def unlearning_SCRUB(request, status, base_weights_path):
     )
 
     # Create forget loader (only forget class)
-    forget_indices = [
-        i for i, (_, label) in enumerate(train_set)
-        if label == request.forget_class
-    ]
     forget_subset = torch.utils.data.Subset(
         dataset=train_set,
         indices=forget_indices
@@ -90,8 +90,12 @@ async def unlearning_SCRUB(request, status, base_weights_path):
     if enable_epoch_metrics:
         print("Epoch-wise metrics collection: ENABLED")
 
+    # Train only low-rank adapters (saved as small delta checkpoints) when requested
+    if request.adapter_rank > 0:
+        attach_lora_adapters(model_after, request.adapter_rank, base_weights_path=base_weights_path)
+
     optimizer = optim.SGD(
-        params=model_after.parameters(),
+        params=[p for p in model_after.parameters() if p.requires_grad],
         lr=request.learning_rate,
         momentum=MOMENTUM,
         weight_decay=WEIGHT_DECAY
@@ -163,7 +167,7 @@ async def run_unlearning_SCRUB(request, status, base_weights_path):
     try:
         status.is_unlearning = True
         status.progress = "Unlearning"
-        updated_status = await unlearning_SCRUB(request, status, base_weights_path)
+        updated_status = await run_in_worker_loop(unlearning_SCRUB, request, status, base_weights_path)
         return updated_status
     finally:
         status.cancel_requested = False
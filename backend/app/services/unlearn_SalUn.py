@@ -6,7 +6,9 @@ import torch.optim as optim
 from app.threads import UnlearningSalUnThread
 from app.models import get_resnet18
 from app.utils.helpers import set_seed
-from app.utils.data_loader import get_data_loaders
+from app.utils.model_pool import get_state_dict
+from app.utils.data_loader import get_data_loaders, split_class_indices
+from app.utils.thread_operations import run_in_worker_loop
 from app.config import (
     MOMENTUM,
     WEIGHT_DECAY,
@@ -34,8 +36,11 @@ async def unlearning_SalUn(request, status, base_weights_path):
     )
 
     # Create Unlearning Settings
-    model_after = get_resnet18().to(device)
-    model_after.load_state_dict(torch.load(base_weights_path, map_location=device))
+    model_after = get_resnet18(
+        precision=request.precision,
+        channels_last=request.channels_last
+    ).to(device)
+    model_after.load_state_dict(get_state_dict(base_weights_path))
     
     (
         train_loader,
@@ -48,10 +53,9 @@ async def unlearning_SalUn(request, status, base_weights_path):
     )
 
     # Create retain loader (excluding forget class)
-    retain_indices = [
-        i for i, (_, label) in enumerate(train_set)
-        if label != request.forget_class
-    ]
+    retain_indices, forget_indices = split_class_indices(
+        train_set.targets, request.forget_class
+    )
     retain_subset = torch.utils.data.Subset(
         dataset=train_set,
         indices=retain_indices
@@ -63,10 +67,6 @@ async def unlearning_SalUn(request, status, base_weights_path):
     )
 
     # Create forget loader (only forget class)
-    forget_indices = [
-        i for i, (_, label) in enumerate(train_set)
-        if label == request.forget_class
-    ]
     forget_subset = torch.utils.data.Subset(
         dataset=train_set,
         indices=forget_indices
@@ -159,7 +159,7 @@ async def run_unlearning_SalUn(request, status, base_weights_path):
     try:
         status.is_unlearning = True
         status.progress = "Unlearning"
-        updated_status = await unlearning_SalUn(request, status, base_weights_path)
+        updated_status = await run_in_worker_loop(unlearning_SalUn, request, status, base_weights_path)
         return updated_status
     finally:
         status.cancel_requested = False
@@ -1,12 +1,13 @@
 import asyncio
 import gc
-import os
 import torch
 import torch.nn as nn
 
 from app.threads import UnlearningCustomThread
-from app.utils.helpers import set_seed
+from app.utils.helpers import set_seed, load_model_state_dict
+from app.utils.model_store import remove_file
 from app.utils.data_loader import get_data_loaders
+from app.utils.thread_operations import run_in_worker_loop
 from app.models import get_resnet18
 from app.config import UNLEARN_SEED, GPU_ID
 
@@ -29,7 +30,7 @@ async def unlearning_custom(forget_class, status, weights_path, base_weights):
                          else "mps" if torch.backends.mps.is_available() 
                          else "cpu")
     model = get_resnet18().to(device)
-    model.load_state_dict(torch.load(weights_path, map_location=device))
+    model.load_state_dict(load_model_state_dict(weights_path, map_location=device))
 
     unlearning_thread = UnlearningCustomThread(
         forget_class=forget_class,
@@ -84,10 +85,10 @@ async def unlearning_custom(forget_class, status, weights_path, base_weights):
 async def run_unlearning_custom(forget_class, status, weights_path, base_weights):
     try:
         status.is_unlearning = True
-        updated_status = await unlearning_custom(forget_class, status, weights_path, base_weights)
+        updated_status = await run_in_worker_loop(unlearning_custom, forget_class, status, weights_path, base_weights)
         return updated_status
     finally:
         status.is_unlearning = False
         status.cancel_requested = False
         status.progress = "Completed"
-        os.remove(weights_path)
\ No newline at end of file
+        remove_file(weights_path)
\ No newline at end of file
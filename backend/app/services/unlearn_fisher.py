@@ -0,0 +1,141 @@
+import asyncio
+import gc
+import torch
+import torch.nn as nn
+
+from app.threads import UnlearningFisherThread
+from app.models import get_resnet18
+from app.utils.helpers import set_seed
+from app.utils.model_pool import get_state_dict
+from app.utils.data_loader import get_data_loaders, split_class_indices
+from app.utils.thread_operations import run_in_worker_loop
+
+from app.config import (
+    UNLEARN_SEED,
+    GPU_ID
+)
+
+async def unlearning_fisher(request, status, base_weights_path):
+    print(f"Starting Fisher unlearning for class {request.forget_class} (one-shot)...")
+    
+    # Fisher-specific hyperparameters (request.learning_rate scales the Newton step)
+    fisher_config = {
+        'damping': 1e-3,              # Added to the retain Fisher before inversion
+        'noise_scale': 0.0,           # Std multiplier of (F + damping)^(-1/4) noise, 0 disables
+        'num_retain_samples': None,   # Retain samples for the Fisher (None: full pass)
+    }
+    print(f"Fisher configuration: {fisher_config}, lr={request.learning_rate}")
+    
+    set_seed(UNLEARN_SEED)
+    
+    device = torch.device(
+        f"cuda:{GPU_ID}" if torch.cuda.is_available() 
+        else "mps" if torch.backends.mps.is_available() 
+        else "cpu"
+    )
+
+    # Create Unlearning Settings
+    model_after = get_resnet18(
+        precision=request.precision,
+        channels_last=request.channels_last
+    ).to(device)
+    model_after.load_state_dict(get_state_dict(base_weights_path))
+    
+    (
+        train_loader,
+        test_loader,
+        train_set,
+        test_set
+    ) = get_data_loaders(
+        batch_size=request.batch_size,
+        augmentation=False
+    )
+
+    # Create retain loader (excluding forget class)
+    retain_indices, forget_indices = split_class_indices(
+        train_set.targets, request.forget_class
+    )
+    retain_subset = torch.utils.data.Subset(
+        dataset=train_set,
+        indices=retain_indices
+    )
+    retain_loader = torch.utils.data.DataLoader(
+        dataset=retain_subset,
+        batch_size=request.batch_size,
+        shuffle=True
+    )
+
+    # Create forget loader (only forget class)
+    forget_subset = torch.utils.data.Subset(
+        dataset=train_set,
+        indices=forget_indices
+    )
+    forget_loader = torch.utils.data.DataLoader(
+        dataset=forget_subset,
+        batch_size=request.batch_size,
+        shuffle=False
+    )
+
+    criterion = nn.CrossEntropyLoss()
+
+    unlearning_fisher_thread = UnlearningFisherThread(
+        request=request,
+        status=status,
+        model_after=model_after,
+        criterion=criterion,
+        retain_loader=retain_loader,
+        forget_loader=forget_loader,
+        train_loader=train_loader,
+        test_loader=test_loader,
+        train_set=train_set,
+        test_set=test_set,
+        device=device,
+        base_weights_path=base_weights_path,
+        fisher_config=fisher_config
+    )
+    
+    unlearning_fisher_thread.start()
+
+    # thread start
+    while unlearning_fisher_thread.is_alive():
+        await asyncio.sleep(0.1)
+        if status.cancel_requested:
+            unlearning_fisher_thread.stop()
+            print("Cancellation requested, stopping the unlearning process...")
+        
+    status.is_unlearning = False
+
+    # thread end
+    if unlearning_fisher_thread.exception:
+        print(f"An error occurred during Fisher unlearning: {str(unlearning_fisher_thread.exception)}")
+    elif status.cancel_requested:
+        print("Unlearning process was cancelled.")
+    else:
+        print("Unlearning process completed successfully.")
+
+    # Free memory before cleanup
+    del unlearning_fisher_thread
+    del model_after
+    del train_loader, test_loader, train_set, test_set
+    del retain_loader, retain_subset
+    del forget_loader, forget_subset
+    del criterion
+
+    gc.collect()
+
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    elif torch.backends.mps.is_available():
+        torch.mps.empty_cache()
+
+    return status
+
+async def run_unlearning_fisher(request, status, base_weights_path):
+    try:
+        status.is_unlearning = True
+        status.progress = "Unlearning"
+        updated_status = await run_in_worker_loop(unlearning_fisher, request, status, base_weights_path)
+        return updated_status
+    finally:
+        status.cancel_requested = False
+        status.progress = "Completed"
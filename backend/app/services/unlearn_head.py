@@ -0,0 +1,179 @@
+import asyncio
+import gc
+import os
+import threading
+import torch
+import torch.nn as nn
+
+from app.threads import UnlearningHeadThread
+from app.models import get_resnet18
+from app.utils.helpers import set_seed
+from app.utils.model_pool import get_state_dict
+from app.utils.data_loader import get_data_loaders
+from app.utils.head_only import extract_penultimate_features, sweep_linear_head
+from app.utils.thread_operations import run_in_worker_loop
+from app.config import (
+    MOMENTUM,
+    WEIGHT_DECAY,
+    UNLEARN_SEED,
+    GPU_ID
+)
+
+# Features of the most recently swept base model, reused by later sweeps
+_sweep_feature_cache = {}
+_sweep_feature_lock = threading.Lock()
+
+
+def _get_device():
+    return torch.device(
+        f"cuda:{GPU_ID}" if torch.cuda.is_available()
+        else "mps" if torch.backends.mps.is_available()
+        else "cpu"
+    )
+
+
+async def unlearning_head(request, status, base_weights_path):
+    print(f"Starting head-only {request.head_method} unlearning for class {request.forget_class} with {request.epochs} epochs...")
+
+    # Head-only configuration
+    saliency_threshold = 0.5  # Fraction of head parameters updated by SalUn
+
+    set_seed(UNLEARN_SEED)
+    device = _get_device()
+
+    model_after = get_resnet18(
+        precision=request.precision,
+        channels_last=request.channels_last
+    ).to(device)
+    print(f"Loading model_after (base) from: {base_weights_path}")
+    model_after.load_state_dict(get_state_dict(base_weights_path))
+
+    # Features are extracted once, so the data must not be augmented
+    (
+        train_loader,
+        test_loader,
+        train_set,
+        test_set
+    ) = get_data_loaders(
+        batch_size=request.batch_size,
+        augmentation=False
+    )
+
+    criterion = nn.CrossEntropyLoss()
+
+    unlearning_head_thread = UnlearningHeadThread(
+        request=request,
+        status=status,
+        model_after=model_after,
+        criterion=criterion,
+        train_loader=train_loader,
+        test_loader=test_loader,
+        train_set=train_set,
+        test_set=test_set,
+        device=device,
+        base_weights_path=base_weights_path,
+        head_batch_size=request.head_batch_size,
+        saliency_threshold=saliency_threshold
+    )
+
+    unlearning_head_thread.start()
+
+    # thread start
+    while unlearning_head_thread.is_alive():
+        await asyncio.sleep(0.1)
+        if status.cancel_requested:
+            unlearning_head_thread.stop()
+            print("Cancellation requested, stopping the unlearning process...")
+
+    status.is_unlearning = False
+
+    # thread end
+    if unlearning_head_thread.exception:
+        print(f"An error occurred during head-only unlearning: {str(unlearning_head_thread.exception)}")
+    elif status.cancel_requested:
+        print("Unlearning process was cancelled.")
+    else:
+        print("Unlearning process completed successfully.")
+
+    # Free memory before cleanup
+    del unlearning_head_thread
+    del model_after
+    del train_loader, test_loader, train_set, test_set
+    del criterion
+
+    gc.collect()
+
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    elif torch.backends.mps.is_available():
+        torch.mps.empty_cache()
+
+    return status
+
+async def run_unlearning_head(request, status, base_weights_path):
+    try:
+        status.is_unlearning = True
+        status.progress = "Unlearning"
+        updated_status = await run_in_worker_loop(unlearning_head, request, status, base_weights_path)
+        return updated_status
+    finally:
+        status.cancel_requested = False
+        status.progress = "Completed"
+
+
+def run_head_sweep(request, base_weights_path):
+    """
+    Evaluate many head-only hyperparameter settings on one base model.
+
+    The penultimate features of the train and test sets are extracted once per
+    base checkpoint and kept in memory, so repeated sweeps over the same base
+    model only train and evaluate linear heads.
+    """
+    set_seed(UNLEARN_SEED)
+    device = _get_device()
+
+    cache_key = (base_weights_path, os.path.getmtime(base_weights_path))
+    model = get_resnet18().to(device)
+    model.load_state_dict(get_state_dict(base_weights_path))
+
+    # Sweeps run in the threadpool; concurrent ones must not evict each other's features
+    with _sweep_feature_lock:
+        features = _sweep_feature_cache.get(cache_key)
+        if features is None:
+            print(f"Extracting penultimate features for sweep from: {base_weights_path}")
+            train_loader, test_loader, _, _ = get_data_loaders(
+                batch_size=request.batch_size,
+                augmentation=False
+            )
+            train_features, train_labels = extract_penultimate_features(model, train_loader, device)
+            test_features, test_labels = extract_penultimate_features(model, test_loader, device)
+            features = (train_features, train_labels, test_features, test_labels)
+            _sweep_feature_cache.clear()
+            _sweep_feature_cache[cache_key] = features
+
+    train_features, train_labels, test_features, test_labels = features
+
+    settings = [
+        {
+            "learning_rate": learning_rate,
+            "epochs": epochs,
+            "batch_size": request.head_batch_size,
+            "momentum": MOMENTUM,
+            "weight_decay": WEIGHT_DECAY,
+            "saliency_threshold": request.saliency_threshold
+        }
+        for learning_rate in request.learning_rates
+        for epochs in request.epochs
+    ]
+    print(f"Sweeping {len(settings)} head-only {request.head_method} settings for class {request.forget_class}")
+
+    return sweep_linear_head(
+        fc=model.fc,
+        train_features=train_features.to(device),
+        train_labels=train_labels.to(device),
+        test_features=test_features.to(device),
+        test_labels=test_labels.to(device),
+        forget_class=request.forget_class,
+        method=request.head_method,
+        settings=settings
+    )
@@ -1,10 +1,12 @@
 import asyncio
 import gc
+import uuid
 import torch
 import torch.nn as nn
 import torch.optim as optim
 
 from app.threads import UnlearningRetrainThread
+from app.services.distributed_train import distributed_training
 from app.models import get_resnet18
 from app.utils.helpers import set_seed
 from app.utils.data_loader import get_data_loaders
@@ -14,6 +16,7 @@ from app.utils.visualization import (
 from app.utils.evaluation import (
 	get_layer_activations_and_predictions,
 )
+from app.utils.thread_operations import run_in_worker_loop
 from app.config import (
     MOMENTUM,
     WEIGHT_DECAY,
@@ -22,6 +25,14 @@ from app.config import (
 )
 
 async def unlearning_retrain(request, status):
+    if request.num_processes > 1:
+        status.forget_class = request.forget_class
+        status.method = "Retraining"
+        status.recent_id = uuid.uuid4().hex[:4]
+        return await distributed_training(
+            request, status, forget_class=request.forget_class, model_name=status.recent_id
+        )
+
     print(
         f"Starting unlearning for class {request.forget_class} "
         f"with {request.epochs} epochs..."
@@ -45,7 +56,7 @@ async def unlearning_retrain(request, status):
     
     # Create dataset excluding the forget class
     indices = [
-        i for i, (_, label) in enumerate(train_set) 
+        i for i, label in enumerate(train_set.targets) 
         if label != request.forget_class
     ]
     subset = torch.utils.data.Subset(train_set, indices)
@@ -55,7 +66,10 @@ async def unlearning_retrain(request, status):
         shuffle=True
     )
 
-    model = get_resnet18().to(device)
+    model = get_resnet18(
+        precision=request.precision,
+        channels_last=request.channels_last
+    ).to(device)
     criterion = nn.CrossEntropyLoss()
     optimizer = optim.SGD(
         model.parameters(),
@@ -123,7 +137,7 @@ async def run_unlearning_retrain(request, status):
     try:
         status.is_unlearning = True
         status.progress = "Unlearning"
-        updated_status = await unlearning_retrain(request, status)
+        updated_status = await run_in_worker_loop(unlearning_retrain, request, status)
         return updated_status
     finally:
         status.is_unlearning = False
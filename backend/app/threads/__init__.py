@@ -6,6 +6,7 @@ and various unlearning methods. Each thread runs independently and provides stat
 
 Available threads:
     TrainingThread: Handles model training operations
+    DistributedTrainingThread: Supervises multi-process CPU (gloo) training and retraining
     UnlearningGAThread: Unlearning using gradient ascent method
     UnlearningRLThread: Unlearning using random labeling method
     UnlearningFTThread: Unlearning using fine-tuning method
@@ -14,6 +15,8 @@ Available threads:
     UnlearningGASLFTV2Thread: Unlearning using GA+SL+FT V2 method with layer modifications and initial FT
     UnlearningSCRUBThread: Unlearning using SCRUB method
     UnlearningSalUnThread: Unlearning using SalUn gradient saliency method
+    UnlearningFisherThread: One-shot Fisher-preconditioned unlearning
+    UnlearningHeadThread: Head-only unlearning on cached penultimate features
     UnlearningRetrainThread: Unlearning by retraining from scratch
     UnlearningCustomThread: Custom unlearning method for inference
 
@@ -25,6 +28,7 @@ Each thread class follows a similar pattern:
 """
 
 from .train_thread import TrainingThread
+from .distributed_train_thread import DistributedTrainingThread
 from .unlearn_GA_thread import UnlearningGAThread
 from .unlearn_RL_thread import UnlearningRLThread
 from .unlearn_FT_thread import UnlearningFTThread
@@ -33,7 +37,9 @@ from .unlearn_GA_SL_FT_thread import UnlearningGASLFTThread
 from .unlearn_GA_SL_FT_V2_thread import UnlearningGASLFTV2Thread
 from .unlearn_SCRUB_thread import UnlearningSCRUBThread
 from .unlearn_SalUn_thread import UnlearningSalUnThread
+from .unlearn_fisher_thread import UnlearningFisherThread
+from .unlearn_head_thread import UnlearningHeadThread
 from .unlearn_retrain_thread import UnlearningRetrainThread
 from .unlearn_custom_thread import UnlearningCustomThread
 
-__all__ = ['TrainingThread', 'UnlearningGAThread', 'UnlearningRLThread', 'UnlearningFTThread', 'UnlearningGAFTThread', 'UnlearningGASLFTThread', 'UnlearningGASLFTV2Thread', 'UnlearningSCRUBThread', 'UnlearningSalUnThread', 'UnlearningRetrainThread', 'UnlearningCustomThread']
\ No newline at end of file
+__all__ = ['TrainingThread', 'DistributedTrainingThread', 'UnlearningGAThread', 'UnlearningRLThread', 'UnlearningFTThread', 'UnlearningGAFTThread', 'UnlearningGASLFTThread', 'UnlearningGASLFTV2Thread', 'UnlearningSCRUBThread', 'UnlearningSalUnThread', 'UnlearningFisherThread', 'UnlearningHeadThread', 'UnlearningRetrainThread', 'UnlearningCustomThread']
\ No newline at end of file
@@ -0,0 +1,130 @@
+import threading
+import time
+import queue
+import sys
+
+from app.utils.distributed import launch_distributed_training
+
+
+class DistributedTrainingThread(threading.Thread):
+    """
+    Supervises a multi-process gloo training run and mirrors its progress
+    into a TrainingStatus or UnlearningStatus object.
+    """
+
+    def __init__(
+        self,
+        status,
+        num_processes,
+        batch_size,
+        learning_rate,
+        epochs,
+        forget_class,
+        model_name,
+        precision="fp32",
+        channels_last=False,
+        is_training=False
+    ):
+        threading.Thread.__init__(self)
+        self.status = status
+        self.num_processes = num_processes
+        self.epochs = epochs
+        self.config = {
+            "batch_size": batch_size,
+            "learning_rate": learning_rate,
+            "epochs": epochs,
+            "forget_class": forget_class,
+            "model_name": model_name,
+            "precision": precision,
+            "channels_last": channels_last,
+        }
+        self.is_training = is_training
+        self.exception = None
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def run(self):
+        try:
+            self.train_distributed()
+        except Exception as e:
+            self.exception = e
+            print(f"Distributed training error occurred: {str(e)}")
+
+    def train_distributed(self):
+        self.status.start_time = time.time()
+        self.status.total_epochs = self.epochs
+
+        process_context, progress_queue, stop_event = launch_distributed_training(
+            self.config, self.num_processes
+        )
+
+        finished = False
+        while not finished:
+            if self.stopped() and not stop_event.is_set():
+                print("\nStopping distributed training processes...")
+                stop_event.set()
+            # join() raises ProcessRaisedException if any rank failed
+            finished = process_context.join(timeout=0.5)
+            self._drain_progress(progress_queue)
+
+        if self.stopped():
+            if self.is_training:
+                self.status.is_training = False
+            else:
+                self.status.is_unlearning = False
+            print("\nDistributed training cancelled.")
+
+    def _drain_progress(self, progress_queue):
+        while True:
+            try:
+                message = progress_queue.get_nowait()
+            except queue.Empty:
+                return
+
+            if message["type"] == "done":
+                training_time = message["training_time"]
+                print(f"\nTotal training time: {training_time:.1f} seconds ({training_time/60:.1f} minutes)")
+                continue
+
+            self._update_status(message)
+
+    def _update_status(self, message):
+        epoch = message["epoch"]
+        train_loss = message["train_loss"]
+        train_accuracy = message["train_accuracy"]
+        test_accuracy = message["test_accuracy"]
+
+        self.status.current_epoch = epoch
+        if self.is_training:
+            self.status.progress = epoch / self.epochs * 100
+        self.status.current_loss = train_loss
+        self.status.current_accuracy = train_accuracy
+        self.status.test_loss = message["test_loss"]
+        self.status.test_accuracy = test_accuracy
+        self.status.train_class_accuracies = message["train_class_accuracies"]
+        self.status.test_class_accuracies = message["test_class_accuracies"]
+
+        if train_loss < self.status.best_loss:
+            self.status.best_loss = train_loss
+        if train_accuracy > self.status.best_accuracy:
+            self.status.best_accuracy = train_accuracy
+        if test_accuracy > self.status.best_test_accuracy:
+            self.status.best_test_accuracy = test_accuracy
+
+        # Estimate remaining time from training time only, as in the retrain thread
+        training_time = message["training_time"]
+        estimated_total_time = training_time / epoch * self.epochs
+        self.status.estimated_time_remaining = max(0, estimated_total_time - training_time)
+
+        print(f"\nEpoch [{epoch}/{self.epochs}] ({self.num_processes} processes)")
+        print(f"Training   - Loss: {train_loss:.4f}, Accuracy: {train_accuracy:.4f}")
+        print(f"Test - Loss: {message['test_loss']:.4f}, Accuracy: {test_accuracy:.4f}")
+        print(f"Best - Train: {self.status.best_accuracy:.4f}, Test: {self.status.best_test_accuracy:.4f}")
+        print(f"Learning Rate: {message['learning_rate']:.5f}")
+        print(f"ETA: {self.status.estimated_time_remaining:.1f}s")
+        sys.stdout.flush()
@@ -1,5 +1,6 @@
 import threading
 import asyncio
+import contextvars
 import time
 import sys
 import traceback
@@ -8,6 +9,7 @@ import os
 
 from app.utils.helpers import save_model
 from app.utils.evaluation import evaluate_model
+from app.utils.instrumentation import span
 
 class TrainingThread(threading.Thread):
     def __init__(self, 
@@ -24,6 +26,8 @@ class TrainingThread(threading.Thread):
                  dataset_name, 
                  learning_rate):
         threading.Thread.__init__(self)
+        # Run in the creator's context, so spans are recorded to its job
+        self._context = contextvars.copy_context()
         self.model = model
         self.train_loader = train_loader 
         self.test_loader = test_loader
@@ -50,7 +54,7 @@ class TrainingThread(threading.Thread):
         try:
             self.loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
-            self.loop.run_until_complete(self.train_model())
+            self._context.run(self.loop.run_until_complete, self.train_model())
         except Exception as e:
             self.exception = e
             print(f"Training error occurred: {str(e)}")
@@ -70,6 +74,7 @@ class TrainingThread(threading.Thread):
         test_accuracies = []
 
         for epoch in range(self.epochs):
+            epoch_span = span("train_epoch")
             self.model.train()
             running_loss = 0.0
             correct = 0
@@ -101,6 +106,7 @@ class TrainingThread(threading.Thread):
                     class_total[label] += 1
             
             self.scheduler.step()
+            epoch_span.finish(samples=total)
             train_loss = running_loss / len(self.train_loader)
             train_accuracy = correct / total
             train_class_accuracies = {
@@ -9,6 +9,7 @@ from app.utils.evaluation import (
 )
 from app.utils.visualization import compute_umap_embedding
 from app.utils.attack import process_attack_metrics
+from app.utils.instrumentation import span
 from app.utils.thread_base import BaseUnlearningThread
 from app.utils.thread_operations import (
     setup_umap_subset,
@@ -24,7 +25,13 @@ from app.utils.thread_operations import (
     update_epoch_metrics_collection,
     save_epoch_plots
 )
-from app.utils.layer_utils import apply_layer_modifications
+from app.utils.layer_utils import (
+    RESNET18_LAYER_GROUPS,
+    apply_layer_modifications,
+    set_frozen_batchnorm_eval,
+    split_resnet18_at_group
+)
+from app.utils.prefix_cache import build_prefix_feature_loader
 
 
 class UnlearningFTThread(BaseUnlearningThread):
@@ -46,7 +53,8 @@ class UnlearningFTThread(BaseUnlearningThread):
         base_weights_path,
         freeze_first_k_layers=0,
         reinit_last_k_layers=0,
-        enable_epoch_metrics=True
+        enable_epoch_metrics=True,
+        use_prefix_cache=True
     ):
         super().__init__()
         self.request = request
@@ -72,6 +80,7 @@ class UnlearningFTThread(BaseUnlearningThread):
         # Layer modification parameters
         self.freeze_first_k_layers = freeze_first_k_layers
         self.reinit_last_k_layers = reinit_last_k_layers
+        self.use_prefix_cache = use_prefix_cache
         
         # Epoch metrics configuration
         self.enable_epoch_metrics = enable_epoch_metrics
@@ -137,7 +146,9 @@ class UnlearningFTThread(BaseUnlearningThread):
         if self.enable_epoch_metrics:
             metrics_components = await initialize_epoch_metrics_system(
                 self.model, self.train_set, self.test_set, self.train_loader, self.device,
-                self.request.forget_class, True, True  # Enable both PS and MIA
+                self.request.forget_class, True, True,  # Enable both PS and MIA
+                # Reinitialized layers make the model differ from its checkpoint
+                baseline_path=None if self.reinit_last_k_layers > 0 else self.base_weights_path
             )
         
         # Collect epoch 0 metrics (initial state before training)
@@ -173,23 +184,37 @@ class UnlearningFTThread(BaseUnlearningThread):
         start_time = time.time()
         total_metrics_time = 0  # Accumulate metrics calculation time
 
+        # The frozen prefix produces the same outputs every epoch, so run it once
+        # and train only the remaining layer groups on its cached outputs
+        forward_module = self.model
+        retain_batches = self.retain_loader
+        prefix_cache = None
+        if self.use_prefix_cache and 0 < self.freeze_first_k_layers < len(RESNET18_LAYER_GROUPS):
+            prefix, forward_module = split_resnet18_at_group(self.model, self.freeze_first_k_layers)
+            prefix_cache = build_prefix_feature_loader(prefix, self.retain_loader, self.device)
+            retain_batches = prefix_cache
+
         for epoch in range(self.request.epochs):
+            epoch_span = span("train_epoch")
             self.model.train()
+            set_frozen_batchnorm_eval(self.model, self.freeze_first_k_layers)
             self.status.current_epoch = epoch + 1
             running_loss = 0.0
             total = 0
             correct = 0
             
             # FT-specific training: only on retain data
-            for i, (inputs, labels) in enumerate(self.retain_loader):
+            for i, (inputs, labels) in enumerate(retain_batches):
                 if self.stopped():
                     self.status.is_unlearning = False
                     print("\nTraining cancelled mid-batch.")
+                    if prefix_cache is not None:
+                        prefix_cache.close()
                     return
 
                 inputs, labels = inputs.to(self.device), labels.to(self.device)
                 self.optimizer.zero_grad()
-                outputs = self.model(inputs)
+                outputs = forward_module(inputs)
                 loss = self.criterion(outputs, labels)
                 loss.backward()
 
@@ -200,6 +225,8 @@ class UnlearningFTThread(BaseUnlearningThread):
                 total += labels.size(0)
                 correct += (predicted == labels).sum().item()
 
+            epoch_span.finish(samples=total)
+
             # Evaluate on forget loader after each epoch
             forget_epoch_loss, forget_epoch_acc = evaluate_on_forget_set(
                 self.model, self.forget_loader, self.criterion, self.device
@@ -249,6 +276,9 @@ class UnlearningFTThread(BaseUnlearningThread):
             # Update scheduler after each epoch
             self.scheduler.step()
 
+        if prefix_cache is not None:
+            prefix_cache.close()
+
         # Calculate pure training time (excluding metrics calculation)
         rte = time.time() - start_time - total_metrics_time
 
@@ -14,6 +14,7 @@ from app.config.settings import (
 	MAX_GRAD_NORM
 )
 from app.utils.attack import process_attack_metrics
+from app.utils.instrumentation import span
 from app.utils.thread_base import BaseUnlearningThread
 from app.utils.thread_operations import (
 	setup_umap_subset,
@@ -145,7 +146,9 @@ class UnlearningGAFTThread(BaseUnlearningThread):
         if self.enable_epoch_metrics:
             metrics_components = await initialize_epoch_metrics_system(
                 self.model, self.train_set, self.test_set, self.train_loader, self.device,
-                self.request.forget_class, True, True  # Enable both PS and MIA
+                self.request.forget_class, True, True,  # Enable both PS and MIA
+                # Reinitialized layers make the model differ from its checkpoint
+                baseline_path=None if self.reinit_last_k_layers > 0 else self.base_weights_path
             )
         
         # Collect epoch 0 metrics (initial state before training)
@@ -249,6 +252,7 @@ class UnlearningGAFTThread(BaseUnlearningThread):
 
         for epoch in range(self.request.epochs):
             epoch_start_time = time.time()  # Epoch 시작 시간
+            epoch_span = span("train_epoch")
             self.model.train()
             self.status.current_epoch = epoch + 1
             epoch_ga_loss = 0.0
@@ -257,7 +261,7 @@ class UnlearningGAFTThread(BaseUnlearningThread):
             ft_batches = 0
             
             # Stage 1: GA stage - Gradient Ascent on forget set
-            ga_stage_start = time.time()
+            ga_stage = span("train_ga")
             print(f"Epoch {epoch + 1}: Starting GA (Gradient Ascent) stage...")
             for i, (inputs, labels) in enumerate(self.forget_loader):
                 if self.check_stopped_and_return(self.status):
@@ -273,11 +277,11 @@ class UnlearningGAFTThread(BaseUnlearningThread):
                 epoch_ga_loss += (-loss.item())  # Store positive loss for display
                 ga_batches += 1
             
-            ga_stage_time = time.time() - ga_stage_start
+            ga_stage_time = ga_stage.finish(samples=len(self.forget_loader.dataset))
             print(f"  GA stage completed in {ga_stage_time:.2f}s ({ga_batches} batches)")
 
             # Stage 2: FT stage - Fine-tuning on retain set
-            ft_stage_start = time.time()
+            ft_stage = span("train_ft")
             print(f"Epoch {epoch + 1}: Starting FT (Fine-Tuning) stage...")
             for i, (inputs, labels) in enumerate(self.retain_loader):
                 if self.check_stopped_and_return(self.status):
@@ -292,7 +296,7 @@ class UnlearningGAFTThread(BaseUnlearningThread):
                 epoch_ft_loss += loss.item()
                 ft_batches += 1
             
-            ft_stage_time = time.time() - ft_stage_start
+            ft_stage_time = ft_stage.finish(samples=len(self.retain_loader.dataset))
             print(f"  FT stage completed in {ft_stage_time:.2f}s ({ft_batches} batches)")
 
             # Calculate average losses for this epoch
@@ -300,6 +304,10 @@ class UnlearningGAFTThread(BaseUnlearningThread):
             avg_ft_loss = epoch_ft_loss / ft_batches if ft_batches > 0 else 0.0
             combined_loss = (avg_ga_loss + avg_ft_loss) / 2.0  # Combined loss for status
             
+            epoch_span.finish(
+                samples=len(self.forget_loader.dataset) + len(self.retain_loader.dataset)
+            )
+
             # Evaluate on forget set to get forget accuracy
             _, forget_epoch_acc = evaluate_on_forget_set(
                 self.model, self.forget_loader, self.criterion, self.device
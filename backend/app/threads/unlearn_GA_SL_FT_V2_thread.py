@@ -14,6 +14,7 @@ from app.config.settings import (
 	MAX_GRAD_NORM
 )
 from app.utils.attack import process_attack_metrics
+from app.utils.instrumentation import span
 from app.utils.thread_base import BaseUnlearningThread
 from app.utils.layer_utils import apply_layer_modifications
 from app.utils.thread_operations import (
@@ -148,7 +149,9 @@ class UnlearningGASLFTV2Thread(BaseUnlearningThread):
         if self.enable_epoch_metrics:
             metrics_components = await initialize_epoch_metrics_system(
                 self.model, self.train_set, self.test_set, self.train_loader, self.device,
-                self.request.forget_class, True, True  # Enable both PS and MIA
+                self.request.forget_class, True, True,  # Enable both PS and MIA
+                # Reinitialized layers make the model differ from its checkpoint
+                baseline_path=None if self.reinit_last_k_layers > 0 else self.base_weights_path
             )
         
         # Collect epoch 0 metrics (initial state before training)
@@ -256,6 +259,7 @@ class UnlearningGASLFTV2Thread(BaseUnlearningThread):
 
         for epoch in range(self.request.epochs):
             epoch_start_time = time.time()  # Epoch 시작 시간
+            epoch_span = span("train_epoch")
             self.model.train()
             # Adjust current epoch based on whether initial FT was performed
             epoch_offset = 2 if self.reinit_last_k_layers > 0 else 1
@@ -266,7 +270,7 @@ class UnlearningGASLFTV2Thread(BaseUnlearningThread):
             mixed_batches = 0
             
             # Stage 1: GA stage - Gradient Ascent on forget set (with original GT labels)
-            ga_stage_start = time.time()
+            ga_stage = span("train_ga")
             print(f"Epoch {epoch + 1}: Starting GA (Gradient Ascent) stage...")
             for i, (inputs, labels) in enumerate(self.forget_loader):
                 if self.check_stopped_and_return(self.status):
@@ -282,11 +286,11 @@ class UnlearningGASLFTV2Thread(BaseUnlearningThread):
                 epoch_ga_loss += (-loss.item())  # Store positive loss for display
                 ga_batches += 1
             
-            ga_stage_time = time.time() - ga_stage_start
+            ga_stage_time = ga_stage.finish(samples=len(self.forget_loader.dataset))
             print(f"  GA stage completed in {ga_stage_time:.2f}s ({ga_batches} batches)")
 
             # Stage 2: Mixed SL+FT stage - Unified training on shuffled data
-            mixed_stage_start = time.time()
+            mixed_stage = span("train_mixed")
             print(f"Epoch {epoch + 1}: Starting Mixed SL+FT stage (unified training)...")
             
             for i, (inputs, labels, _) in enumerate(self.mixed_sl_ft_loader):
@@ -306,7 +310,7 @@ class UnlearningGASLFTV2Thread(BaseUnlearningThread):
                 epoch_mixed_loss += loss.item()
                 mixed_batches += 1
             
-            mixed_stage_time = time.time() - mixed_stage_start
+            mixed_stage_time = mixed_stage.finish(samples=len(self.mixed_sl_ft_loader.dataset))
             print(f"  Mixed stage completed in {mixed_stage_time:.2f}s ({mixed_batches} batches)")
 
             # Calculate average losses for this epoch
@@ -314,6 +318,10 @@ class UnlearningGASLFTV2Thread(BaseUnlearningThread):
             avg_mixed_loss = epoch_mixed_loss / mixed_batches if mixed_batches > 0 else 0.0
             combined_loss = (avg_ga_loss + avg_mixed_loss) / 2.0  # Combined loss for status
             
+            epoch_span.finish(
+                samples=len(self.forget_loader.dataset) + len(self.mixed_sl_ft_loader.dataset)
+            )
+
             # Evaluate on forget set to get forget accuracy
             _, forget_epoch_acc = evaluate_on_forget_set(
                 self.model, self.forget_loader, self.criterion, self.device
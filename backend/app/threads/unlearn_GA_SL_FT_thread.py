@@ -14,6 +14,7 @@ from app.config.settings import (
 	MAX_GRAD_NORM
 )
 from app.utils.attack import process_attack_metrics
+from app.utils.instrumentation import span
 from app.utils.thread_base import BaseUnlearningThread
 from app.utils.thread_operations import (
 	setup_umap_subset,
@@ -151,7 +152,9 @@ class UnlearningGASLFTThread(BaseUnlearningThread):
         if self.enable_epoch_metrics:
             metrics_components = await initialize_epoch_metrics_system(
                 self.model, self.train_set, self.test_set, self.train_loader, self.device,
-                self.request.forget_class, True, True  # Enable both PS and MIA
+                self.request.forget_class, True, True,  # Enable both PS and MIA
+                # Reinitialized layers make the model differ from its checkpoint
+                baseline_path=None if self.reinit_last_k_layers > 0 else self.base_weights_path
             )
         
         # Collect epoch 0 metrics (initial state before training)
@@ -258,6 +261,7 @@ class UnlearningGASLFTThread(BaseUnlearningThread):
         print("=" * 60)
 
         for epoch in range(self.request.epochs):
+            epoch_span = span("train_epoch")
             self.model.train()
             # Adjust current epoch based on whether initial FT was performed
             epoch_offset = 2 if self.reinit_last_k_layers > 0 else 1
@@ -321,6 +325,12 @@ class UnlearningGASLFTThread(BaseUnlearningThread):
             avg_ft_loss = epoch_ft_loss / ft_batches if ft_batches > 0 else 0.0
             combined_loss = (avg_ga_loss + avg_sl_loss + avg_ft_loss) / 3.0  # Combined loss for status
             
+            epoch_span.finish(
+                samples=len(self.forget_loader.dataset)
+                + len(self.second_logit_loader.dataset)
+                + len(self.retain_loader.dataset)
+            )
+
             # Evaluate on forget set to get forget accuracy
             _, forget_epoch_acc = evaluate_on_forget_set(
                 self.model, self.forget_loader, self.criterion, self.device
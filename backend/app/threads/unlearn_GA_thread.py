@@ -14,6 +14,7 @@ from app.config.settings import (
 	MAX_GRAD_NORM
 )
 from app.utils.attack import process_attack_metrics
+from app.utils.instrumentation import span
 from app.utils.thread_base import BaseUnlearningThread
 from app.utils.thread_operations import (
 	setup_umap_subset,
@@ -27,7 +28,13 @@ from app.utils.thread_operations import (
 	update_epoch_metrics_collection,
 	save_epoch_plots
 )
-from app.utils.layer_utils import apply_layer_modifications
+from app.utils.layer_utils import (
+	RESNET18_LAYER_GROUPS,
+	apply_layer_modifications,
+	set_frozen_batchnorm_eval,
+	split_resnet18_at_group
+)
+from app.utils.prefix_cache import build_prefix_feature_loader
 
 class UnlearningGAThread(BaseUnlearningThread):
     def __init__(
@@ -48,7 +55,8 @@ class UnlearningGAThread(BaseUnlearningThread):
         freeze_first_k_layers=0,
         freeze_last_k_layers=0,
         reinit_last_k_layers=0,
-        enable_epoch_metrics=True
+        enable_epoch_metrics=True,
+        use_prefix_cache=True
     ):
         super().__init__()
         self.request = request
@@ -74,6 +82,7 @@ class UnlearningGAThread(BaseUnlearningThread):
         self.freeze_first_k_layers = freeze_first_k_layers
         self.freeze_last_k_layers = freeze_last_k_layers
         self.reinit_last_k_layers = reinit_last_k_layers
+        self.use_prefix_cache = use_prefix_cache
         
         # Epoch metrics configuration
         self.enable_epoch_metrics = enable_epoch_metrics
@@ -137,7 +146,9 @@ class UnlearningGAThread(BaseUnlearningThread):
         if self.enable_epoch_metrics:
             metrics_components = await initialize_epoch_metrics_system(
                 self.model, self.train_set, self.test_set, self.train_loader, self.device,
-                self.request.forget_class, True, True  # Enable both PS and MIA
+                self.request.forget_class, True, True,  # Enable both PS and MIA
+                # Reinitialized layers make the model differ from its checkpoint
+                baseline_path=None if self.reinit_last_k_layers > 0 else self.base_weights_path
             )
         
         # Collect epoch 0 metrics (initial state before training)
@@ -173,18 +184,32 @@ class UnlearningGAThread(BaseUnlearningThread):
         start_time = time.time()
         total_metrics_time = 0  # Accumulate metrics calculation time
 
+        # The frozen prefix produces the same outputs every epoch, so run it once
+        # and train only the remaining layer groups on its cached outputs
+        forward_module = self.model
+        forget_batches = self.forget_loader
+        prefix_cache = None
+        if self.use_prefix_cache and 0 < self.freeze_first_k_layers < len(RESNET18_LAYER_GROUPS):
+            prefix, forward_module = split_resnet18_at_group(self.model, self.freeze_first_k_layers)
+            prefix_cache = build_prefix_feature_loader(prefix, self.forget_loader, self.device)
+            forget_batches = prefix_cache
+
         for epoch in range(self.request.epochs):
+            epoch_span = span("train_epoch")
             self.model.train()
+            set_frozen_batchnorm_eval(self.model, self.freeze_first_k_layers)
             running_loss = 0.0
             correct = 0
             total = 0
             
-            for i, (inputs, labels) in enumerate(self.forget_loader):
+            for i, (inputs, labels) in enumerate(forget_batches):
                 if self.check_stopped_and_return(self.status):
+                    if prefix_cache is not None:
+                        prefix_cache.close()
                     return
                 inputs, labels = inputs.to(self.device), labels.to(self.device)
                 self.optimizer.zero_grad()
-                outputs = self.model(inputs)
+                outputs = forward_module(inputs)
                 loss = -self.criterion(outputs, labels)
                 loss.backward()
 
@@ -196,6 +221,7 @@ class UnlearningGAThread(BaseUnlearningThread):
                 total += labels.size(0)
                 correct += (predicted == labels).sum().item()
 
+            epoch_span.finish(samples=total)
             epoch_loss = running_loss / len(self.forget_loader)
             epoch_acc = correct / total
             self.scheduler.step()
@@ -240,6 +266,9 @@ class UnlearningGAThread(BaseUnlearningThread):
                 additional_metrics
             )
 
+        if prefix_cache is not None:
+            prefix_cache.close()
+
         # Calculate pure training time (excluding metrics calculation)
         rte = time.time() - start_time - total_metrics_time
         
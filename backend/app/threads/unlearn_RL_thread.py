@@ -1,10 +1,7 @@
 import torch
 import time
 import uuid
-from app.utils.helpers import (
-	format_distribution,
-	compress_prob_array
-)
+from app.utils.helpers import format_distribution
 from app.utils.evaluation import (
     calculate_cka_similarity,
     evaluate_model_with_distributions,
@@ -12,6 +9,7 @@ from app.utils.evaluation import (
 )
 from app.utils.visualization import compute_umap_embedding
 from app.utils.attack import process_attack_metrics
+from app.utils.instrumentation import span
 from app.utils.thread_base import BaseUnlearningThread
 from app.utils.thread_operations import (
 	setup_umap_subset,
@@ -110,7 +108,8 @@ class UnlearningRLThread(BaseUnlearningThread):
         if self.enable_epoch_metrics:
             metrics_components = await initialize_epoch_metrics_system(
                 self.model, self.train_set, self.test_set, self.train_loader, self.device,
-                self.request.forget_class, True, True  # Enable both PS and MIA
+                self.request.forget_class, True, True,  # Enable both PS and MIA
+                baseline_path=self.base_weights_path
             )
         
         # Collect epoch 0 metrics (initial state before training)
@@ -147,6 +146,7 @@ class UnlearningRLThread(BaseUnlearningThread):
         total_metrics_time = 0  # Accumulate metrics calculation time
 
         for epoch in range(self.request.epochs):
+            epoch_span = span("train_epoch")
             self.model.train()
             self.status.current_epoch = epoch + 1
             running_loss = 0.0
@@ -183,6 +183,8 @@ class UnlearningRLThread(BaseUnlearningThread):
                 total += labels.size(0)
                 correct += (predicted == labels).sum().item()
 
+            epoch_span.finish(samples=total)
+
             # Evaluate on forget loader after each epoch
             forget_epoch_loss, forget_epoch_acc = evaluate_on_forget_set(
                 self.model, self.forget_loader, self.criterion, self.device
@@ -3,6 +3,7 @@ import torch.nn.functional as F
 import time
 import uuid
 from app.utils.helpers import format_distribution
+from app.utils.model_pool import get_state_dict
 from app.models import get_resnet18
 from app.utils.evaluation import (
     calculate_cka_similarity,
@@ -11,7 +12,9 @@ from app.utils.evaluation import (
 )
 from app.utils.visualization import compute_umap_embedding
 from app.utils.attack import process_attack_metrics
+from app.utils.instrumentation import span
 from app.utils.thread_base import BaseUnlearningThread
+from app.utils.fisher import compute_fisher_information
 from app.utils.thread_operations import (
     setup_umap_subset,
     update_training_status,
@@ -82,48 +85,19 @@ class UnlearningSCRUBThread(BaseUnlearningThread):
 
     def _create_teacher_model(self):
         """Create teacher model for knowledge distillation"""
-        teacher_model = get_resnet18().to(self.device)
-        teacher_model.load_state_dict(torch.load(self.base_weights_path, map_location=self.device))
+        teacher_model = get_resnet18(
+            precision=self.model.precision,
+            channels_last=self.model.channels_last
+        ).to(self.device)
+        teacher_model.load_state_dict(get_state_dict(self.base_weights_path))
         teacher_model.eval()
         return teacher_model
 
     def _compute_fisher_information(self, data_loader, num_samples=1000):
         """Compute Fisher Information Matrix for important parameters"""
-        self.model.eval()
-        fisher_dict = {}
-        
-        # Initialize Fisher information dictionary
-        for name, param in self.model.named_parameters():
-            if param.requires_grad:
-                fisher_dict[name] = torch.zeros_like(param)
-        
-        sample_count = 0
-        for inputs, labels in data_loader:
-            if sample_count >= num_samples:
-                break
-                
-            inputs, labels = inputs.to(self.device), labels.to(self.device)
-            
-            # Forward pass
-            outputs = self.model(inputs)
-            loss = self.criterion(outputs, labels)
-            
-            # Backward pass to compute gradients
-            self.model.zero_grad()
-            loss.backward()
-            
-            # Accumulate Fisher information (square of gradients)
-            for name, param in self.model.named_parameters():
-                if param.requires_grad and param.grad is not None:
-                    fisher_dict[name] += param.grad.data ** 2
-            
-            sample_count += inputs.size(0)
-        
-        # Normalize by number of samples
-        for name in fisher_dict:
-            fisher_dict[name] /= sample_count
-            
-        return fisher_dict
+        return compute_fisher_information(
+            self.model, data_loader, self.criterion, self.device, num_samples=num_samples
+        )
 
     def _scrub_loss(self, outputs, labels, teacher_outputs, is_forget_batch=False):
         """Compute SCRUB loss with knowledge distillation and selective forgetting"""
@@ -179,7 +153,8 @@ class UnlearningSCRUBThread(BaseUnlearningThread):
         if self.enable_epoch_metrics:
             metrics_components = await initialize_epoch_metrics_system(
                 self.model, self.train_set, self.test_set, self.train_loader, self.device,
-                self.request.forget_class, True, True  # Enable both PS and MIA
+                self.request.forget_class, True, True,  # Enable both PS and MIA
+                baseline_path=self.base_weights_path
             )
         
         # Compute Fisher Information Matrix for important parameters
@@ -221,6 +196,7 @@ class UnlearningSCRUBThread(BaseUnlearningThread):
         total_metrics_time = 0  # Accumulate metrics calculation time
 
         for epoch in range(self.request.epochs):
+            epoch_span = span("train_epoch")
             self.model.train()
             self.status.current_epoch = epoch + 1
             running_loss = 0.0
@@ -254,10 +230,15 @@ class UnlearningSCRUBThread(BaseUnlearningThread):
                     loss.backward()
                     
                     # Apply Fisher-weighted gradient clipping
-                    for name, param in self.model.named_parameters():
-                        if param.requires_grad and param.grad is not None and name in fisher_dict:
-                            # Scale gradients by inverse Fisher information (selective dampening)
-                            param.grad.data *= (1.0 / (fisher_dict[name] + 1e-8))
+                    # Scale gradients by inverse Fisher information (selective dampening)
+                    scaled = [
+                        (param.grad, fisher_dict[name])
+                        for name, param in self.model.named_parameters()
+                        if param.requires_grad and param.grad is not None and name in fisher_dict
+                    ]
+                    if scaled:
+                        grads, fishers = zip(*scaled)
+                        torch._foreach_div_(list(grads), torch._foreach_add(list(fishers), 1e-8))
                     
                     # Gradient clipping
                     torch.nn.utils.clip_grad_norm_(self.model.parameters(), max_norm=1.0)
@@ -307,6 +288,8 @@ class UnlearningSCRUBThread(BaseUnlearningThread):
             if self.scheduler:
                 self.scheduler.step()
 
+            epoch_span.finish(samples=total)
+
             # Evaluate on forget loader after each epoch
             forget_epoch_loss, forget_epoch_acc = evaluate_on_forget_set(
                 self.model, self.forget_loader, self.criterion, self.device
@@ -9,6 +9,7 @@ from app.utils.evaluation import (
 )
 from app.utils.visualization import compute_umap_embedding
 from app.utils.attack import process_attack_metrics
+from app.utils.instrumentation import span, timed
 from app.utils.thread_base import BaseUnlearningThread
 from app.utils.thread_operations import (
     setup_umap_subset,
@@ -76,6 +77,7 @@ class UnlearningSalUnThread(BaseUnlearningThread):
         # Initialize saliency mask
         self.saliency_mask = None
 
+    @timed("saliency")
     def _compute_gradient_saliency(self):
         """Compute gradient-based weight saliency map using forget data"""
         print("Computing gradient-based weight saliency...")
@@ -205,7 +207,8 @@ class UnlearningSalUnThread(BaseUnlearningThread):
         if self.enable_epoch_metrics:
             metrics_components = await initialize_epoch_metrics_system(
                 self.model, self.train_set, self.test_set, self.train_loader, self.device,
-                self.request.forget_class, True, True  # Enable both PS and MIA
+                self.request.forget_class, True, True,  # Enable both PS and MIA
+                baseline_path=self.base_weights_path
             )
         
         # Step 1: Compute gradient-based saliency mask
@@ -247,6 +250,7 @@ class UnlearningSalUnThread(BaseUnlearningThread):
 
         # Step 2: SalUn Unlearning Training Loop (Sequential: Forget → Retain, following official CIFAR-10 approach)
         for epoch in range(self.request.epochs):
+            epoch_span = span("train_epoch")
             self.model.train()
             self.status.current_epoch = epoch + 1
             running_loss = 0.0
@@ -295,6 +299,8 @@ class UnlearningSalUnThread(BaseUnlearningThread):
             if self.scheduler:
                 self.scheduler.step()
 
+            epoch_span.finish(samples=total)
+
             # Evaluate on forget loader after each epoch
             forget_epoch_loss, forget_epoch_acc = evaluate_on_forget_set(
                 self.model, self.forget_loader, self.criterion, self.device
@@ -1,8 +1,8 @@
 import threading
 import asyncio
+import contextvars
 import torch
 import time
-import json
 import os
 import uuid
 
@@ -15,9 +15,13 @@ from app.utils.attack import process_attack_metrics
 from app.utils.visualization import compute_umap_embedding
 from app.utils.helpers import (
 	format_distribution, 
-	compress_prob_array, 
 	save_model
 )
+from app.utils.checkpoint_io import checkpoint_stem
+from app.utils.experiment_index import index_result
+from app.utils.instrumentation import job_summary, span
+from app.utils.point_columns import save_result_files
+from app.utils.thread_operations import prepare_detailed_results
 from app.config import (
 	UMAP_DATA_SIZE, 
 	UMAP_DATASET, 
@@ -37,6 +41,8 @@ class UnlearningCustomThread(threading.Thread):
                  device,
                  base_weights):
         threading.Thread.__init__(self)
+        # Run in the creator's context, so spans are recorded to its job
+        self._context = contextvars.copy_context()
         self.forget_class = forget_class
         self.is_training_eval = (forget_class == -1)
         self.status = status
@@ -65,7 +71,7 @@ class UnlearningCustomThread(threading.Thread):
         try:
             self.loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
-            self.loop.run_until_complete(self.async_run())
+            self._context.run(self.loop.run_until_complete, self.async_run())
         except Exception as e:
             self.exception = e
         finally:
@@ -253,20 +259,10 @@ class UnlearningCustomThread(threading.Thread):
         )
         
         # Detailed results preparation
-        detailed_results = []
-        for i in range(len(umap_subset)):
-            original_index = selected_indices[i]
-            ground_truth = umap_subset.dataset.targets[original_index]
-            is_forget = ground_truth == self.forget_class
-            detailed_results.append([
-                int(ground_truth),                             # gt
-                int(predicted_labels[i]),                      # pred
-                int(original_index),                           # img index
-                1 if is_forget else 0,                         # forget flag as binary
-                round(float(umap_embedding[i][0]), 2),         # x coordinate
-                round(float(umap_embedding[i][1]), 2),         # y coordinate
-                compress_prob_array(probs[i].tolist()),        # compressed probabilities
-            ])
+        detailed_results = prepare_detailed_results(
+            umap_subset, selected_indices, predicted_labels,
+            umap_embedding, probs, self.forget_class
+        )
 
         # Decode comment can be updated to:
         # function decodeDetailedResults(compressedArray) {
@@ -307,7 +303,7 @@ class UnlearningCustomThread(threading.Thread):
             "ID": self.status.recent_id,
             "FC": "N/A" if self.is_training_eval else self.forget_class,
             "Type": "Pretrained" if self.is_training_eval else "Unlearned", 
-            "Base": self.base_weights.replace('.pth', ''),
+            "Base": checkpoint_stem(self.base_weights),
             "Method": "Custom",
             "Epoch": "N/A",
             "BS": "N/A",
@@ -338,15 +334,21 @@ class UnlearningCustomThread(threading.Thread):
         forget_class_dir = os.path.join('data', str(self.forget_class))
         os.makedirs(forget_class_dir, exist_ok=True)
 
-        result_path = os.path.join(forget_class_dir, f'{results["ID"]}.json')
-        with open(result_path, 'w') as f:
-            json.dump(results, f, indent=2)
+        with span("model_save"):
+            save_model(
+                model=self.model, 
+                forget_class=self.forget_class,
+                model_name=self.status.recent_id
+            )
 
-        save_model(
-            model=self.model, 
-            forget_class=self.forget_class,
-            model_name=self.status.recent_id
-        )
+        timings = job_summary()
+        if timings is not None:
+            results["timings"] = timings
+
+        result_path = os.path.join(forget_class_dir, f'{results["ID"]}.json')
+        with span("serialize"):
+            save_result_files(results, result_path)
+            index_result(self.forget_class, results, result_path)
         
         print(f"Results saved to {result_path}")
         print(f"Custom unlearning inference completed at {time.time() - start_time:.3f} seconds")
@@ -0,0 +1,328 @@
+import torch
+import time
+import uuid
+from app.utils.helpers import format_distribution
+from app.utils.evaluation import (
+    calculate_cka_similarity,
+    evaluate_model_with_distributions,
+    get_layer_activations_and_predictions
+)
+from app.utils.visualization import compute_umap_embedding
+from app.utils.attack import process_attack_metrics
+from app.utils.thread_base import BaseUnlearningThread
+from app.utils.thread_operations import (
+    setup_umap_subset,
+    update_training_status,
+    prepare_detailed_results,
+    create_base_results_dict,
+    save_results_and_model,
+    print_epoch_progress,
+    evaluate_on_forget_set,
+    calculate_accuracy_metrics
+)
+from app.utils.fisher import compute_fisher_information, compute_mean_gradient
+
+
+class UnlearningFisherThread(BaseUnlearningThread):
+    def __init__(
+        self,
+        request,
+        status,
+        model_after,
+        retain_loader,
+        forget_loader,
+        train_loader,
+        test_loader,
+        train_set,
+        test_set,
+        criterion,
+        device,
+        base_weights_path,
+        fisher_config
+    ):
+        super().__init__()
+        self.request = request
+        self.status = status
+        self.model = model_after
+
+        self.retain_loader = retain_loader
+        self.forget_loader = forget_loader
+        self.train_loader = train_loader
+        self.test_loader = test_loader
+
+        self.train_set = train_set
+        self.test_set = test_set
+
+        self.criterion = criterion
+        self.device = device
+        self.base_weights_path = base_weights_path
+        self.num_classes = 10
+        self.remain_classes = [i for i in range(self.num_classes) if i != self.request.forget_class]
+
+        # Fisher-specific hyperparameters
+        self.damping = fisher_config['damping']
+        self.noise_scale = fisher_config['noise_scale']
+        self.num_retain_samples = fisher_config['num_retain_samples']
+
+    def _apply_fisher_update(self, retain_fisher, forget_gradient):
+        """
+        One-shot Newton-style forgetting step.
+
+        Moves the weights along the forget-set gradient preconditioned by the
+        inverse (damped) retain-set Fisher diagonal, so directions the retain
+        data is insensitive to change the most:
+            theta += lr * g_forget / (F_retain + damping)
+        and optionally adds Gaussian noise scaled by (F_retain + damping)^(-1/4).
+        """
+        names = [name for name, param in self.model.named_parameters() if name in retain_fisher]
+        params = dict(self.model.named_parameters())
+        weights = [params[name].data for name in names]
+        preconditioner = torch._foreach_add([retain_fisher[name] for name in names], self.damping)
+
+        step = torch._foreach_div([forget_gradient[name] for name in names], preconditioner)
+        torch._foreach_add_(weights, step, alpha=self.request.learning_rate)
+
+        if self.noise_scale > 0:
+            noise_std = torch._foreach_pow(preconditioner, -0.25)
+            noise = [torch.randn_like(weight) for weight in weights]
+            torch._foreach_mul_(noise, noise_std)
+            torch._foreach_add_(weights, noise, alpha=self.noise_scale)
+
+    async def async_main(self):
+        print(f"Starting Fisher unlearning for class {self.request.forget_class}...")
+        self.status.progress = "Unlearning"
+        self.status.method = "Fisher"
+        self.status.recent_id = uuid.uuid4().hex[:4]
+        self.status.total_epochs = 1
+
+        umap_subset, umap_subset_loader, selected_indices = setup_umap_subset(
+            self.train_set, self.test_set, self.num_classes
+        )
+
+        # Start timing after all preprocessing
+        start_time = time.time()
+
+        # Single pass over the retain set for the Fisher diagonal
+        print("Computing retain-set Fisher information")
+        retain_fisher = compute_fisher_information(
+            self.model, self.retain_loader, self.criterion, self.device,
+            num_samples=self.num_retain_samples
+        )
+        if self.check_stopped_and_return(self.status):
+            return
+
+        # Single pass over the forget set for its mean gradient
+        print("Computing forget-set gradient")
+        forget_gradient = compute_mean_gradient(
+            self.model, self.forget_loader, self.criterion, self.device
+        )
+        if self.check_stopped_and_return(self.status):
+            return
+
+        with torch.no_grad():
+            self._apply_fisher_update(retain_fisher, forget_gradient)
+        del retain_fisher, forget_gradient
+
+        forget_loss, forget_acc = evaluate_on_forget_set(
+            self.model, self.forget_loader, self.criterion, self.device
+        )
+        update_training_status(
+            self.status, 0, 1, start_time, forget_loss, forget_acc
+        )
+        print_epoch_progress(
+            1, 1, forget_loss, forget_acc,
+            learning_rate=self.request.learning_rate,
+            eta=self.status.estimated_time_remaining
+        )
+
+        rte = time.time() - start_time
+
+        if self.check_stopped_and_return(self.status):
+            return
+
+        # Evaluate on train set
+        self.status.progress = "Evaluating Train Set"
+        print("Start Train set evaluation")
+        (
+            train_loss,
+            train_accuracy,
+            train_class_accuracies, 
+            train_label_dist, 
+            train_conf_dist
+        ) = await evaluate_model_with_distributions(
+            model=self.model, 
+            data_loader=self.train_loader,
+            criterion=self.criterion, 
+            device=self.device
+        )
+
+        # Update training evaluation status for remain classes only
+        self.status.p_training_loss = train_loss
+        remain_train_accuracy = sum(train_class_accuracies[i] for i in self.remain_classes) / len(self.remain_classes)
+        self.status.p_training_accuracy = remain_train_accuracy
+
+        unlearn_accuracy = train_class_accuracies[self.request.forget_class]
+        remain_accuracy = round(
+            sum(train_class_accuracies[i] for i in self.remain_classes) / len(self.remain_classes), 3
+        )
+
+        print("Train Class Accuracies:")
+        for i, acc in train_class_accuracies.items():
+            print(f"  Class {i}: {acc:.3f}")
+        print(f"Train set evaluation finished at {time.time() - start_time:.3f} seconds")
+
+        if self.stopped():
+            return
+        
+        # Evaluate on test set
+        self.status.progress = "Evaluating Test Set"
+        print("Start Test set evaluation")
+        (
+            test_loss, 
+            test_accuracy, 
+            test_class_accuracies, 
+            test_label_dist, 
+            test_conf_dist
+        ) = await evaluate_model_with_distributions(
+            model=self.model, 
+            data_loader=self.test_loader, 
+            criterion=self.criterion, 
+            device=self.device
+        )
+
+        # Update test evaluation status for remain classes only
+        self.status.p_test_loss = test_loss
+        remain_test_accuracy = sum(test_class_accuracies[i] for i in self.remain_classes) / len(self.remain_classes)
+        self.status.p_test_accuracy = remain_test_accuracy
+
+        print("Test Class Accuracies:")
+        for i, acc in test_class_accuracies.items():
+            print(f"  Class {i}: {acc:.3f}")
+        print(f"Test set evaluation finished at {time.time() - start_time:.3f} seconds")
+
+        if self.check_stopped_and_return(self.status):
+            return
+        
+        # UMAP and activation calculation
+        self.status.progress = "Computing UMAP"
+        
+        print("Computing layer activations")
+        (
+            activations, 
+            predicted_labels, 
+            probs, 
+        ) = await get_layer_activations_and_predictions(
+            model=self.model,
+            data_loader=umap_subset_loader,
+            device=self.device,
+        )
+
+        # UMAP embedding computation
+        print("Computing UMAP embedding")
+        forget_labels = torch.tensor([label == self.request.forget_class for _, label in umap_subset])
+        umap_embedding = await compute_umap_embedding(
+            activation=activations, 
+            labels=predicted_labels, 
+            forget_class=self.request.forget_class,
+            forget_labels=forget_labels
+        )
+        
+        # Process attack metrics using the same umap_subset_loader (for UI)
+        print("Processing attack metrics on UMAP subset")
+        values, attack_results, fqs = await process_attack_metrics(
+            model=self.model, 
+            data_loader=umap_subset_loader, 
+            device=self.device, 
+            forget_class=self.request.forget_class,
+            create_plots=False  # No plots for UI data
+        )
+        
+        # Calculate Privacy Score on full dataset for final results
+        print("Calculating Privacy Score on full dataset")
+        _, _, final_fqs = await process_attack_metrics(
+            model=self.model, 
+            data_loader=self.train_loader, 
+            device=self.device, 
+            forget_class=self.request.forget_class,
+            create_plots=False
+        )
+        
+        # Generate distribution plots on full forget class data (for analysis)
+        print("Generating distribution plots on full forget class data")
+        from app.utils.attack_full_dataset import calculate_model_metrics
+        await calculate_model_metrics(
+            model=self.model,
+            data_loader=self.train_loader,
+            device=self.device,
+            forget_class=self.request.forget_class,
+            t1=2.0,
+            t2=1.0,
+            create_plots=True,
+            model_name="Unlearn"
+        )
+
+        # CKA similarity calculation
+        self.status.progress = "Calculating CKA Similarity"
+        print("Calculating CKA similarity")
+        cka_results = await calculate_cka_similarity(
+            model_after=self.model,
+            forget_class=self.request.forget_class,
+            device=self.device,
+        )
+
+        # Calculate accuracy metrics after both train and test evaluations
+        accuracy_metrics = calculate_accuracy_metrics(
+            train_class_accuracies, test_class_accuracies, 
+            self.request.forget_class, self.num_classes
+        )
+        
+        # Prepare detailed results
+        self.status.progress = "Preparing Results"
+        detailed_results = prepare_detailed_results(
+            umap_subset, selected_indices, predicted_labels, 
+            umap_embedding, probs, self.request.forget_class
+        )
+        
+        test_unlearn_accuracy = test_class_accuracies[self.request.forget_class]
+        test_remain_accuracy = round(
+           sum(test_class_accuracies[i] for i in self.remain_classes) / 9.0, 3
+        )
+
+        # Create results dictionary
+        results = create_base_results_dict(
+            self.status, self.request.forget_class, self.base_weights_path, 
+            "Fisher", self.request
+        )
+        
+        results.update({
+            "UA": round(unlearn_accuracy, 3),
+            "RA": remain_accuracy,
+            "TUA": round(test_unlearn_accuracy, 3),
+            "TRA": test_remain_accuracy,
+            "RTE": round(rte, 1),
+            "FQS": final_fqs,
+            "accs": [round(v, 3) for v in train_class_accuracies.values()],
+            "label_dist": format_distribution(train_label_dist),
+            "conf_dist": format_distribution(train_conf_dist),
+            "t_accs": [round(v, 3) for v in test_class_accuracies.values()],
+            "t_label_dist": format_distribution(test_label_dist),
+            "t_conf_dist": format_distribution(test_conf_dist),
+            "cka": cka_results.get("similarity"),
+            "cka_retrain": cka_results.get("similarity_retrain"),
+            "points": detailed_results,
+            "attack": {
+                "values": values,
+                "results": attack_results
+            },
+            "fisher_damping": self.damping,  # Add Fisher-specific info
+            "fisher_noise_scale": self.noise_scale
+        })
+        
+        # Save results and model
+        result_path = save_results_and_model(
+            results, self.model, self.request.forget_class, self.status
+        )
+        
+        print(f"Results saved to {result_path}")
+        print("Fisher unlearning inference completed!")
+        self.status.progress = "Completed"
\ No newline at end of file
@@ -0,0 +1,313 @@
+import torch
+import torch.nn.functional as F
+import time
+import uuid
+from app.utils.helpers import format_distribution
+from app.utils.evaluation import (
+    calculate_cka_similarity,
+    evaluate_model_with_distributions,
+    get_layer_activations_and_predictions
+)
+from app.utils.visualization import compute_umap_embedding
+from app.utils.attack import process_attack_metrics
+from app.utils.thread_base import BaseUnlearningThread
+from app.utils.thread_operations import (
+    setup_umap_subset,
+    update_training_status,
+    prepare_detailed_results,
+    create_base_results_dict,
+    save_results_and_model,
+    print_epoch_progress,
+    calculate_accuracy_metrics
+)
+from app.utils.head_only import extract_penultimate_features, train_linear_head
+from app.config import MOMENTUM, WEIGHT_DECAY
+
+
+class UnlearningHeadThread(BaseUnlearningThread):
+    def __init__(
+        self,
+        request,
+        status,
+        model_after,
+        train_loader,
+        test_loader,
+        train_set,
+        test_set,
+        criterion,
+        device,
+        base_weights_path,
+        head_batch_size=None,
+        saliency_threshold=0.5
+    ):
+        super().__init__()
+        self.request = request
+        self.status = status
+        self.model = model_after
+
+        self.train_loader = train_loader
+        self.test_loader = test_loader
+
+        self.train_set = train_set
+        self.test_set = test_set
+
+        self.criterion = criterion
+        self.device = device
+        self.base_weights_path = base_weights_path
+        self.num_classes = 10
+        self.remain_classes = [i for i in range(self.num_classes) if i != self.request.forget_class]
+
+        # Head-only parameters
+        self.head_batch_size = head_batch_size
+        self.saliency_threshold = saliency_threshold
+
+    async def async_main(self):
+        print(f"Starting head-only {self.request.head_method} unlearning for class {self.request.forget_class}...")
+        self.status.progress = "Unlearning"
+        self.status.method = f"Head-Only {self.request.head_method}"
+        self.status.recent_id = uuid.uuid4().hex[:4]
+        self.status.total_epochs = self.request.epochs
+
+        umap_subset, umap_subset_loader, selected_indices = setup_umap_subset(
+            self.train_set, self.test_set, self.num_classes
+        )
+
+        # Start timing after all preprocessing (feature extraction is part of the run)
+        start_time = time.time()
+
+        # The backbone is frozen in head-only mode, so its avgpool features are
+        # extracted once and every epoch only trains the fc layer on them
+        print("Extracting penultimate features")
+        features, labels = extract_penultimate_features(
+            self.model, self.train_loader, self.device
+        )
+        features, labels = features.to(self.device), labels.to(self.device)
+        forget_mask = labels == self.request.forget_class
+        forget_features, forget_labels = features[forget_mask], labels[forget_mask]
+        print(f"Feature extraction finished at {time.time() - start_time:.3f} seconds")
+
+        def on_epoch_end(epoch, epoch_loss):
+            with torch.no_grad():
+                forget_outputs = self.model.fc(forget_features)
+                forget_epoch_loss = F.cross_entropy(forget_outputs, forget_labels).item()
+                forget_epoch_acc = (forget_outputs.argmax(1) == forget_labels).float().mean().item()
+
+            update_training_status(
+                self.status, epoch, self.request.epochs, start_time,
+                forget_epoch_loss, forget_epoch_acc
+            )
+            print_epoch_progress(
+                epoch + 1, self.request.epochs, forget_epoch_loss, forget_epoch_acc,
+                learning_rate=self.request.learning_rate,
+                eta=self.status.estimated_time_remaining
+            )
+
+        train_linear_head(
+            self.model.fc,
+            features[~forget_mask], labels[~forget_mask],
+            forget_features, forget_labels,
+            self.request.forget_class,
+            method=self.request.head_method,
+            epochs=self.request.epochs,
+            learning_rate=self.request.learning_rate,
+            batch_size=self.head_batch_size,
+            momentum=MOMENTUM,
+            weight_decay=WEIGHT_DECAY,
+            saliency_threshold=self.saliency_threshold,
+            num_classes=self.num_classes,
+            stop_fn=self.stopped,
+            epoch_callback=on_epoch_end
+        )
+        del features, labels, forget_features, forget_labels
+
+        rte = time.time() - start_time
+
+        if self.check_stopped_and_return(self.status):
+            return
+
+        # Evaluate on train set
+        self.status.progress = "Evaluating Train Set"
+        print("Start Train set evaluation")
+        (
+            train_loss,
+            train_accuracy,
+            train_class_accuracies, 
+            train_label_dist, 
+            train_conf_dist
+        ) = await evaluate_model_with_distributions(
+            model=self.model, 
+            data_loader=self.train_loader,
+            criterion=self.criterion, 
+            device=self.device
+        )
+
+        # Update training evaluation status for remain classes only
+        self.status.p_training_loss = train_loss
+        remain_train_accuracy = sum(train_class_accuracies[i] for i in self.remain_classes) / len(self.remain_classes)
+        self.status.p_training_accuracy = remain_train_accuracy
+
+        unlearn_accuracy = train_class_accuracies[self.request.forget_class]
+        remain_accuracy = round(
+            sum(train_class_accuracies[i] for i in self.remain_classes) / len(self.remain_classes), 3
+        )
+
+        print("Train Class Accuracies:")
+        for i, acc in train_class_accuracies.items():
+            print(f"  Class {i}: {acc:.3f}")
+        print(f"Train set evaluation finished at {time.time() - start_time:.3f} seconds")
+
+        if self.stopped():
+            return
+        
+        # Evaluate on test set
+        self.status.progress = "Evaluating Test Set"
+        print("Start Test set evaluation")
+        (
+            test_loss, 
+            test_accuracy, 
+            test_class_accuracies, 
+            test_label_dist, 
+            test_conf_dist
+        ) = await evaluate_model_with_distributions(
+            model=self.model, 
+            data_loader=self.test_loader, 
+            criterion=self.criterion, 
+            device=self.device
+        )
+
+        # Update test evaluation status for remain classes only
+        self.status.p_test_loss = test_loss
+        remain_test_accuracy = sum(test_class_accuracies[i] for i in self.remain_classes) / len(self.remain_classes)
+        self.status.p_test_accuracy = remain_test_accuracy
+
+        print("Test Class Accuracies:")
+        for i, acc in test_class_accuracies.items():
+            print(f"  Class {i}: {acc:.3f}")
+        print(f"Test set evaluation finished at {time.time() - start_time:.3f} seconds")
+
+        if self.check_stopped_and_return(self.status):
+            return
+        
+        # UMAP and activation calculation
+        self.status.progress = "Computing UMAP"
+        
+        print("Computing layer activations")
+        (
+            activations, 
+            predicted_labels, 
+            probs, 
+        ) = await get_layer_activations_and_predictions(
+            model=self.model,
+            data_loader=umap_subset_loader,
+            device=self.device,
+        )
+
+        # UMAP embedding computation
+        print("Computing UMAP embedding")
+        forget_labels = torch.tensor([label == self.request.forget_class for _, label in umap_subset])
+        umap_embedding = await compute_umap_embedding(
+            activation=activations, 
+            labels=predicted_labels, 
+            forget_class=self.request.forget_class,
+            forget_labels=forget_labels
+        )
+        
+        # Process attack metrics using the same umap_subset_loader (for UI)
+        print("Processing attack metrics on UMAP subset")
+        values, attack_results, fqs = await process_attack_metrics(
+            model=self.model, 
+            data_loader=umap_subset_loader, 
+            device=self.device, 
+            forget_class=self.request.forget_class,
+            create_plots=False  # No plots for UI data
+        )
+        
+        # Calculate Privacy Score on full dataset for final results
+        print("Calculating Privacy Score on full dataset")
+        _, _, final_fqs = await process_attack_metrics(
+            model=self.model, 
+            data_loader=self.train_loader, 
+            device=self.device, 
+            forget_class=self.request.forget_class,
+            create_plots=False
+        )
+        
+        # Generate distribution plots on full forget class data (for analysis)
+        print("Generating distribution plots on full forget class data")
+        from app.utils.attack_full_dataset import calculate_model_metrics
+        await calculate_model_metrics(
+            model=self.model,
+            data_loader=self.train_loader,
+            device=self.device,
+            forget_class=self.request.forget_class,
+            t1=2.0,
+            t2=1.0,
+            create_plots=True,
+            model_name="Unlearn"
+        )
+
+        # CKA similarity calculation
+        self.status.progress = "Calculating CKA Similarity"
+        print("Calculating CKA similarity")
+        cka_results = await calculate_cka_similarity(
+            model_after=self.model,
+            forget_class=self.request.forget_class,
+            device=self.device,
+        )
+
+        # Calculate accuracy metrics after both train and test evaluations
+        accuracy_metrics = calculate_accuracy_metrics(
+            train_class_accuracies, test_class_accuracies, 
+            self.request.forget_class, self.num_classes
+        )
+        
+        # Prepare detailed results
+        self.status.progress = "Preparing Results"
+        detailed_results = prepare_detailed_results(
+            umap_subset, selected_indices, predicted_labels, 
+            umap_embedding, probs, self.request.forget_class
+        )
+        
+        test_unlearn_accuracy = test_class_accuracies[self.request.forget_class]
+        test_remain_accuracy = round(
+           sum(test_class_accuracies[i] for i in self.remain_classes) / 9.0, 3
+        )
+
+        # Create results dictionary
+        results = create_base_results_dict(
+            self.status, self.request.forget_class, self.base_weights_path, 
+            f"HeadOnly-{self.request.head_method}", self.request
+        )
+        
+        results.update({
+            "UA": round(unlearn_accuracy, 3),
+            "RA": remain_accuracy,
+            "TUA": round(test_unlearn_accuracy, 3),
+            "TRA": test_remain_accuracy,
+            "RTE": round(rte, 1),
+            "FQS": final_fqs,
+            "accs": [round(v, 3) for v in train_class_accuracies.values()],
+            "label_dist": format_distribution(train_label_dist),
+            "conf_dist": format_distribution(train_conf_dist),
+            "t_accs": [round(v, 3) for v in test_class_accuracies.values()],
+            "t_label_dist": format_distribution(test_label_dist),
+            "t_conf_dist": format_distribution(test_conf_dist),
+            "cka": cka_results.get("similarity"),
+            "cka_retrain": cka_results.get("similarity_retrain"),
+            "points": detailed_results,
+            "attack": {
+                "values": values,
+                "results": attack_results
+            },
+            "head_batch_size": self.head_batch_size or "full",  # Add head-only info
+            "saliency_threshold": self.saliency_threshold if self.request.head_method == "SalUn" else None
+        })
+        
+        # Save results and model
+        result_path = save_results_and_model(
+            results, self.model, self.request.forget_class, self.status
+        )
+        
+        print(f"Results saved to {result_path}")
+        print("Head-only unlearning inference completed!")
+        self.status.progress = "Completed"
\ No newline at end of file
@@ -1,9 +1,11 @@
 import threading
 import asyncio
+import contextvars
 import time
 import sys
 from app.utils.helpers import save_model
 from app.utils.evaluation import evaluate_model
+from app.utils.instrumentation import span
 
 class UnlearningRetrainThread(threading.Thread):
     def __init__(
@@ -24,6 +26,8 @@ class UnlearningRetrainThread(threading.Thread):
         forget_class
     ):
         threading.Thread.__init__(self)
+        # Run in the creator's context, so spans are recorded to its job
+        self._context = contextvars.copy_context()
         self.model = model
         self.unlearning_loader = unlearning_loader
         self.full_train_loader = full_train_loader
@@ -52,7 +56,7 @@ class UnlearningRetrainThread(threading.Thread):
         try:
             self.loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
-            self.loop.run_until_complete(self.unlearn_retrain_model())
+            self._context.run(self.loop.run_until_complete, self.unlearn_retrain_model())
         except Exception as e:
             self.exception = e
         finally:
@@ -73,6 +77,7 @@ class UnlearningRetrainThread(threading.Thread):
         
         for epoch in range(self.epochs):
             epoch_start_time = time.time()  # Start timing training portion
+            epoch_span = span("train_epoch")
             
             self.model.train()
             running_loss = 0.0
@@ -107,6 +112,7 @@ class UnlearningRetrainThread(threading.Thread):
                     class_total[label] += 1
             
             self.scheduler.step()
+            epoch_span.finish(samples=total)
             train_loss = running_loss / len(self.unlearning_loader)
             train_accuracy = correct / total
             train_class_accuracies = {
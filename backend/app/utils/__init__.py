@@ -1,24 +1,33 @@
 """
 This package contains utility functions and modules.
+
+The re-exported functions below are imported from their submodules on first
+access, so importing a light utility (e.g. app.utils.model_store) does not
+load torch, torchvision, umap, matplotlib and the CKA package with them.
 """
+import importlib
+
+_EXPORTS = {
+    'load_cifar10_data': 'data_loader',
+    'get_data_loaders': 'data_loader',
+    'get_layer_activations_and_predictions': 'evaluation',
+    'evaluate_model': 'evaluation',
+    'evaluate_model_with_distributions': 'evaluation',
+    'calculate_cka_similarity': 'evaluation',
+    'set_seed': 'helpers',
+    'save_model': 'helpers',
+    'format_distribution': 'helpers',
+    'compress_prob_array': 'helpers',
+    'compute_umap_embedding': 'visualization',
+}
+
 
-from .data_loader import (
-	load_cifar10_data, 
-	get_data_loaders
-)
-from .evaluation import (
-	get_layer_activations_and_predictions,
-	evaluate_model,
-	evaluate_model_with_distributions,
-	calculate_cka_similarity
-)
-from .helpers import (
-	set_seed, 
-	save_model, 
-	format_distribution,
-	compress_prob_array
-)
-from .visualization import compute_umap_embedding
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
 
 
 __all__ = [
@@ -5,6 +5,7 @@ import matplotlib.pyplot as plt
 from scipy.stats import entropy
 import json
 from datetime import datetime
+from app.utils.instrumentation import loader_samples, timed
 
 # Configuration constants for attack scoring
 ENTROPY_CONFIG = {
@@ -103,6 +104,7 @@ def calculate_scores(
         })
     return scores
 
+@timed("ps", samples=loader_samples("data_loader"))
 async def process_attack_metrics(
         model, 
         data_loader, 
@@ -113,16 +115,18 @@ async def process_attack_metrics(
         create_plots=False
     ):
     from app.utils.evaluation import model_eval_mode
+    from app.utils.inference import get_inference_model
     
     logit_entropies = []
     max_logit_gaps = []
     image_indices = []
     
     with model_eval_mode(model):
+        inference_model = get_inference_model(model)
         with torch.no_grad():
             for batch_idx, data in enumerate(data_loader):
                 images, labels = data[0].to(device), data[1].to(device)
-                outputs = model(images)
+                outputs = inference_model(images)
                 
                 # Select only those outputs for the forget class
                 forget_mask = (labels == forget_class)
@@ -168,19 +172,9 @@ async def process_attack_metrics(
         json.dump(unlearn_data, f, indent=4)
     print("add")
     
-    # Load the pre-saved retrain distribution from JSON.
-    retrain_file = f"data/{forget_class}/a00{forget_class}.json"
-    with open(retrain_file, "r") as f:
-        retrain_raw = json.load(f)
-        # Modified retrain JSON structure: 'attack' below 'values' is a list.
-        retrain_vals = retrain_raw["attack"]["values"]
-        retrain_data = {
-            "values": {
-                "img": [item["img"] for item in retrain_vals],
-                "entropy": [item["entropy"] for item in retrain_vals],
-                "confidence": [item["confidence"] for item in retrain_vals]
-            }
-        }
+    # The pre-saved retrain distribution is parsed once per process
+    from app.utils.reference_cache import get_retrain_distribution
+    retrain_data = {"values": get_retrain_distribution(forget_class)}
     
     # unlearn_data["attack"]["values"] is a list, so convert it to a dictionary for calculation.
     unlearn_vals_list = unlearn_data["attack"]["values"]
@@ -5,7 +5,9 @@ from scipy.stats import entropy
 from typing import Tuple, List
 import os
 import matplotlib.pyplot as plt
-from app.models import get_resnet18
+from app.utils.checkpoint_io import checkpoint_exists
+from app.utils.model_pool import borrow_eval_model
+from app.utils.instrumentation import loader_samples, timed
 
 
 def _create_single_distribution_plot(data, title, xlabel, color, filename, mean_value, bins=30, range_vals=None):
@@ -196,7 +198,7 @@ async def process_attack_metrics_full_dataset(
     if retrain_model_path is None:
         retrain_model_path = f"unlearned_models/{forget_class}/a00{forget_class}.pth"
     
-    if not os.path.exists(retrain_model_path):
+    if not checkpoint_exists(retrain_model_path):
         print(f"Warning: Retrain model not found at {retrain_model_path}")
         print("Using simplified PS calculation without retrain comparison")
         return await process_attack_metrics_simplified(
@@ -204,9 +206,7 @@ async def process_attack_metrics_full_dataset(
         )
     
     # Load retrain model
-    retrain_model = get_resnet18().to(device)
-    retrain_model.load_state_dict(torch.load(retrain_model_path, map_location=device))
-    retrain_model.eval()
+    retrain_model = borrow_eval_model(retrain_model_path, device)
     
     print(f"Calculating PS with full dataset using ORIGINAL attack logic")
     
@@ -343,6 +343,28 @@ def calculate_attack_scores_original_logic(
     return privacy_score
 
 
+def entropy_and_confidence(outputs, t1: float, t2: float):
+    """
+    Entropy (temperature t1) and logit confidence (temperature t2) of a batch of logits.
+    
+    Returns:
+        Tuple of numpy arrays (entropies, confidences)
+    """
+    # Calculate entropy
+    scaled_outputs_entropy = outputs / t1
+    probs_entropy = F.softmax(scaled_outputs_entropy, dim=1)
+    entropies = entropy(probs_entropy.cpu().numpy().T)
+    
+    # Calculate confidence
+    scaled_outputs_conf = outputs / t2
+    probs_conf = F.softmax(scaled_outputs_conf, dim=1).cpu().numpy()
+    max_probs = np.max(probs_conf, axis=1)
+    other_probs = 1 - max_probs
+    confidences = np.log(max_probs + 1e-45) - np.log(other_probs + 1e-45)
+    return entropies, confidences
+
+
+@timed("ps", samples=loader_samples("data_loader"))
 async def calculate_model_metrics(
     model, 
     data_loader, 
@@ -357,16 +379,18 @@ async def calculate_model_metrics(
     Calculate entropy and confidence metrics for a model on the forget class data.
     """
     from app.utils.evaluation import model_eval_mode
+    from app.utils.inference import get_inference_model
     
     entropies = []
     confidences = []
     indices = []
     
     with model_eval_mode(model):
+        inference_model = get_inference_model(model)
         with torch.no_grad():
             for batch_idx, (images, labels) in enumerate(data_loader):
                 images, labels = images.to(device), labels.to(device)
-                outputs = model(images)
+                outputs = inference_model(images)
                 
                 # Select only forget class samples
                 forget_mask = (labels == forget_class)
@@ -386,18 +410,9 @@ async def calculate_model_metrics(
                     original_indices = [batch_start_idx + idx.item() for idx in local_indices]
                 
                 selected_outputs = outputs[forget_mask]
-                
-                # Calculate entropy
-                scaled_outputs_entropy = selected_outputs / t1
-                probs_entropy = F.softmax(scaled_outputs_entropy, dim=1)
-                batch_entropies = entropy(probs_entropy.cpu().numpy().T)
-                
-                # Calculate confidence
-                scaled_outputs_conf = selected_outputs / t2
-                probs_conf = F.softmax(scaled_outputs_conf, dim=1).cpu().numpy()
-                max_probs = np.max(probs_conf, axis=1)
-                other_probs = 1 - max_probs
-                batch_confidences = np.log(max_probs + 1e-45) - np.log(other_probs + 1e-45)
+                batch_entropies, batch_confidences = entropy_and_confidence(
+                    selected_outputs, t1, t2
+                )
                 
                 indices.extend(original_indices)
                 entropies.extend(batch_entropies)
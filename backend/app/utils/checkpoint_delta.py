@@ -0,0 +1,150 @@
+"""
+Delta checkpoints: an unlearned model stored relative to its base weights.
+
+Short fine-tuning runs (FT/GA/SalUn for a few epochs at small learning rates)
+leave most weights close to the base 000{fc} model, and frozen layers exactly
+equal to it. A delta checkpoint records, per tensor, one of:
+
+    same      identical to the base tensor, nothing stored
+    xor       lossless: bitwise XOR with the base, byte-shuffled and zstd-compressed
+    fp16      (model - base) in half precision, kept only if every element is
+              reconstructed within the tolerance
+    sparse    (model - base) entries larger than the tolerance, as indices and values
+    full      the tensor itself (non-float tensors, or when an encoding does not pay off)
+
+The encoding is chosen with CHECKPOINT_DELTA ('lossless', 'fp16' or 'sparse');
+'fp16' and 'sparse' bound the absolute error of every weight by
+CHECKPOINT_DELTA_TOLERANCE. Like adapter checkpoints, a delta checkpoint names
+its base file and the base's SHA-256, and load_model_state_dict reconstructs
+the full state dict transparently.
+"""
+import torch
+import zstandard
+
+from app.config import CHECKPOINT_DELTA_TOLERANCE, CHECKPOINT_DELTA_ZSTD_LEVEL
+
+DELTA_CHECKPOINT_FORMAT = "base-delta"
+DELTA_ENCODINGS = ("lossless", "fp16", "sparse")
+
+# Integer views used for the bitwise XOR of floating point tensors
+_BIT_VIEWS = {
+    torch.float64: torch.int64,
+    torch.float32: torch.int32,
+    torch.float16: torch.int16,
+    torch.bfloat16: torch.int16,
+}
+
+
+def _compress(tensor):
+    # Byte-shuffle: group the i-th byte of every element so exponents and
+    # high mantissa bytes (mostly zero after the XOR) compress together
+    item_size = tensor.element_size()
+    planes = tensor.reshape(-1).view(torch.uint8).reshape(-1, item_size).t().contiguous()
+    compressed = zstandard.ZstdCompressor(level=CHECKPOINT_DELTA_ZSTD_LEVEL).compress(
+        planes.numpy().tobytes()
+    )
+    return torch.frombuffer(bytearray(compressed), dtype=torch.uint8)
+
+
+def _decompress(data, dtype, shape):
+    item_size = torch.empty(0, dtype=dtype).element_size()
+    raw = zstandard.ZstdDecompressor().decompress(data.cpu().numpy().tobytes())
+    planes = torch.frombuffer(bytearray(raw), dtype=torch.uint8).reshape(item_size, -1)
+    return planes.t().contiguous().view(dtype).reshape(shape)
+
+
+def _encode_tensor(name, tensor, base, encoding, tolerance, stored):
+    if base is None or base.shape != tensor.shape or base.dtype != tensor.dtype:
+        stored[name] = tensor
+        return "full"
+    if torch.equal(tensor, base):
+        return "same"
+    if tensor.dtype not in _BIT_VIEWS:
+        stored[name] = tensor
+        return "full"
+
+    if encoding == "lossless":
+        bit_dtype = _BIT_VIEWS[tensor.dtype]
+        xor = torch.bitwise_xor(tensor.view(bit_dtype), base.view(bit_dtype))
+        compressed = _compress(xor)
+        if compressed.numel() >= tensor.numel() * tensor.element_size():
+            stored[name] = tensor
+            return "full"
+        stored[f"{name}.xor"] = compressed
+        return "xor"
+
+    delta = tensor.float() - base.float()
+    if encoding == "fp16":
+        half_delta = delta.half()
+        error = (base.float() + half_delta.float() - tensor.float()).abs().max().item()
+        if error > tolerance or tensor.element_size() <= 2:
+            stored[name] = tensor
+            return "full"
+        stored[f"{name}.delta"] = half_delta
+        return "fp16"
+
+    # Sparse: drop every change of at most `tolerance`
+    flat_delta = delta.reshape(-1)
+    indices = (flat_delta.abs() > tolerance).nonzero().squeeze(1)
+    if indices.numel() * 8 >= tensor.numel() * tensor.element_size():
+        stored[name] = tensor
+        return "full"
+    stored[f"{name}.indices"] = indices.int()
+    stored[f"{name}.values"] = flat_delta[indices]
+    return "sparse"
+
+
+def encode_delta(state_dict, base_state_dict, encoding="lossless", tolerance=CHECKPOINT_DELTA_TOLERANCE):
+    """
+    Encode a state dict relative to a base state dict.
+
+    Args:
+        state_dict: Full model state dict
+        base_state_dict: State dict of the base weights
+        encoding: 'lossless', 'fp16' or 'sparse'
+        tolerance: Largest absolute per-weight error of the 'fp16' and 'sparse' encodings
+
+    Returns:
+        Tuple of (tensor kinds by name, tensors to store)
+    """
+    if encoding not in DELTA_ENCODINGS:
+        raise ValueError(f"Unknown delta encoding '{encoding}', expected one of {DELTA_ENCODINGS}")
+
+    kinds = {}
+    stored = {}
+    for name, tensor in state_dict.items():
+        tensor = tensor.detach().cpu().contiguous()
+        base = base_state_dict.get(name)
+        base = base.detach().cpu().contiguous() if base is not None else None
+        kinds[name] = _encode_tensor(name, tensor, base, encoding, tolerance, stored)
+    return kinds, stored
+
+
+def decode_delta(kinds, stored, base_state_dict):
+    """Reconstruct the full state dict of a delta checkpoint on the base tensors' devices."""
+    state_dict = {}
+    for name, kind in kinds.items():
+        if kind == "full":
+            state_dict[name] = stored[name]
+            continue
+
+        base = base_state_dict[name]
+        if kind == "same":
+            state_dict[name] = base.clone()
+            continue
+
+        cpu_base = base.cpu()
+        if kind == "xor":
+            bit_dtype = _BIT_VIEWS[base.dtype]
+            xor = _decompress(stored[f"{name}.xor"], bit_dtype, base.shape)
+            tensor = torch.bitwise_xor(xor, cpu_base.view(bit_dtype)).view(base.dtype)
+        elif kind == "fp16":
+            tensor = (cpu_base.float() + stored[f"{name}.delta"].cpu().float()).to(base.dtype)
+        elif kind == "sparse":
+            flat = cpu_base.float().reshape(-1).clone()
+            flat.index_add_(0, stored[f"{name}.indices"].cpu().long(), stored[f"{name}.values"].cpu().float())
+            tensor = flat.reshape(base.shape).to(base.dtype)
+        else:
+            raise ValueError(f"Unknown delta tensor kind '{kind}' for {name}")
+        state_dict[name] = tensor.to(base.device)
+    return state_dict
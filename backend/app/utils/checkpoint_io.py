@@ -0,0 +1,303 @@
+"""
+Checkpoint files for unlearned_models/ and trained_models/.
+
+Checkpoints are written as safetensors (CHECKPOINT_FORMAT) and read through a
+memory map, so loading does not unpickle anything and a caller that only needs
+a few tensors (e.g. one layer) reads only those. Legacy pickled .pth files are
+still read, and `python -m app.utils.checkpoint_io migrate` converts them in
+place.
+
+Every file goes through the content-addressed store (app.utils.model_store),
+so a checkpoint path is a hardlink to a blob named by its hash.
+
+Paths are handled by stem: "unlearned_models/3/a003.pth",
+"unlearned_models/3/a003.safetensors" and "unlearned_models/3/a003" all
+resolve to whichever file exists (write_checkpoint never leaves both).
+Adapter and delta checkpoints (see app.models.lora and
+app.utils.checkpoint_delta) keep their scalar fields as JSON in the
+safetensors metadata and their tensors as the file contents.
+"""
+import argparse
+import io
+import json
+import os
+
+# torch and safetensors are imported where tensors are read or written, so the
+# path helpers stay cheap to import for the API process
+from app.config import CHECKPOINT_FORMAT
+from app.utils.model_store import checkpoint_sha256, file_sha256, remove_file, store_bytes
+
+CHECKPOINT_EXTENSIONS = (".safetensors", ".pth")
+CHECKPOINT_FORMATS = {"safetensors": ".safetensors", "pth": ".pth"}
+MEDIA_TYPES = {
+    "safetensors": "application/vnd.safetensors",
+    "pth": "application/octet-stream",
+}
+_METADATA_KEY = "checkpoint"
+
+
+def checkpoint_stem(path):
+    """Path without a checkpoint extension."""
+    for extension in CHECKPOINT_EXTENSIONS:
+        if path.endswith(extension):
+            return path[:-len(extension)]
+    return path
+
+
+def checkpoint_format(path):
+    return "safetensors" if path.endswith(".safetensors") else "pth"
+
+
+def resolve_checkpoint_path(path):
+    """Existing checkpoint file for `path` (the exact file, else safetensors before .pth), or None."""
+    if os.path.isfile(path):
+        return path
+    stem = checkpoint_stem(path)
+    for extension in CHECKPOINT_EXTENSIONS:
+        candidate = stem + extension
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def checkpoint_exists(path):
+    return resolve_checkpoint_path(path) is not None
+
+
+def list_checkpoint_files(directory):
+    """Checkpoint file names in `directory`, one per stem (safetensors preferred), sorted."""
+    files = {}
+    for name in os.listdir(directory):
+        if not name.endswith(CHECKPOINT_EXTENSIONS):
+            continue
+        stem = checkpoint_stem(name)
+        if stem not in files or name.endswith(".safetensors"):
+            files[stem] = name
+    return [files[stem] for stem in sorted(files)]
+
+
+def remove_checkpoint(path):
+    """Delete every format of a checkpoint and return the removed file names."""
+    stem = checkpoint_stem(path)
+    removed = []
+    for extension in CHECKPOINT_EXTENSIONS:
+        if os.path.isfile(stem + extension):
+            remove_file(stem + extension)
+            removed.append(os.path.basename(stem + extension))
+    return removed
+
+
+def _split_checkpoint(checkpoint):
+    # Adapter payloads carry scalar fields next to their state dict
+    if "state_dict" in checkpoint and isinstance(checkpoint["state_dict"], dict):
+        tensors = checkpoint["state_dict"]
+        fields = {key: value for key, value in checkpoint.items() if key != "state_dict"}
+    else:
+        tensors = checkpoint
+        fields = {}
+    tensors = {name: tensor.detach().cpu().contiguous() for name, tensor in tensors.items()}
+    return tensors, {_METADATA_KEY: json.dumps(fields)}
+
+
+def serialize_checkpoint(checkpoint, fmt):
+    """Checkpoint (state dict or adapter payload) as bytes in the given format."""
+    if fmt == "safetensors":
+        from safetensors.torch import save as safetensors_bytes
+
+        tensors, metadata = _split_checkpoint(checkpoint)
+        return safetensors_bytes(tensors, metadata=metadata)
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(checkpoint, buffer)
+    return buffer.getvalue()
+
+
+def write_checkpoint(checkpoint, path, fmt=CHECKPOINT_FORMAT):
+    """
+    Atomically write a checkpoint and remove copies of it in other formats.
+
+    Args:
+        checkpoint: State dict or adapter payload
+        path: Checkpoint path (the extension is replaced to match `fmt`)
+        fmt: 'safetensors' or 'pth'
+
+    Returns:
+        Path of the written file
+    """
+    target = store_bytes(
+        serialize_checkpoint(checkpoint, fmt), checkpoint_stem(path) + CHECKPOINT_FORMATS[fmt]
+    )
+
+    # Readers prefer safetensors, so a stale copy in the other format must not survive
+    for extension in CHECKPOINT_EXTENSIONS:
+        other = checkpoint_stem(target) + extension
+        if other != target and os.path.lexists(other):
+            remove_file(other)
+    return target
+
+
+def _device_name(map_location):
+    if map_location is None:
+        return "cpu"
+    return str(map_location)
+
+
+def read_checkpoint(path, map_location=None):
+    """
+    Read a checkpoint as written by write_checkpoint (or a legacy .pth file).
+
+    Returns:
+        State dict, or the adapter payload dictionary
+    """
+    import torch
+    from safetensors import safe_open
+
+    resolved = resolve_checkpoint_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"Checkpoint '{path}' not found")
+
+    if checkpoint_format(resolved) == "pth":
+        return torch.load(resolved, map_location=map_location)
+
+    with safe_open(resolved, framework="pt", device=_device_name(map_location)) as f:
+        fields = json.loads((f.metadata() or {}).get(_METADATA_KEY, "{}"))
+        tensors = {name: f.get_tensor(name) for name in f.keys()}
+    if fields:
+        return dict(fields, state_dict=tensors)
+    return tensors
+
+
+def read_checkpoint_fields(path):
+    """
+    Scalar fields of an adapter or delta checkpoint (format, base_weights,
+    base_sha256, ...) without reading its tensors: safetensors metadata, or a
+    memory-mapped load of a .pth file.
+
+    Returns:
+        Dictionary of fields, empty for a plain state dict
+    """
+    import torch
+    from safetensors import safe_open
+
+    resolved = resolve_checkpoint_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"Checkpoint '{path}' not found")
+
+    if checkpoint_format(resolved) == "pth":
+        # Memory-mapped, so the tensors of a plain state dict are never read
+        try:
+            checkpoint = torch.load(resolved, map_location="cpu", mmap=True, weights_only=True)
+        except RuntimeError:
+            # Files saved before torch's zip format cannot be memory-mapped
+            checkpoint = torch.load(resolved, map_location="cpu", weights_only=True)
+        if not isinstance(checkpoint.get("state_dict"), dict):
+            return {}
+        return {key: value for key, value in checkpoint.items() if key != "state_dict"}
+
+    with safe_open(resolved, framework="pt") as f:
+        return json.loads((f.metadata() or {}).get(_METADATA_KEY, "{}"))
+
+
+def read_checkpoint_tensors(path, names, map_location=None):
+    """
+    Read only the named tensors of a checkpoint's stored state dict.
+
+    safetensors files are memory-mapped, so only the requested tensors are read
+    from disk; legacy .pth files are loaded in full.
+    """
+    import torch
+    from safetensors import safe_open
+
+    resolved = resolve_checkpoint_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"Checkpoint '{path}' not found")
+
+    if checkpoint_format(resolved) == "pth":
+        checkpoint = torch.load(resolved, map_location=map_location)
+        state_dict = checkpoint.get("state_dict", checkpoint)
+        return {name: state_dict[name] for name in names}
+
+    with safe_open(resolved, framework="pt", device=_device_name(map_location)) as f:
+        return {name: f.get_tensor(name) for name in names}
+
+
+def migrate_checkpoints(directories=("unlearned_models", "trained_models"), dry_run=False):
+    """
+    Convert every .pth checkpoint under `directories` to safetensors in place.
+
+    Adapter and delta checkpoints record the SHA-256 of their base weights;
+    when the base file is converted, the recorded hash of every checkpoint
+    stored against it is updated to the new file, and the experiment index is
+    rebuilt.
+
+    Returns:
+        List of converted file paths
+    """
+    import torch
+
+    from app.utils.helpers import needs_base_weights
+
+    pth_paths = []
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            pth_paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".pth"))
+
+    if dry_run:
+        for path in pth_paths:
+            print(f"Would convert {path}")
+        return pth_paths
+
+    old_hashes = {}
+    converted = []
+    for path in pth_paths:
+        old_hashes.setdefault(file_sha256(path), set()).add(os.path.abspath(checkpoint_stem(path)))
+        checkpoint = torch.load(path, map_location="cpu")
+        new_path = write_checkpoint(checkpoint, path, "safetensors")
+        converted.append(new_path)
+        print(f"Converted {path} -> {new_path}")
+
+    # Re-point every adapter and delta checkpoint (not only converted ones) at
+    # its converted base weights
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if not name.endswith(CHECKPOINT_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                fields = read_checkpoint_fields(path)
+                if not needs_base_weights(fields):
+                    continue
+                base_stem = os.path.abspath(checkpoint_stem(fields["base_weights"]))
+                if base_stem not in old_hashes.get(fields["base_sha256"], ()):
+                    continue
+                checkpoint = read_checkpoint(path)
+                checkpoint["base_sha256"] = checkpoint_sha256(resolve_checkpoint_path(base_stem))
+                write_checkpoint(checkpoint, path, checkpoint_format(path))
+                print(f"Updated base weights hash of {path}")
+
+    # Checkpoint and base hashes in the experiment index changed with the files
+    if converted and os.path.isdir('data'):
+        from app.utils.experiment_index import rebuild_index
+
+        count = rebuild_index()
+        print(f"Re-indexed {count} experiment(s)")
+
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoint format utilities")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser('migrate', help="Convert .pth checkpoints to safetensors in place")
+    migrate_parser.add_argument('directories', nargs='*', default=["unlearned_models", "trained_models"], help="Directories to convert")
+    migrate_parser.add_argument('--dry-run', action='store_true', help="Only list the files that would be converted")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        converted = migrate_checkpoints(args.directories, dry_run=args.dry_run)
+        print(f"{len(converted)} checkpoint(s) {'to convert' if args.dry_run else 'converted'}")
+
+
+if __name__ == "__main__":
+    main()
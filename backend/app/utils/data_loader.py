@@ -1,8 +1,11 @@
+import threading
+
 import numpy as np
 import torch
 from torchvision import datasets, transforms
 from torch.utils.data import DataLoader
 from app.config import UNLEARN_SEED
+from app.utils.instrumentation import timed
 
 def load_cifar10_data():
     """Load CIFAR-10 training data with automatic download"""
@@ -15,6 +18,18 @@ def load_cifar10_data():
     
     return x_train, y_train
 
+_cifar10_train = None
+_cifar10_train_lock = threading.Lock()
+
+def get_cifar10_train():
+    """CIFAR-10 training images and labels, loaded once per process."""
+    global _cifar10_train
+    with _cifar10_train_lock:
+        if _cifar10_train is None:
+            _cifar10_train = load_cifar10_data()
+        return _cifar10_train
+
+@timed("data_setup")
 def get_data_loaders(batch_size, augmentation=False):
     base_transforms = [
         transforms.ToTensor(),
@@ -42,9 +57,19 @@ def get_data_loaders(batch_size, augmentation=False):
     print("loaded loaders")
     return train_loader, test_loader, train_set, test_set
 
-def get_fixed_umap_indices(total_samples=2000, seed=UNLEARN_SEED):
+@timed("index_building", samples=lambda arguments: len(arguments["targets"]))
+def split_class_indices(targets, forget_class):
+    """Dataset indices of the retain (other classes) and forget samples, in one pass."""
+    retain_indices = []
+    forget_indices = []
+    for i, label in enumerate(targets):
+        (forget_indices if label == forget_class else retain_indices).append(i)
+    return retain_indices, forget_indices
+
+def get_fixed_umap_indices(total_samples=2000, seed=UNLEARN_SEED, y_train=None):
     import torch
-    _, y_train = load_cifar10_data()
+    if y_train is None:
+        _, y_train = load_cifar10_data()
     num_classes = 10
     targets_tensor = torch.tensor(y_train)
     
@@ -0,0 +1,208 @@
+"""
+Multi-process CPU data-parallel training (torch.distributed with the gloo backend).
+
+Training ResNet18 from scratch is bound by intra-op threading, which scales
+poorly past a few threads for 32x32 inputs. Instead, N local processes each
+train on a DistributedSampler shard with a fraction of the cores, and
+DistributedDataParallel all-reduces the gradients. Rank 0 evaluates on the
+test set, reports progress to the parent process through a queue and saves
+the final weights with save_model.
+"""
+import asyncio
+import os
+import socket
+import time
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import torch.nn as nn
+import torch.optim as optim
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, Subset
+from torch.utils.data.distributed import DistributedSampler
+
+from app.config import MOMENTUM, WEIGHT_DECAY, UNLEARN_SEED
+
+
+def resolve_num_threads(world_size):
+    """Intra-op threads per process so that all processes together use every core."""
+    return max(1, (os.cpu_count() or 1) // world_size)
+
+
+def _find_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _all_reduce_sum(values):
+    tensor = torch.tensor(values, dtype=torch.float64)
+    dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+    return tensor.tolist()
+
+
+def _build_datasets(config, rank):
+    from app.utils.data_loader import get_data_loaders
+
+    # Rank 0 downloads CIFAR-10 if needed before the other ranks read it
+    if rank != 0:
+        dist.barrier()
+    _, test_loader, train_set, _ = get_data_loaders(
+        batch_size=config["batch_size"],
+        augmentation=True
+    )
+    if rank == 0:
+        dist.barrier()
+
+    if config["forget_class"] >= 0:
+        indices = [
+            i for i, label in enumerate(train_set.targets)
+            if label != config["forget_class"]
+        ]
+        train_set = Subset(train_set, indices)
+    return train_set, test_loader
+
+
+def _distributed_worker(rank, world_size, config, progress_queue, stop_event):
+    from app.models import get_resnet18
+    from app.utils.evaluation import evaluate_model
+    from app.utils.helpers import set_seed, save_model
+
+    dist.init_process_group("gloo", rank=rank, world_size=world_size)
+    torch.set_num_threads(config["num_threads"])
+    set_seed(UNLEARN_SEED)
+
+    try:
+        train_set, test_loader = _build_datasets(config, rank)
+        sampler = DistributedSampler(
+            train_set, num_replicas=world_size, rank=rank, shuffle=True, seed=UNLEARN_SEED
+        )
+        # The global batch size matches the single-process run
+        train_loader = DataLoader(
+            train_set,
+            batch_size=max(1, config["batch_size"] // world_size),
+            sampler=sampler,
+            num_workers=0
+        )
+
+        model = DistributedDataParallel(get_resnet18(
+            precision=config["precision"],
+            channels_last=config["channels_last"]
+        ))
+        criterion = nn.CrossEntropyLoss()
+        optimizer = optim.SGD(
+            model.parameters(),
+            lr=config["learning_rate"],
+            momentum=MOMENTUM,
+            weight_decay=WEIGHT_DECAY,
+            nesterov=True
+        )
+        scheduler = optim.lr_scheduler.CosineAnnealingLR(
+            optimizer=optimizer,
+            T_max=config["epochs"],
+        )
+
+        training_time = 0.0
+        for epoch in range(config["epochs"]):
+            epoch_start_time = time.time()
+            sampler.set_epoch(epoch)
+            model.train()
+            running_loss = 0.0
+            num_batches = 0
+            class_correct = torch.zeros(10, dtype=torch.float64)
+            class_total = torch.zeros(10, dtype=torch.float64)
+
+            for inputs, labels in train_loader:
+                # Every rank must agree to stop, otherwise the others block in all-reduce
+                stop_flag = torch.tensor([1.0 if stop_event.is_set() else 0.0])
+                dist.all_reduce(stop_flag, op=dist.ReduceOp.MAX)
+                if stop_flag.item() > 0:
+                    return
+
+                optimizer.zero_grad()
+                outputs = model(inputs)
+                loss = criterion(outputs, labels)
+                loss.backward()
+                optimizer.step()
+
+                running_loss += loss.item()
+                num_batches += 1
+                correct = (outputs.argmax(1) == labels).double()
+                class_correct.index_add_(0, labels, correct)
+                class_total.index_add_(0, labels, torch.ones_like(correct))
+
+            scheduler.step()
+            training_time += time.time() - epoch_start_time
+
+            # Aggregate training statistics over all shards
+            totals = _all_reduce_sum(
+                [running_loss, num_batches] + class_correct.tolist() + class_total.tolist()
+            )
+            if rank != 0:
+                continue
+
+            train_loss = totals[0] / max(1, totals[1])
+            class_correct_all, class_total_all = totals[2:12], totals[12:22]
+            train_accuracy = sum(class_correct_all) / max(1, sum(class_total_all))
+            train_class_accuracies = {
+                i: (class_correct_all[i] / class_total_all[i] if class_total_all[i] > 0 else 0)
+                for i in range(10)
+            }
+            test_loss, test_accuracy, test_class_accuracies = asyncio.run(
+                evaluate_model(model.module, test_loader, criterion, torch.device("cpu"))
+            )
+            progress_queue.put({
+                "type": "epoch",
+                "epoch": epoch + 1,
+                "train_loss": train_loss,
+                "train_accuracy": train_accuracy,
+                "train_class_accuracies": train_class_accuracies,
+                "test_loss": test_loss,
+                "test_accuracy": test_accuracy,
+                "test_class_accuracies": test_class_accuracies,
+                "training_time": training_time,
+                "learning_rate": optimizer.param_groups[0]['lr'],
+            })
+
+        if rank == 0:
+            save_model(
+                model=model.module,
+                forget_class=config["forget_class"],
+                model_name=config["model_name"]
+            )
+            progress_queue.put({"type": "done", "training_time": training_time})
+    finally:
+        dist.destroy_process_group()
+
+
+def launch_distributed_training(config, world_size):
+    """
+    Start `world_size` training processes without waiting for them.
+
+    Args:
+        config: Dictionary with batch_size, learning_rate, epochs, forget_class
+            (-1 to train on all classes), model_name (checkpoint name),
+            precision and channels_last
+        world_size: Number of processes
+
+    Returns:
+        Tuple of (process context, progress queue, stop event)
+    """
+    ctx = mp.get_context("spawn")
+    progress_queue = ctx.Queue()
+    stop_event = ctx.Event()
+
+    config = dict(config, num_threads=resolve_num_threads(world_size))
+    os.environ["MASTER_ADDR"] = "127.0.0.1"
+    os.environ["MASTER_PORT"] = str(_find_free_port())
+    print(f"Launching {world_size} gloo processes with {config['num_threads']} threads each")
+
+    process_context = mp.start_processes(
+        _distributed_worker,
+        args=(world_size, config, progress_queue, stop_event),
+        nprocs=world_size,
+        join=False,
+        start_method="spawn"
+    )
+    return process_context, progress_queue, stop_event
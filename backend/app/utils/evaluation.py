@@ -8,10 +8,13 @@ from datetime import datetime
 from contextlib import contextmanager
 
 from cka import CKA
-from torch.utils.data import DataLoader, Subset
-from torchvision import datasets, transforms
 from app.config import UMAP_DATA_SIZE
-from app.models import get_resnet18
+from app.models import get_resnet18, fp32_execution
+from app.utils.checkpoint_io import checkpoint_exists
+from app.utils.model_pool import get_state_dict
+from app.utils.reference_cache import get_cka_loaders
+from app.utils.inference import get_inference_model
+from app.utils.instrumentation import loader_samples, timed
 
 
 @contextmanager
@@ -26,6 +29,15 @@ def model_eval_mode(model):
             model.train()
 
 
+def register_penultimate_hook(model, activations):
+    """Append the avgpool (penultimate) outputs of every forward pass to `activations`."""
+    def hook_fn(module, input, output):
+        activations.append(output.detach().float().cpu().numpy())
+
+    return model.avgpool.register_forward_hook(hook_fn)
+
+
+@timed("activations", samples=loader_samples("data_loader"))
 async def get_layer_activations_and_predictions(
     model, data_loader, device, num_samples=UMAP_DATA_SIZE
 ):
@@ -34,18 +46,16 @@ async def get_layer_activations_and_predictions(
     probabilities = []
     sample_count = 0
 
-    def hook_fn(module, input, output):
-        activations.append(output.detach().cpu().numpy())
-
     with model_eval_mode(model):
-        hook = model.avgpool.register_forward_hook(hook_fn)
+        inference_model = get_inference_model(model, hooks=True)
+        hook = register_penultimate_hook(inference_model, activations)
 
         with torch.no_grad():
             for inputs, labels in data_loader:
                 inputs = inputs.to(device)
                 labels = labels.to(device)
 
-                outputs = model(inputs)
+                outputs = inference_model(inputs)
                 _, predicted = outputs.max(1)
                 predictions.extend(predicted.cpu().numpy())
 
@@ -70,6 +80,7 @@ async def get_layer_activations_and_predictions(
 
 
 # For training and retraining
+@timed("evaluation", samples=loader_samples("data_loader"))
 async def evaluate_model(model, data_loader, criterion, device):
     total_loss = 0
     correct = 0
@@ -78,10 +89,11 @@ async def evaluate_model(model, data_loader, criterion, device):
     class_total = [0] * 10
 
     with model_eval_mode(model):
+        inference_model = get_inference_model(model)
         with torch.no_grad():
             for data in data_loader:
                 images, labels = data[0].to(device), data[1].to(device)
-                outputs = model(images)
+                outputs = inference_model(images)
                 loss = criterion(outputs, labels)
                 total_loss += loss.item()
                 _, predicted = outputs.max(1)
@@ -282,6 +294,7 @@ def visualize_logits_distribution(all_logits, class_logits, save_dir="aaai_exp")
     return timestamp
 
 
+@timed("evaluation", samples=loader_samples("data_loader"))
 async def evaluate_model_with_distributions(model, data_loader, criterion, device):
     total_loss = 0
     correct = 0
@@ -300,10 +313,11 @@ async def evaluate_model_with_distributions(model, data_loader, criterion, devic
     class_logits = [[] for _ in range(10)]  # Store logits for each class separately
 
     with model_eval_mode(model):
+        inference_model = get_inference_model(model)
         with torch.no_grad():
             for data in data_loader:
                 images, labels = data[0].to(device), data[1].to(device)
-                outputs = model(images)
+                outputs = inference_model(images)
                 loss = criterion(outputs, labels)
                 total_loss += loss.item()
 
@@ -360,34 +374,25 @@ async def evaluate_model_with_distributions(model, data_loader, criterion, devic
     )
 
 
+@timed("cka")
 async def calculate_cka_similarity(model_after, forget_class, device, batch_size=1000):
     # Load original model from file
     model_before = get_resnet18().to(device)
     original_model_path = f"unlearned_models/{forget_class}/000{forget_class}.pth"
     print(f"Loading original model from: {original_model_path}")
-    model_before.load_state_dict(torch.load(original_model_path, map_location=device))
+    model_before.load_state_dict(get_state_dict(original_model_path))
 
-    # Create clean data loaders without augmentation for consistent CKA calculation
-    base_transforms = transforms.Compose(
-        [
-            transforms.ToTensor(),
-            transforms.Normalize((0.4914, 0.4822, 0.4465), (0.2023, 0.1994, 0.2010)),
-        ]
-    )
-
-    clean_train_set = datasets.CIFAR10(
-        root="./data", train=True, download=False, transform=base_transforms
-    )
-    clean_test_set = datasets.CIFAR10(
-        root="./data", train=False, download=False, transform=base_transforms
-    )
+    # Clean (non-augmented) CKA samples, shared by every job of the class
+    cka_loaders = get_cka_loaders(forget_class, batch_size)
+    forget_class_train_loader = cka_loaders["train"]["forget_class"]
+    other_classes_train_loader = cka_loaders["train"]["other_classes"]
+    forget_class_test_loader = cka_loaders["test"]["forget_class"]
+    other_classes_test_loader = cka_loaders["test"]["other_classes"]
 
-    train_loader = DataLoader(
-        clean_train_set, batch_size=batch_size, shuffle=False, num_workers=0
-    )
-    test_loader = DataLoader(
-        clean_test_set, batch_size=batch_size, shuffle=False, num_workers=0
-    )
+    # Fix random seed for a consistent CKA computation - use forget_class as part of seed
+    seed = 42 + forget_class
+    torch.manual_seed(seed)
+    np.random.seed(seed)
 
     # List of layers to analyze in ResNet18 model
     # conv1: First convolutional layer
@@ -406,70 +411,15 @@ async def calculate_cka_similarity(model_after, forget_class, device, batch_size
         "fc",
     ]
 
-    def filter_loader(loader, is_train=False):
-        targets = loader.dataset.targets
-        targets = (
-            torch.tensor(targets) if not isinstance(targets, torch.Tensor) else targets
-        )
-
-        forget_indices = (targets == forget_class).nonzero(as_tuple=True)[0]
-        other_indices = (targets != forget_class).nonzero(as_tuple=True)[0]
-
-        if is_train:
-            forget_samples = len(forget_indices) // 10
-            other_samples = len(other_indices) // 10
-        else:
-            forget_samples = len(forget_indices) // 2
-            other_samples = len(other_indices) // 2
-
-        # Fix random seed for consistent CKA sampling - use forget_class as part of seed
-        seed = 42 + forget_class  # Consistent per forget class
-        torch.manual_seed(seed)
-        np.random.seed(seed)
-
-        # Sort indices for complete determinism
-        forget_indices_sorted = torch.sort(forget_indices)[0]
-        other_indices_sorted = torch.sort(other_indices)[0]
-
-        forget_sampled = forget_indices_sorted[:forget_samples]
-        other_sampled = other_indices_sorted[:other_samples]
-
-        forget_loader = DataLoader(
-            Subset(loader.dataset, forget_sampled),
-            batch_size=loader.batch_size,
-            shuffle=False,
-            num_workers=0,
-            pin_memory=True,
-        )
-
-        other_loader = DataLoader(
-            Subset(loader.dataset, other_sampled),
-            batch_size=loader.batch_size,
-            shuffle=False,
-            num_workers=0,
-            pin_memory=True,
-        )
-
-        return forget_loader, other_loader
-
-    forget_class_train_loader, other_classes_train_loader = filter_loader(
-        train_loader, is_train=True
-    )
-    forget_class_test_loader, other_classes_test_loader = filter_loader(
-        test_loader, is_train=False
-    )
-
     # Load retrain model for additional CKA comparison
     retrain_model = None
     retrain_model_path = f"unlearned_models/{forget_class}/a00{forget_class}.pth"
     retrain_model_loaded = False
 
-    if os.path.exists(retrain_model_path):
+    if checkpoint_exists(retrain_model_path):
         try:
             retrain_model = get_resnet18().to(device)
-            retrain_model.load_state_dict(
-                torch.load(retrain_model_path, map_location=device)
-            )
+            retrain_model.load_state_dict(get_state_dict(retrain_model_path))
             retrain_model_loaded = True
             print(f"Loaded retrain model from {retrain_model_path}")
         except Exception as e:
@@ -480,49 +430,52 @@ async def calculate_cka_similarity(model_after, forget_class, device, batch_size
         print(f"Retrain model not found at {retrain_model_path}")
         retrain_model_loaded = False
 
-    with CKA(
-        model1=model_before,
-        model2=model_after,
-        model1_name="Before Unlearning",
-        model2_name="After Unlearning",
-        model1_layers=detailed_layers,
-        model2_layers=detailed_layers,
-        device=device,
-    ) as cka:
-        # Original comparison: before vs after
-        forget_train_cka_matrix = cka.compare(forget_class_train_loader)
-        other_train_cka_matrix = cka.compare(other_classes_train_loader)
-        forget_test_cka_matrix = cka.compare(forget_class_test_loader)
-        other_test_cka_matrix = cka.compare(other_classes_test_loader)
-
-        # Retrain comparison: retrain vs unlearned
-        retrain_forget_train_cka_matrix = None
-        retrain_other_train_cka_matrix = None
-        retrain_forget_test_cka_matrix = None
-        retrain_other_test_cka_matrix = None
-
-        if retrain_model_loaded and retrain_model is not None:
-            with CKA(
-                model1=retrain_model,
-                model2=model_after,
-                model1_name="Retrain Model",
-                model2_name="Unlearned Model",
-                model1_layers=detailed_layers,
-                model2_layers=detailed_layers,
-                device=device,
-            ) as cka_retrain:
-                retrain_forget_train_cka_matrix = cka_retrain.compare(
-                    forget_class_train_loader
-                )
-                retrain_other_train_cka_matrix = cka_retrain.compare(
-                    other_classes_train_loader
-                )
-                retrain_forget_test_cka_matrix = cka_retrain.compare(
-                    forget_class_test_loader
-                )
-                retrain_other_test_cka_matrix = cka_retrain.compare(
-                    other_classes_test_loader
-                )
+    # Compare representations in fp32 regardless of the execution precision
+    with fp32_execution(model_before), fp32_execution(model_after), \
+            fp32_execution(retrain_model):
+        with CKA(
+            model1=model_before,
+            model2=model_after,
+            model1_name="Before Unlearning",
+            model2_name="After Unlearning",
+            model1_layers=detailed_layers,
+            model2_layers=detailed_layers,
+            device=device,
+        ) as cka:
+            # Original comparison: before vs after
+            forget_train_cka_matrix = cka.compare(forget_class_train_loader)
+            other_train_cka_matrix = cka.compare(other_classes_train_loader)
+            forget_test_cka_matrix = cka.compare(forget_class_test_loader)
+            other_test_cka_matrix = cka.compare(other_classes_test_loader)
+
+            # Retrain comparison: retrain vs unlearned
+            retrain_forget_train_cka_matrix = None
+            retrain_other_train_cka_matrix = None
+            retrain_forget_test_cka_matrix = None
+            retrain_other_test_cka_matrix = None
+
+            if retrain_model_loaded and retrain_model is not None:
+                with CKA(
+                    model1=retrain_model,
+                    model2=model_after,
+                    model1_name="Retrain Model",
+                    model2_name="Unlearned Model",
+                    model1_layers=detailed_layers,
+                    model2_layers=detailed_layers,
+                    device=device,
+                ) as cka_retrain:
+                    retrain_forget_train_cka_matrix = cka_retrain.compare(
+                        forget_class_train_loader
+                    )
+                    retrain_other_train_cka_matrix = cka_retrain.compare(
+                        other_classes_train_loader
+                    )
+                    retrain_forget_test_cka_matrix = cka_retrain.compare(
+                        forget_class_test_loader
+                    )
+                    retrain_other_test_cka_matrix = cka_retrain.compare(
+                        other_classes_test_loader
+                    )
 
     def format_cka_results(results):
         if results is None:
@@ -0,0 +1,309 @@
+"""
+SQLite index of the experiment results in data/{fc}/{ID}.json.
+
+One row per experiment holds its metadata, hyperparameters and scalar metrics
+(every scalar field of the result, with the common ones as indexed columns),
+the hash of its checkpoint and, for adapter and delta checkpoints, the base
+weights they are stored relative to, so listing, filtering and sorting
+experiments is a query instead of parsing every result file, and delete_files
+can tell which checkpoints still depend on the one it would remove. Rows are written in the same
+step as the result files (save_results_and_model, the custom thread and
+rescoring) and removed by delete_files.
+
+Usage (from the backend directory):
+    python -m app.utils.experiment_index rebuild
+"""
+import argparse
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+
+from app.config import EXPERIMENT_DB_PATH
+from app.utils.checkpoint_io import checkpoint_stem, read_checkpoint_fields, resolve_checkpoint_path
+from app.utils.model_store import checkpoint_sha256
+
+# Result field -> indexed column
+INDEXED_FIELDS = {
+    "Method": "method",
+    "Type": "type",
+    "Base": "base",
+    "CreatedAt": "created_at",
+    "Epoch": "epoch",
+    "BS": "bs",
+    "LR": "lr",
+    "UA": "ua",
+    "RA": "ra",
+    "TUA": "tua",
+    "TRA": "tra",
+    "PA": "pa",
+    "RTE": "rte",
+    "FQS": "fqs",
+}
+# Identifiers and names, compared as strings even when they look like numbers (ID=0001)
+_TEXT_FIELDS = ("ID", "Method", "Type", "Base", "CreatedAt")
+_SORTED_COLUMNS = ("method", "created_at", "ua", "ra", "tua", "tra", "pa", "rte", "fqs")
+_FIELD_NAME = re.compile(r"^[A-Za-z0-9_\-]+$")
+_FILTER = re.compile(r"^([A-Za-z0-9_\-]+)\s*(<=|>=|!=|=|<|>)\s*(.*)$")
+
+# Bumped when the table changes; an older index is rebuilt from the result files
+_SCHEMA_VERSION = 2
+
+# Columns without a declared type keep numbers and strings such as "N/A" as they are
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    forget_class TEXT NOT NULL,
+    id TEXT NOT NULL,
+    {columns},
+    checkpoint_sha256 TEXT,
+    base_weights TEXT,
+    base_sha256 TEXT,
+    result_mtime_ns INTEGER,
+    indexed_at REAL,
+    fields TEXT NOT NULL,
+    PRIMARY KEY (forget_class, id)
+);
+CREATE INDEX IF NOT EXISTS experiments_base_weights ON experiments (base_weights);
+{indexes}
+""".format(
+    columns=",\n    ".join(INDEXED_FIELDS.values()),
+    indexes="\n".join(
+        f"CREATE INDEX IF NOT EXISTS experiments_{column} ON experiments (forget_class, {column});"
+        for column in _SORTED_COLUMNS
+    ),
+)
+
+
+def _connect(db_path=None):
+    db_path = db_path or EXPERIMENT_DB_PATH
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    connection = sqlite3.connect(db_path, timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    if connection.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+        connection.execute("DROP TABLE IF EXISTS experiments")
+        connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def _is_current(db_path=None):
+    db_path = db_path or EXPERIMENT_DB_PATH
+    if not os.path.exists(db_path):
+        return False
+    with closing(sqlite3.connect(db_path, timeout=30)) as connection:
+        return connection.execute("PRAGMA user_version").fetchone()[0] == _SCHEMA_VERSION
+
+
+def _weights_key(path):
+    # "unlearned_models/3/0003.safetensors" and "./unlearned_models/3/0003" name the same checkpoint
+    return os.path.normpath(checkpoint_stem(path))
+
+
+def _scalar_fields(results):
+    fields = {}
+    for key, value in results.items():
+        if isinstance(value, (list, dict)):
+            continue
+        # NaN is not valid JSON for SQLite's json_extract
+        fields[key] = None if isinstance(value, float) and math.isnan(value) else value
+    return fields
+
+
+def _row(forget_class, results, result_path=None):
+    fields = _scalar_fields(results)
+    checkpoint_path = resolve_checkpoint_path(
+        os.path.join('unlearned_models', str(forget_class), str(results["ID"]))
+    )
+    result_mtime_ns = os.stat(result_path).st_mtime_ns if result_path and os.path.exists(result_path) else None
+    # Adapter and delta checkpoints record the base weights they need to be loaded
+    checkpoint_fields = read_checkpoint_fields(checkpoint_path) if checkpoint_path else {}
+    base_weights = checkpoint_fields.get("base_weights")
+    return (
+        str(forget_class),
+        str(results["ID"]),
+        *(fields.get(field) for field in INDEXED_FIELDS),
+        checkpoint_sha256(checkpoint_path) if checkpoint_path else None,
+        _weights_key(base_weights) if base_weights else None,
+        checkpoint_fields.get("base_sha256"),
+        result_mtime_ns,
+        time.time(),
+        json.dumps(fields),
+    )
+
+
+_INSERT = "INSERT OR REPLACE INTO experiments VALUES ({})".format(
+    ", ".join("?" * (len(INDEXED_FIELDS) + 8))
+)
+
+
+def index_result(forget_class, results, result_path=None):
+    """Insert or update the index row of a saved result."""
+    with closing(_connect()) as connection, connection:
+        connection.execute(_INSERT, _row(forget_class, results, result_path))
+
+
+def remove_experiment(forget_class, experiment_id):
+    with closing(_connect()) as connection, connection:
+        connection.execute(
+            "DELETE FROM experiments WHERE forget_class = ? AND id = ?",
+            (str(forget_class), str(experiment_id))
+        )
+
+
+def dependent_experiments(checkpoint_path):
+    """
+    Experiments whose adapter or delta checkpoint is stored relative to
+    `checkpoint_path`, which therefore cannot be loaded once it is removed.
+
+    Returns:
+        List of (forget class, experiment ID)
+    """
+    with closing(_connect()) as connection:
+        rows = connection.execute(
+            "SELECT forget_class, id FROM experiments WHERE base_weights = ? ORDER BY forget_class, id",
+            (_weights_key(checkpoint_path),)
+        ).fetchall()
+    return [(row["forget_class"], row["id"]) for row in rows]
+
+
+def _column(field):
+    if not _FIELD_NAME.match(field):
+        raise ValueError(f"Invalid field name '{field}'")
+    if field == "ID":
+        return "id"
+    if field in INDEXED_FIELDS:
+        return INDEXED_FIELDS[field]
+    return f"json_extract(fields, '$.\"{field}\"')"
+
+
+def _parse_value(value):
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def parse_filter(expression):
+    """'UA<=0.1' -> (SQL condition, parameters)"""
+    match = _FILTER.match(expression.strip())
+    if match is None:
+        raise ValueError(f"Invalid filter '{expression}', expected e.g. 'UA<=0.1' or 'Method=GA'")
+    field, operator, value = match.groups()
+    column = _column(field)
+    if field in _TEXT_FIELDS:
+        return f"{column} {operator} ?", [value]
+    number = _parse_value(value)
+    if field in INDEXED_FIELDS or isinstance(number, str):
+        return f"{column} {operator} ?", [number]
+    # Other result fields may hold a number or a string such as "0003"
+    return (
+        f"(CASE WHEN typeof({column}) = 'text' THEN {column} {operator} ? ELSE {column} {operator} ? END)",
+        [value, number],
+    )
+
+
+def query_experiments(forget_class=None, filters=(), sort=None, offset=0, limit=None):
+    """
+    Filter, sort and paginate the indexed experiments.
+
+    Args:
+        forget_class: Only experiments of this forget class (all if None)
+        filters: Expressions such as 'UA<=0.1' or 'Method=GA', combined with AND
+        sort: Field to sort by ("-" prefix for descending); numbers come before
+            other values and missing fields last. Defaults to creation time.
+        offset: Number of experiments to skip
+        limit: Maximum number of experiments to return
+
+    Returns:
+        Tuple of (total number of matches, list of result summaries)
+    """
+    conditions = []
+    params = []
+    if forget_class is not None:
+        conditions.append("forget_class = ?")
+        params.append(str(forget_class))
+    for expression in filters:
+        condition, values = parse_filter(expression)
+        conditions.append(condition)
+        params.extend(values)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    sort = sort or "CreatedAt"
+    column = _column(sort.lstrip("-"))
+    direction = "DESC" if sort.startswith("-") else "ASC"
+    order = (
+        f"{column} IS NULL, typeof({column}) NOT IN ('integer', 'real'), "
+        f"{column} {direction}, forget_class, id"
+    )
+
+    with closing(_connect()) as connection:
+        total = connection.execute(f"SELECT COUNT(*) FROM experiments {where}", params).fetchone()[0]
+        rows = connection.execute(
+            f"SELECT fields, checkpoint_sha256 FROM experiments {where} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [limit if limit is not None else -1, offset]
+        ).fetchall()
+
+    experiments = [
+        dict(json.loads(row["fields"]), CheckpointSHA256=row["checkpoint_sha256"])
+        for row in rows
+    ]
+    return total, experiments
+
+
+def rebuild_index(data_dir='data'):
+    """
+    Recreate the index from the result files under data/{fc}/.
+
+    Returns:
+        Number of indexed experiments
+    """
+    count = 0
+    with closing(_connect()) as connection, connection:
+        connection.execute("DELETE FROM experiments")
+        for forget_class in sorted(os.listdir(data_dir)):
+            class_dir = os.path.join(data_dir, forget_class)
+            if not re.match(r"^-?\d+$", forget_class) or not os.path.isdir(class_dir):
+                continue
+            for name in sorted(os.listdir(class_dir)):
+                if not name.endswith('.json'):
+                    continue
+                result_path = os.path.join(class_dir, name)
+                try:
+                    with open(result_path, 'r', encoding='utf-8') as f:
+                        results = json.load(f)
+                except ValueError as e:
+                    print(f"Skipping {result_path}: {e}")
+                    continue
+                if not isinstance(results, dict) or "ID" not in results:
+                    continue
+                connection.execute(_INSERT, _row(forget_class, results, result_path))
+                count += 1
+    return count
+
+
+def ensure_experiment_index(data_dir='data'):
+    """Build the index from disk if it does not exist yet or has an older schema."""
+    if not _is_current() and os.path.isdir(data_dir):
+        count = rebuild_index(data_dir)
+        print(f"Indexed {count} experiment(s) into {EXPERIMENT_DB_PATH}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite index of experiment results")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser('rebuild', help="Recreate the index from data/{fc}/*.json")
+    rebuild_parser.add_argument('--data-dir', default='data', help="Results directory")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        start_time = time.time()
+        count = rebuild_index(args.data_dir)
+        print(f"Indexed {count} experiment(s) into {EXPERIMENT_DB_PATH} in {time.time() - start_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
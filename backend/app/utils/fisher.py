@@ -0,0 +1,94 @@
+"""
+Diagonal Fisher information and gradient accumulation helpers.
+
+Per-batch accumulation uses the multi-tensor torch._foreach ops, so each batch
+costs a handful of fused kernel launches instead of one Python-level update
+per parameter tensor.
+"""
+import torch
+
+from app.utils.evaluation import model_eval_mode
+from app.utils.instrumentation import loader_samples, timed
+
+
+def _trainable_parameters(model):
+    return [(name, param) for name, param in model.named_parameters() if param.requires_grad]
+
+
+def _batch_gradients(params):
+    return [
+        param.grad if param.grad is not None else torch.zeros_like(param)
+        for _, param in params
+    ]
+
+
+@timed("fisher", samples=loader_samples("data_loader"))
+def compute_fisher_information(model, data_loader, criterion, device, num_samples=None):
+    """
+    Accumulate the diagonal empirical Fisher information of the trainable parameters.
+
+    The model runs in eval mode, so BatchNorm running statistics are untouched.
+
+    Args:
+        model: Model to analyse
+        data_loader: Loader over the data defining the Fisher (e.g. the retain set)
+        criterion: Loss function
+        device: Device to compute on
+        num_samples: Stop after this many samples (None for one full pass)
+
+    Returns:
+        Dictionary mapping parameter names to Fisher diagonals
+    """
+    params = _trainable_parameters(model)
+    fisher = [torch.zeros_like(param) for _, param in params]
+    sample_count = 0
+
+    with model_eval_mode(model):
+        for inputs, labels in data_loader:
+            if num_samples is not None and sample_count >= num_samples:
+                break
+
+            inputs, labels = inputs.to(device), labels.to(device)
+            model.zero_grad()
+            loss = criterion(model(inputs), labels)
+            loss.backward()
+
+            grads = _batch_gradients(params)
+            torch._foreach_addcmul_(fisher, grads, grads)
+            sample_count += inputs.size(0)
+
+    model.zero_grad()
+    if sample_count > 0:
+        torch._foreach_div_(fisher, sample_count)
+
+    return {name: value for (name, _), value in zip(params, fisher)}
+
+
+@timed("fisher", samples=loader_samples("data_loader"))
+def compute_mean_gradient(model, data_loader, criterion, device):
+    """
+    Average gradient of the loss over a data loader (one full pass, eval mode).
+
+    Returns:
+        Dictionary mapping parameter names to gradients
+    """
+    params = _trainable_parameters(model)
+    gradient = [torch.zeros_like(param) for _, param in params]
+    sample_count = 0
+
+    with model_eval_mode(model):
+        for inputs, labels in data_loader:
+            inputs, labels = inputs.to(device), labels.to(device)
+            model.zero_grad()
+            # Weight each batch by its size so the result is a per-sample mean
+            loss = criterion(model(inputs), labels) * inputs.size(0)
+            loss.backward()
+
+            torch._foreach_add_(gradient, _batch_gradients(params))
+            sample_count += inputs.size(0)
+
+    model.zero_grad()
+    if sample_count > 0:
+        torch._foreach_div_(gradient, sample_count)
+
+    return {name: value for (name, _), value in zip(params, gradient)}
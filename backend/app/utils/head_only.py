@@ -0,0 +1,273 @@
+"""
+Head-only unlearning on cached penultimate features.
+
+When only the final fc layer is trained, the backbone output (the avgpool
+features) never changes. These helpers extract the features once and run
+FT / GA / RL / SalUn style updates on the linear head directly, either as
+full-batch steps or over shuffled mini-batches of the cached features.
+"""
+import copy
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from app.config import MAX_GRAD_NORM
+from app.utils.evaluation import model_eval_mode, register_penultimate_hook
+from app.utils.inference import get_inference_model
+from app.utils.instrumentation import loader_samples, timed
+
+
+HEAD_ONLY_METHODS = ("FT", "GA", "RL", "SalUn")
+
+
+@timed("activations", samples=loader_samples("data_loader"))
+def extract_penultimate_features(model, data_loader, device):
+    """
+    Run the model once over a data loader and collect its avgpool features.
+
+    Args:
+        model: ResNet18 model
+        data_loader: Loader over unaugmented data
+        device: Device to run the model on
+
+    Returns:
+        Tuple of (features [N, 512] float tensor, labels [N] long tensor) on CPU
+    """
+    activations = []
+    labels = []
+
+    with model_eval_mode(model):
+        inference_model = get_inference_model(model, hooks=True)
+        hook = register_penultimate_hook(inference_model, activations)
+        with torch.no_grad():
+            for inputs, targets in data_loader:
+                inference_model(inputs.to(device))
+                labels.append(targets)
+        hook.remove()
+
+    features = torch.from_numpy(np.concatenate(activations, axis=0))
+    return features.flatten(1), torch.cat(labels)
+
+
+@timed("saliency")
+def compute_head_saliency_mask(fc, forget_features, forget_labels, saliency_threshold):
+    """
+    Compute a SalUn weight saliency mask for the linear head.
+
+    Args:
+        fc: Linear head
+        forget_features: Penultimate features of the forget set
+        forget_labels: Labels of the forget set
+        saliency_threshold: Fraction of head parameters to keep trainable
+
+    Returns:
+        Dictionary mapping 'weight' and 'bias' to binary masks
+    """
+    fc.zero_grad()
+    loss = -F.cross_entropy(fc(forget_features), forget_labels)
+    loss.backward()
+
+    grads = {name: param.grad.abs() for name, param in fc.named_parameters()}
+    all_grads = torch.cat([grad.flatten() for grad in grads.values()])
+    k = int(saliency_threshold * len(all_grads))
+    threshold_value = torch.topk(all_grads, k).values[-1] if k > 0 else float('inf')
+    fc.zero_grad()
+
+    return {name: (grad >= threshold_value).float() for name, grad in grads.items()}
+
+
+def _head_training_data(method, retain_features, retain_labels, forget_features, forget_labels):
+    if method == "FT":
+        return retain_features, retain_labels, None
+    if method == "GA":
+        return forget_features, forget_labels, None
+    # RL and SalUn train on retain and forget data together, relabelling forget samples
+    features = torch.cat([retain_features, forget_features])
+    labels = torch.cat([retain_labels, forget_labels])
+    is_forget = torch.cat([
+        torch.zeros(len(retain_labels), dtype=torch.bool, device=labels.device),
+        torch.ones(len(forget_labels), dtype=torch.bool, device=labels.device)
+    ])
+    return features, labels, is_forget
+
+
+@timed("train_head")
+def train_linear_head(
+    fc,
+    retain_features,
+    retain_labels,
+    forget_features,
+    forget_labels,
+    forget_class,
+    method="FT",
+    epochs=10,
+    learning_rate=0.01,
+    batch_size=None,
+    momentum=0.9,
+    weight_decay=5e-4,
+    saliency_threshold=0.5,
+    num_classes=10,
+    stop_fn=None,
+    epoch_callback=None
+):
+    """
+    Unlearn with a linear head on cached penultimate features.
+
+    Args:
+        fc: Linear head, updated in place
+        retain_features, retain_labels: Cached retain set
+        forget_features, forget_labels: Cached forget set
+        forget_class: Class to forget
+        method: One of HEAD_ONLY_METHODS
+        epochs: Number of passes over the cached features
+        learning_rate: SGD learning rate
+        batch_size: Mini-batch size, or None for one full-batch step per epoch
+        momentum: SGD momentum
+        weight_decay: SGD weight decay
+        saliency_threshold: Fraction of head parameters updated by SalUn
+        num_classes: Number of classes
+        stop_fn: Optional callable returning True to abort training
+        epoch_callback: Optional callable(epoch, loss) run after every epoch
+
+    Returns:
+        List of mean training losses per completed epoch
+    """
+    if method not in HEAD_ONLY_METHODS:
+        raise ValueError(f"Unknown head-only method '{method}' (expected one of {HEAD_ONLY_METHODS})")
+
+    features, labels, is_forget = _head_training_data(
+        method, retain_features, retain_labels, forget_features, forget_labels
+    )
+    remain_classes = torch.tensor(
+        [c for c in range(num_classes) if c != forget_class], device=labels.device
+    )
+
+    saliency_mask = None
+    if method == "SalUn":
+        saliency_mask = compute_head_saliency_mask(
+            fc, forget_features, forget_labels, saliency_threshold
+        )
+
+    optimizer = torch.optim.SGD(
+        fc.parameters(), lr=learning_rate, momentum=momentum, weight_decay=weight_decay
+    )
+    num_samples = len(labels)
+    step_size = batch_size or num_samples
+    epoch_losses = []
+
+    for epoch in range(epochs):
+        order = torch.randperm(num_samples, device=labels.device)
+        running_loss = 0.0
+        num_steps = 0
+
+        for start in range(0, num_samples, step_size):
+            if stop_fn is not None and stop_fn():
+                return epoch_losses
+
+            batch_indices = order[start:start + step_size]
+            batch_features = features[batch_indices]
+            batch_labels = labels[batch_indices]
+
+            if is_forget is not None:
+                # Relabel forget samples with random remaining classes
+                batch_forget = is_forget[batch_indices]
+                random_labels = remain_classes[
+                    torch.randint(0, len(remain_classes), batch_labels.shape, device=labels.device)
+                ]
+                batch_labels = torch.where(batch_forget, random_labels, batch_labels)
+
+            optimizer.zero_grad()
+            loss = F.cross_entropy(fc(batch_features), batch_labels)
+            if method == "GA":
+                loss = -loss
+            loss.backward()
+
+            if saliency_mask is not None:
+                for name, param in fc.named_parameters():
+                    param.grad.mul_(saliency_mask[name])
+            if method in ("GA", "SalUn"):
+                torch.nn.utils.clip_grad_norm_(fc.parameters(), MAX_GRAD_NORM)
+
+            optimizer.step()
+            running_loss += loss.item()
+            num_steps += 1
+
+        epoch_losses.append(running_loss / num_steps)
+        if epoch_callback is not None:
+            epoch_callback(epoch, epoch_losses[-1])
+
+    return epoch_losses
+
+
+def evaluate_linear_head(fc, features, labels, num_classes=10):
+    """
+    Per-class accuracies of a linear head on cached features.
+
+    Returns:
+        Dictionary mapping class index to accuracy
+    """
+    with torch.no_grad():
+        correct = (fc(features).argmax(1) == labels).float()
+    class_correct = torch.bincount(labels, weights=correct, minlength=num_classes)
+    class_total = torch.bincount(labels, minlength=num_classes).clamp(min=1)
+    return {i: acc for i, acc in enumerate((class_correct / class_total).tolist())}
+
+
+def sweep_linear_head(
+    fc,
+    train_features,
+    train_labels,
+    test_features,
+    test_labels,
+    forget_class,
+    method,
+    settings,
+    num_classes=10
+):
+    """
+    Run head-only unlearning for many hyperparameter settings.
+
+    Every setting starts from a fresh copy of `fc`, so the cached features are
+    shared by all runs and the backbone is never evaluated.
+
+    Args:
+        fc: Linear head of the base model (not modified)
+        train_features, train_labels: Cached train set features
+        test_features, test_labels: Cached test set features
+        forget_class: Class to forget
+        method: One of HEAD_ONLY_METHODS
+        settings: Iterable of keyword dictionaries for train_linear_head
+            (e.g. {"learning_rate": 0.01, "epochs": 20})
+        num_classes: Number of classes
+
+    Returns:
+        List of result dictionaries with the setting and its UA/RA/TUA/TRA
+    """
+    forget_mask = train_labels == forget_class
+    remain_classes = [i for i in range(num_classes) if i != forget_class]
+    results = []
+
+    for setting in settings:
+        head = copy.deepcopy(fc)
+        losses = train_linear_head(
+            head,
+            train_features[~forget_mask], train_labels[~forget_mask],
+            train_features[forget_mask], train_labels[forget_mask],
+            forget_class,
+            method=method,
+            num_classes=num_classes,
+            **setting
+        )
+        train_accs = evaluate_linear_head(head, train_features, train_labels, num_classes)
+        test_accs = evaluate_linear_head(head, test_features, test_labels, num_classes)
+        results.append({
+            **setting,
+            "loss": round(losses[-1], 4) if losses else None,
+            "UA": round(train_accs[forget_class], 3),
+            "RA": round(sum(train_accs[i] for i in remain_classes) / len(remain_classes), 3),
+            "TUA": round(test_accs[forget_class], 3),
+            "TRA": round(sum(test_accs[i] for i in remain_classes) / len(remain_classes), 3),
+        })
+
+    return results
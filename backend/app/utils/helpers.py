@@ -2,9 +2,25 @@ import os
 import torch
 import numpy as np
 import logging
-import shutil
 from huggingface_hub import hf_hub_download
 
+from app.config import CHECKPOINT_DELTA, CHECKPOINT_FORMAT
+from app.utils.checkpoint_delta import DELTA_CHECKPOINT_FORMAT, decode_delta, encode_delta
+from app.utils.checkpoint_io import (
+    checkpoint_stem,
+    read_checkpoint,
+    resolve_checkpoint_path,
+    write_checkpoint
+)
+from app.utils.model_pool import get_state_dict
+from app.utils.model_store import adopt_file, checkpoint_sha256, link_blob, put_file
+from app.models.lora import (
+    LORA_CHECKPOINT_FORMAT,
+    has_lora_adapters,
+    lora_state_dict,
+    merge_lora_state_dict
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,15 +36,85 @@ def save_model(
     model, 
     forget_class=-1,
     model_name="ffff",
+    base_weights_path=None,
 ):
+    """
+    Save a model to unlearned_models/{forget_class}/{model_name}.
+    
+    LoRA models are saved as adapter checkpoints. Other models fine-tuned from
+    `base_weights_path` are saved as delta checkpoints in the CHECKPOINT_DELTA
+    encoding (None stores the full state dict).
+    """
     save_dir = f'unlearned_models/{forget_class}'
     if not os.path.exists(save_dir):
         os.makedirs(save_dir)
     
-    model_filename = f"{model_name}.pth"
-    model_path = os.path.join(save_dir, model_filename)
+    model_path = os.path.join(save_dir, model_name)
+    
+    if has_lora_adapters(model):
+        # Adapter runs only store the low-rank deltas and a reference to the base weights
+        base_weights_path = model.lora_config["base_weights"]
+        return write_checkpoint({
+            "format": LORA_CHECKPOINT_FORMAT,
+            "rank": model.lora_config["rank"],
+            "alpha": model.lora_config["alpha"],
+            "base_weights": base_weights_path,
+            "base_sha256": checkpoint_sha256(resolve_checkpoint_path(base_weights_path)),
+            "state_dict": lora_state_dict(model),
+        }, model_path)
+    
+    base_path = resolve_checkpoint_path(base_weights_path) if base_weights_path else None
+    if CHECKPOINT_DELTA and base_path is not None:
+        kinds, stored = encode_delta(model.state_dict(), get_state_dict(base_path), CHECKPOINT_DELTA)
+        return write_checkpoint({
+            "format": DELTA_CHECKPOINT_FORMAT,
+            "encoding": CHECKPOINT_DELTA,
+            "base_weights": base_path,
+            "base_sha256": checkpoint_sha256(base_path),
+            "tensors": kinds,
+            "state_dict": stored,
+        }, model_path)
+    return write_checkpoint(model.state_dict(), model_path)
+
+def is_adapter_checkpoint(checkpoint):
+    return isinstance(checkpoint, dict) and checkpoint.get("format") == LORA_CHECKPOINT_FORMAT
+
+def is_delta_checkpoint(checkpoint):
+    return isinstance(checkpoint, dict) and checkpoint.get("format") == DELTA_CHECKPOINT_FORMAT
+
+def needs_base_weights(checkpoint):
+    """Whether a checkpoint is stored relative to base weights (adapter or delta)."""
+    return is_adapter_checkpoint(checkpoint) or is_delta_checkpoint(checkpoint)
+
+def load_model_state_dict(path, map_location=None):
+    """
+    Load a full model state dict from a checkpoint file.
+    
+    Adapter and delta checkpoints written by save_model are merged into the
+    base checkpoint they reference, so callers always receive a state dict
+    that get_resnet18() can load directly.
+    """
+    checkpoint = read_checkpoint(path, map_location=map_location)
+    if not needs_base_weights(checkpoint):
+        return checkpoint
+    
+    kind = "delta" if is_delta_checkpoint(checkpoint) else "adapter"
+    base_weights_path = resolve_checkpoint_path(checkpoint["base_weights"])
+    if base_weights_path is None:
+        raise FileNotFoundError(
+            f"Base weights '{checkpoint['base_weights']}' referenced by {kind} checkpoint '{path}' not found"
+        )
+    if checkpoint_sha256(base_weights_path) != checkpoint["base_sha256"]:
+        raise ValueError(
+            f"Base weights '{base_weights_path}' changed since {kind} checkpoint '{path}' was saved"
+        )
     
-    torch.save(model.state_dict(), model_path)
+    base_state_dict = load_model_state_dict(base_weights_path, map_location=map_location)
+    if is_delta_checkpoint(checkpoint):
+        return decode_delta(checkpoint["tensors"], checkpoint["state_dict"], base_state_dict)
+    return merge_lora_state_dict(
+        base_state_dict, checkpoint["state_dict"], checkpoint["rank"], checkpoint["alpha"]
+    )
 
 def format_distribution(distribution):
     return {
@@ -39,17 +125,31 @@ def format_distribution(distribution):
 def compress_prob_array(prob_array, threshold=0.001):
     return {str(i): round(p, 3) for i, p in enumerate(prob_array) if p > threshold}
 
+def _existing_checkpoint(path):
+    """Stored checkpoint for `path` in any format, ignoring symlinks into the hub cache."""
+    existing = resolve_checkpoint_path(path)
+    if existing is None or os.path.islink(existing):
+        return None
+    return existing
+
+def _store_checkpoint(source_path, target_path):
+    if CHECKPOINT_FORMAT == "safetensors":
+        return write_checkpoint(torch.load(source_path, map_location="cpu"), target_path)
+    return link_blob(put_file(source_path, ".pth"), checkpoint_stem(target_path) + ".pth")
+
 def download_weights_from_hub(repo_id="jaeunglee/resnet18-cifar10-unlearning", 
                               base_path="trained_models"):
     """Download weights from HuggingFace Hub and save them in multiple locations.
     
     The function performs the following:
-      1. The full model is downloaded once and saved as "0000.pth" in the trained_models folder.
+      1. The full model is downloaded once and saved as "0000" in the trained_models folder.
       2. For each of the 10 classes (0-9), under unlearned_models, a folder is created where two files are stored:
-         - A copy of the full model saved as "000{class_idx}.pth"
-         - The retrained model for that class saved as "a00{class_idx}.pth"
-         
-    Additionally, only files that are newly downloaded/copied are logged.
+         - The full model saved as "000{class_idx}"
+         - The retrained model for that class saved as "a00{class_idx}"
+    
+    Files are stored in CHECKPOINT_FORMAT through the model store, so the class copies are
+    hardlinks to the trained model's blob rather than copies; existing checkpoints in either
+    format are kept and adopted into the store. Only newly downloaded/linked files are logged.
     """
     logger.info("Starting model weights download...")
 
@@ -71,35 +171,44 @@ def download_weights_from_hub(repo_id="jaeunglee/resnet18-cifar10-unlearning",
         logger.info("Processing full model file...")
 
         # For the full model in the trained_models folder, only download/copy if needed.
-        trained_full_model_path = os.path.join(trained_models_dir, "0000.pth")
-        if not (os.path.exists(trained_full_model_path) and not os.path.islink(trained_full_model_path)):
+        trained_full_model_path = _existing_checkpoint(os.path.join(trained_models_dir, "0000.pth"))
+        if trained_full_model_path is None:
             logger.info("Downloading full model from Hugging Face Hub...")
             full_model_path_hub = hf_hub_download(repo_id=repo_id, filename="resnet18_cifar10_full.pth")
-            shutil.copyfile(full_model_path_hub, trained_full_model_path)
+            trained_full_model_path = _store_checkpoint(
+                full_model_path_hub, os.path.join(trained_models_dir, "0000")
+            )
             downloaded_files.append(trained_full_model_path)
             logger.info(f"Saved full trained model to: {trained_full_model_path}")
-        else:
-            # Reuse the existing full model file
-            full_model_path_hub = trained_full_model_path
+        # Class copies link to the stored file's blob so they share its contents and format
+        full_model_blob = adopt_file(trained_full_model_path)
 
-        # For each class, copy the full model (if not present) and download the unlearned model.
+        # For each class, link the full model (if not present) and download the unlearned model.
         for class_idx in range(10):
             class_dir = os.path.join(unlearned_models_dir, str(class_idx))
             os.makedirs(class_dir, exist_ok=True)
             
-            # Copy the full model for this class if needed.
-            class_full_model_path = os.path.join(class_dir, f"000{class_idx}.pth")
-            if not (os.path.exists(class_full_model_path) and not os.path.islink(class_full_model_path)):
-                shutil.copyfile(full_model_path_hub, class_full_model_path)
+            # Link the full model for this class if needed.
+            class_full_model_path = os.path.join(class_dir, f"000{class_idx}")
+            existing_path = _existing_checkpoint(class_full_model_path)
+            if existing_path is None:
+                class_full_model_path = link_blob(
+                    full_model_blob, class_full_model_path + os.path.splitext(full_model_blob)[1]
+                )
                 downloaded_files.append(class_full_model_path)
-                logger.info(f"Copied full model for class {class_idx} to: {class_full_model_path}")
+                logger.info(f"Linked full model for class {class_idx} to: {class_full_model_path}")
+            else:
+                adopt_file(existing_path)
             
             # Download the unlearned model for this class if needed.
-            unlearned_model_save_path = os.path.join(class_dir, f"a00{class_idx}.pth")
-            if not (os.path.exists(unlearned_model_save_path) and not os.path.islink(unlearned_model_save_path)):
+            unlearned_model_save_path = os.path.join(class_dir, f"a00{class_idx}")
+            existing_path = _existing_checkpoint(unlearned_model_save_path)
+            if existing_path is not None:
+                adopt_file(existing_path)
+            else:
                 filename = f"resnet18_cifar10_no_{get_class_name(class_idx)}.pth"
                 model_path = hf_hub_download(repo_id=repo_id, filename=filename)
-                shutil.copyfile(model_path, unlearned_model_save_path)
+                unlearned_model_save_path = _store_checkpoint(model_path, unlearned_model_save_path)
                 downloaded_files.append(unlearned_model_save_path)
                 logger.info(f"Downloaded unlearned model for class {class_idx} to: {unlearned_model_save_path}")
         
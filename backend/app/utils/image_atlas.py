@@ -0,0 +1,177 @@
+"""
+Sprite-sheet atlases of the CIFAR-10 training images shown in the UI.
+
+The UMAP subset (the same UMAP_DATA_SIZE per-class sample the unlearning
+threads evaluate, so every plotted point's image is in it) is packed into one
+PNG sheet per class: 32x32 tiles laid out row-major in IMAGE_ATLAS_COLUMNS
+columns. An index map gives the class sheet and pixel offset of every image.
+Sheets and map are written once under IMAGE_ATLAS_DIR/{version}/, where the
+version is a hash of the layout, so sheet URLs carrying it can be cached as
+immutable. Images outside the subset are served by the batched endpoint, which
+packs any list of indices into a single response.
+"""
+import base64
+import hashlib
+import io
+import json
+import math
+import os
+import tempfile
+import threading
+
+import numpy as np
+from PIL import Image
+
+from app.config import IMAGE_ATLAS_COLUMNS, IMAGE_ATLAS_DIR, UMAP_DATA_SIZE, UNLEARN_SEED
+
+TILE_SIZE = 32
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_lock = threading.Lock()
+_atlas = None
+
+
+def encode_png(image):
+    """PNG bytes of one HxWx3 uint8 image."""
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def build_sheet(images, columns=IMAGE_ATLAS_COLUMNS, optimize=False):
+    """
+    Pack images into one PNG sprite sheet.
+
+    Args:
+        images: Array of shape [N, 32, 32, 3]
+        columns: Tiles per row; image i is at (i % columns, i // columns) * 32
+        optimize: Let PIL search for a smaller PNG encoding (slower)
+
+    Returns:
+        PNG bytes of a (ceil(N / columns) * 32) x (columns * 32) image
+    """
+    images = np.asarray(images, dtype=np.uint8)
+    count = len(images)
+    columns = max(1, min(columns, count))
+    rows = math.ceil(count / columns)
+    tiles = np.zeros((rows * columns, TILE_SIZE, TILE_SIZE, 3), dtype=np.uint8)
+    tiles[:count] = images
+    sheet = (
+        tiles.reshape(rows, columns, TILE_SIZE, TILE_SIZE, 3)
+        .transpose(0, 2, 1, 3, 4)
+        .reshape(rows * TILE_SIZE, columns * TILE_SIZE, 3)
+    )
+    buffer = io.BytesIO()
+    Image.fromarray(sheet).save(buffer, format="PNG", optimize=optimize)
+    return buffer.getvalue()
+
+
+def encode_batch(x_train, indices, fmt="json", columns=IMAGE_ATLAS_COLUMNS):
+    """
+    Images of a list of dataset indices in one response body.
+
+    Args:
+        x_train: Training images, shape [N, 32, 32, 3]
+        indices: Dataset indices, in the order they are returned
+        fmt: "json" for {"images": [{"index", "base64"}]} (the /image/all_subset
+            format) or "png" for a sprite sheet with the tiles in request order
+        columns: Tiles per row of the "png" sheet
+
+    Returns:
+        Response body bytes
+    """
+    if fmt == "png":
+        return build_sheet(x_train[indices], columns)
+    images = [
+        {"index": int(index), "base64": base64.b64encode(encode_png(x_train[index])).decode("utf-8")}
+        for index in indices
+    ]
+    return json.dumps({"images": images}).encode("utf-8")
+
+
+def _write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _layout(y_train):
+    from app.utils.data_loader import get_fixed_umap_indices
+
+    indices_dict = get_fixed_umap_indices(total_samples=UMAP_DATA_SIZE, seed=UNLEARN_SEED, y_train=y_train)
+    layout = {str(class_id): [int(index) for index in indices] for class_id, indices in sorted(indices_dict.items())}
+    version = hashlib.blake2b(
+        json.dumps({"columns": IMAGE_ATLAS_COLUMNS, "tile_size": TILE_SIZE, "layout": layout}, sort_keys=True).encode(),
+        digest_size=8
+    ).hexdigest()
+    return version, layout
+
+
+def _build_atlas(x_train, y_train):
+    version, layout = _layout(y_train)
+    atlas_dir = os.path.join(IMAGE_ATLAS_DIR, version)
+    map_path = os.path.join(atlas_dir, "map.json")
+    if os.path.exists(map_path):
+        with open(map_path, "r", encoding="utf-8") as f:
+            atlas_map = json.load(f)
+    else:
+        os.makedirs(atlas_dir, exist_ok=True)
+        sheets = {}
+        offsets = {}
+        for class_id, indices in layout.items():
+            _write_atomic(
+                os.path.join(atlas_dir, f"cifar10_{class_id}.png"),
+                build_sheet(x_train[indices], IMAGE_ATLAS_COLUMNS, optimize=True)
+            )
+            columns = min(IMAGE_ATLAS_COLUMNS, len(indices))
+            sheets[class_id] = {
+                "count": len(indices),
+                "width": columns * TILE_SIZE,
+                "height": math.ceil(len(indices) / columns) * TILE_SIZE,
+            }
+            for position, index in enumerate(indices):
+                offsets[str(index)] = [
+                    int(class_id),
+                    (position % columns) * TILE_SIZE,
+                    (position // columns) * TILE_SIZE,
+                ]
+        atlas_map = {
+            "version": version,
+            "tile_size": TILE_SIZE,
+            "columns": IMAGE_ATLAS_COLUMNS,
+            "sheets": sheets,
+            "offsets": offsets,
+        }
+        # The map is written last: its presence marks a complete atlas
+        _write_atomic(map_path, json.dumps(atlas_map).encode("utf-8"))
+
+    sheets = {}
+    for class_id in atlas_map["sheets"]:
+        with open(os.path.join(atlas_dir, f"cifar10_{class_id}.png"), "rb") as f:
+            sheets[class_id] = f.read()
+    return {
+        "version": version,
+        "map": atlas_map,
+        "map_body": json.dumps(atlas_map).encode("utf-8"),
+        "sheets": sheets,
+    }
+
+
+def get_atlas(x_train, y_train):
+    """
+    The UMAP subset atlas, built on first use and then kept in memory.
+
+    Returns:
+        Dictionary with the atlas `version`, the index `map` (and its JSON
+        `map_body`) and the PNG bytes of the `sheets` keyed by class ("0".."9")
+    """
+    global _atlas
+    with _lock:
+        if _atlas is None:
+            _atlas = _build_atlas(x_train, y_train)
+        return _atlas
@@ -0,0 +1,170 @@
+"""
+Inference-optimised copies of models for evaluation passes.
+
+Evaluation runs the training module graph in eval() mode, where every
+BatchNorm is a fixed affine transform. get_inference_model builds a read-only
+copy with BatchNorm folded into the preceding convolution (and LoRA adapters
+merged into their base layers), optionally frozen with TorchScript or
+torch.compile, and caches it until the weights of the source model change.
+
+The cache key uses the version counters and storage of every parameter and
+buffer instead of hashing the tensors: optimizer steps and load_state_dict
+update tensors in place and bump their versions, so a stale copy is never
+reused while an unchanged model (e.g. between the train, test, UMAP and attack
+stages of one run) hits the cache.
+"""
+import copy
+import threading
+import weakref
+from collections import OrderedDict
+
+import torch
+import torch.nn as nn
+from torch.nn.utils.fusion import fuse_conv_bn_eval
+from torchvision.models.resnet import ResNet
+
+from app.config import EVAL_FOLD_BN, EVAL_COMPILE, EVAL_MODEL_CACHE_SIZE
+from app.models.lora import LoRAConv2d, LoRALinear
+
+COMPILE_MODES = (None, "trace", "inductor")
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _weights_key(model):
+    return tuple(
+        (tensor.data_ptr(), tensor._version)
+        for tensor in list(model.parameters()) + list(model.buffers())
+    )
+
+
+def merge_lora_layers(module):
+    """Replace LoRA-wrapped layers of `module` with plain layers holding the merged weights (in place)."""
+    for name, child in module.named_children():
+        if isinstance(child, (LoRAConv2d, LoRALinear)):
+            merged = copy.deepcopy(child.base)
+            with torch.no_grad():
+                merged.weight.add_(child.delta_weight().to(merged.weight.dtype))
+            setattr(module, name, merged)
+        else:
+            merge_lora_layers(child)
+
+
+def _fold_pair(parent, conv_name, bn_name):
+    conv = getattr(parent, conv_name)
+    bn = getattr(parent, bn_name)
+    if isinstance(conv, nn.Conv2d) and isinstance(bn, nn.BatchNorm2d):
+        setattr(parent, conv_name, fuse_conv_bn_eval(conv, bn))
+        setattr(parent, bn_name, nn.Identity())
+
+
+def fold_batchnorm(model):
+    """
+    Fold the BatchNorm layers of a ResNet into the preceding convolutions (in place).
+
+    The model must be in eval mode. Module names are unchanged, so forward hooks
+    on e.g. `avgpool` or `layer4` can be registered on the folded model.
+    """
+    _fold_pair(model, "conv1", "bn1")
+    for layer in (model.layer1, model.layer2, model.layer3, model.layer4):
+        for block in layer:
+            _fold_pair(block, "conv1", "bn1")
+            _fold_pair(block, "conv2", "bn2")
+            if block.downsample is not None:
+                _fold_pair(block.downsample, "0", "1")
+    return model
+
+
+def _compile(model, mode, device):
+    if mode == "trace":
+        example = torch.zeros(1, 3, 32, 32, device=device)
+        with torch.no_grad():
+            return torch.jit.freeze(torch.jit.trace(model, example))
+    return torch.compile(model, dynamic=True)
+
+
+def build_inference_model(model, compile_mode=None):
+    """
+    Build an eval-only copy of `model` with folded BatchNorm.
+
+    Args:
+        model: ResNet model (optionally with LoRA adapters)
+        compile_mode: None, 'trace' (frozen TorchScript) or 'inductor' (torch.compile)
+
+    Returns:
+        Optimised model that must not be trained or modified
+    """
+    if compile_mode not in COMPILE_MODES:
+        raise ValueError(f"Unknown compile mode '{compile_mode}' (expected one of {COMPILE_MODES})")
+
+    inference_model = copy.deepcopy(model).eval()
+    for param in inference_model.parameters():
+        param.grad = None
+        param.requires_grad_(False)
+    merge_lora_layers(inference_model)
+    fold_batchnorm(inference_model)
+    if getattr(model, "channels_last", False):
+        inference_model.to(memory_format=torch.channels_last)
+
+    # Traced graphs bake in the autocast region, so only fp32 models are traced
+    if compile_mode == "trace" and getattr(model, "precision", "fp32") != "fp32":
+        compile_mode = None
+    if compile_mode is not None:
+        device = next(model.parameters()).device
+        try:
+            inference_model = _compile(inference_model, compile_mode, device)
+        except Exception as e:
+            print(f"Inference compilation ({compile_mode}) failed, using eager model: {e}")
+    return inference_model
+
+
+def get_inference_model(model, hooks=False):
+    """
+    Return a cached inference-optimised copy of `model` for evaluation.
+
+    Falls back to the model itself when folding is disabled (EVAL_FOLD_BN) or the
+    model is not a ResNet.
+
+    Args:
+        model: Model to evaluate
+        hooks: Whether forward hooks will be registered on the returned model's
+            submodules; compiled graphs do not run submodule hooks, so an eager
+            folded copy is returned in that case
+
+    Returns:
+        Model to call for inference
+    """
+    if not EVAL_FOLD_BN or not isinstance(model, ResNet):
+        return model
+
+    compile_mode = None if hooks else EVAL_COMPILE
+    key = (
+        id(model),
+        getattr(model, "precision", "fp32"),
+        getattr(model, "channels_last", False),
+        compile_mode,
+    )
+    weights_key = _weights_key(model)
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            source_ref, cached_weights_key, inference_model = entry
+            if source_ref() is model and cached_weights_key == weights_key:
+                _cache.move_to_end(key)
+                return inference_model
+            del _cache[key]
+
+    inference_model = build_inference_model(model, compile_mode)
+
+    with _cache_lock:
+        _cache[key] = (weakref.ref(model), weights_key, inference_model)
+        while len(_cache) > EVAL_MODEL_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return inference_model
+
+
+def clear_inference_cache():
+    with _cache_lock:
+        _cache.clear()
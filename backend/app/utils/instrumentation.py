@@ -0,0 +1,273 @@
+"""
+Stage-level timing spans of training and unlearning jobs.
+
+A job (one service call, see run_in_worker_loop) collects the spans of its
+pipeline stages: data setup, index building, saliency/Fisher, every training
+epoch, epoch metrics, evaluation, activations, UMAP, PS, MIA, CKA, result
+serialisation and model save. The current job is held in a context variable,
+which follows the service into its training thread (the thread base classes
+copy the context), so pipeline helpers record spans without a job handle
+being passed around; outside a job, spans only feed the process-wide totals.
+
+Every span records its duration and, where known, the number of samples it
+processed. The per-job summary is stored in the result JSON under "timings",
+and the totals over all jobs are served in the Prometheus text format by
+GET /metrics. Job listeners (add_job_listener) are told when spans start and
+finish, which app.utils.profiling uses to profile selected stages.
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds (seconds) of the stage duration histogram buckets
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0)
+
+_current_job = contextvars.ContextVar("instrumentation_job", default=None)
+_lock = threading.Lock()
+_stages = {}
+_jobs = {}
+
+
+class _Job:
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.spans = []
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    def notify(self, event, stage_span):
+        for listener in self.listeners:
+            getattr(listener, event)(stage_span)
+
+
+class Span:
+    """
+    Timing of one stage. Started on creation and recorded once, by finish()
+    or when leaving its `with` block.
+    """
+
+    def __init__(self, stage, samples=None):
+        self.stage = stage
+        self.samples = samples
+        self.seconds = None
+        self._job = _current_job.get()
+        if self._job is not None:
+            self._job.notify("span_started", self)
+        self._start = time.perf_counter()
+
+    def add_samples(self, count):
+        self.samples = (self.samples or 0) + count
+
+    def finish(self, samples=None):
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self._start
+            if samples is not None:
+                self.samples = samples
+            _record(self._job, self)
+            if self._job is not None:
+                self._job.notify("span_finished", self)
+        return self.seconds
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish()
+        return False
+
+
+def span(stage, samples=None):
+    """Start a span of `stage`; use it as a context manager or call finish()."""
+    return Span(stage, samples)
+
+
+def loader_samples(name):
+    """`samples` of timed(): size of the dataset of the data loader argument `name`."""
+    return lambda arguments: len(arguments[name].dataset)
+
+
+def timed(stage, samples=None):
+    """
+    Decorator recording every call of a function or coroutine function as a span.
+
+    Args:
+        stage: Stage name
+        samples: Optional callable mapping the call's arguments (a dictionary
+            keyed by parameter name, defaults applied) to its sample count
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def count(args, kwargs):
+            if samples is None:
+                return None
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                return samples(bound.arguments)
+            except Exception:
+                return None
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with span(stage, count(args, kwargs)):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with span(stage, count(args, kwargs)):
+                    return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def _record(job, finished):
+    service = job.name if job is not None else "none"
+    with _lock:
+        stats = _stages.setdefault((service, finished.stage), {
+            "count": 0,
+            "seconds": 0.0,
+            "samples": 0,
+            "buckets": [0] * len(DURATION_BUCKETS),
+        })
+        stats["count"] += 1
+        stats["seconds"] += finished.seconds
+        stats["samples"] += finished.samples or 0
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if finished.seconds <= bound:
+                stats["buckets"][i] += 1
+                break
+    if job is not None:
+        with job.lock:
+            job.spans.append((finished.stage, finished.seconds, finished.samples))
+
+
+@contextmanager
+def job_timings(name):
+    """Collect the spans recorded in this context (and threads copying it) as job `name`."""
+    job = _Job(name)
+    token = _current_job.set(job)
+    try:
+        yield job
+    finally:
+        _current_job.reset(token)
+        elapsed = time.perf_counter() - job.start
+        with _lock:
+            stats = _jobs.setdefault(name, {"count": 0, "seconds": 0.0})
+            stats["count"] += 1
+            stats["seconds"] += elapsed
+        stages = job_summary(job)["stages"]
+        if stages:
+            print(f"Timings of {name} ({elapsed:.3f}s): " + ", ".join(
+                f"{stage} {entry['seconds']:.3f}s" for stage, entry in stages.items()
+            ))
+
+
+def add_job_listener(listener):
+    """
+    Notify `listener` of the spans of the current job: its span_started(span)
+    and span_finished(span) are called in the thread recording the span, before
+    the span's timing starts and after it stops.
+
+    Returns:
+        False outside a job, else True
+    """
+    job = _current_job.get()
+    if job is None:
+        return False
+    job.listeners.append(listener)
+    return True
+
+
+def job_summary(job=None):
+    """
+    Per-stage timings of a job (by default the current one), or None outside a job.
+
+    Returns:
+        Dictionary with the job's `total_seconds` so far and its `stages`, each
+        with the span `count`, total `seconds` and, when sample counts were
+        recorded, `samples` and `samples_per_second`
+    """
+    job = job or _current_job.get()
+    if job is None:
+        return None
+    with job.lock:
+        spans = list(job.spans)
+
+    stages = {}
+    for stage, seconds, samples in spans:
+        entry = stages.setdefault(stage, {"count": 0, "seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] += seconds
+        if samples is not None:
+            entry["samples"] = entry.get("samples", 0) + samples
+    for entry in stages.values():
+        if entry.get("samples") and entry["seconds"] > 0:
+            entry["samples_per_second"] = round(entry["samples"] / entry["seconds"], 1)
+        entry["seconds"] = round(entry["seconds"], 3)
+    return {
+        "total_seconds": round(time.perf_counter() - job.start, 3),
+        "stages": stages,
+    }
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+def render_metrics():
+    """Totals of all jobs and stages in the Prometheus text exposition format."""
+    with _lock:
+        stages = {key: dict(value, buckets=list(value["buckets"])) for key, value in _stages.items()}
+        jobs = {key: dict(value) for key, value in _jobs.items()}
+
+    lines = [
+        "# HELP mu_jobs_total Finished training and unlearning jobs.",
+        "# TYPE mu_jobs_total counter",
+    ]
+    lines += [f"mu_jobs_total{_labels(service=name)} {stats['count']}" for name, stats in sorted(jobs.items())]
+    lines += [
+        "# HELP mu_job_seconds_total Wall time of finished jobs.",
+        "# TYPE mu_job_seconds_total counter",
+    ]
+    lines += [f"mu_job_seconds_total{_labels(service=name)} {stats['seconds']:.6f}" for name, stats in sorted(jobs.items())]
+
+    lines += [
+        "# HELP mu_stage_duration_seconds Duration of job pipeline stages.",
+        "# TYPE mu_stage_duration_seconds histogram",
+    ]
+    for (service, stage), stats in sorted(stages.items()):
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS, stats["buckets"]):
+            cumulative += count
+            lines.append(f"mu_stage_duration_seconds_bucket{_labels(service=service, stage=stage, le=bound)} {cumulative}")
+        lines.append(f"mu_stage_duration_seconds_bucket{_labels(service=service, stage=stage, le='+Inf')} {stats['count']}")
+        lines.append(f"mu_stage_duration_seconds_sum{_labels(service=service, stage=stage)} {stats['seconds']:.6f}")
+        lines.append(f"mu_stage_duration_seconds_count{_labels(service=service, stage=stage)} {stats['count']}")
+
+    counted = [(key, stats) for key, stats in sorted(stages.items()) if stats["samples"]]
+    lines += [
+        "# HELP mu_stage_samples_total Samples processed by job pipeline stages.",
+        "# TYPE mu_stage_samples_total counter",
+    ]
+    lines += [
+        f"mu_stage_samples_total{_labels(service=service, stage=stage)} {stats['samples']}"
+        for (service, stage), stats in counted
+    ]
+    lines += [
+        "# HELP mu_stage_samples_per_second Average throughput of job pipeline stages.",
+        "# TYPE mu_stage_samples_per_second gauge",
+    ]
+    lines += [
+        f"mu_stage_samples_per_second{_labels(service=service, stage=stage)} {stats['samples'] / stats['seconds']:.3f}"
+        for (service, stage), stats in counted if stats["seconds"] > 0
+    ]
+    return "\n".join(lines) + "\n"
@@ -276,4 +276,99 @@ def get_layer_group_info():
         9: {'name': 'Final layer (fc)', 'approx_params': 5130}
     }
     
-    return group_info
\ No newline at end of file
+    return group_info
+
+def set_frozen_batchnorm_eval(model, k):
+    """
+    Put the BatchNorm layers of the first k layer groups into eval mode.
+    
+    Frozen groups must not update their running statistics, otherwise their
+    outputs drift between epochs even though their weights do not change.
+    Call this after every model.train().
+    
+    Args:
+        model: ResNet18 model
+        k: Number of frozen layer groups from the beginning (0-10)
+    
+    Returns:
+        int: Number of BatchNorm layers switched to eval mode
+    """
+    if k <= 0:
+        return 0
+    
+    layer_groups = get_resnet18_layer_groups(model)
+    num_bn = 0
+    for i in range(min(k, len(layer_groups))):
+        for layer_name, layer_module in layer_groups[i]:
+            if isinstance(layer_module, nn.modules.batchnorm._BatchNorm):
+                layer_module.eval()
+                num_bn += 1
+    
+    return num_bn
+
+
+class ExecutionModeSequential(nn.Sequential):
+    """
+    nn.Sequential that runs in the execution mode of the model its modules come
+    from, as CIFARResNet18.forward does: channels_last inputs and bfloat16
+    autocast with float32 outputs. The mode is read on every call, so
+    set_execution_mode and fp32_execution apply to it as well.
+    """
+
+    def __init__(self, model, *modules):
+        super().__init__(*modules)
+        # A plain function, so the model is not registered as a submodule
+        self._execution_mode = lambda: (
+            getattr(model, "precision", "fp32"), getattr(model, "channels_last", False)
+        )
+
+    def forward(self, x):
+        precision, channels_last = self._execution_mode()
+        if channels_last and x.dim() == 4:
+            x = x.contiguous(memory_format=torch.channels_last)
+        if precision == "bf16":
+            with torch.autocast(device_type=x.device.type, dtype=torch.bfloat16):
+                return super().forward(x).float()
+        return super().forward(x)
+
+
+def split_resnet18_at_group(model, k):
+    """
+    Split a ResNet18 model into a frozen prefix and a trainable suffix.
+    
+    The prefix covers the first k layer groups and the suffix the remaining
+    ones. Both are ExecutionModeSequential containers that share their modules
+    with the original model, so training the suffix updates the model in place,
+    and both run in the model's precision and memory format.
+    When the whole backbone is frozen (k == 9) the average pooling is moved
+    into the prefix so that only 512-dim features have to be cached.
+    
+    Args:
+        model: ResNet18 model
+        k: Number of layer groups in the prefix (1-9)
+    
+    Returns:
+        Tuple of (prefix, suffix) modules
+    """
+    if k < 1 or k > len(RESNET18_LAYER_GROUPS) - 1:
+        raise ValueError(f"Cannot split ResNet18 at layer group {k} (expected 1-9)")
+    
+    blocks = [
+        block
+        for layer in (model.layer1, model.layer2, model.layer3, model.layer4)
+        for block in layer
+    ]
+    stem = [model.conv1, model.bn1, model.relu, model.maxpool]
+    head = [model.avgpool, nn.Flatten(1), model.fc]
+    
+    # Group 0 is the stem, groups 1-8 are residual blocks, group 9 is fc
+    prefix_modules = stem + blocks[:k - 1]
+    suffix_modules = blocks[k - 1:] + head
+    if k == len(RESNET18_LAYER_GROUPS) - 1:
+        prefix_modules += head[:2]
+        suffix_modules = head[2:]
+    
+    return (
+        ExecutionModeSequential(model, *prefix_modules),
+        ExecutionModeSequential(model, *suffix_modules)
+    )
@@ -0,0 +1,112 @@
+"""
+Process-wide pool of deserialised checkpoints.
+
+The same few checkpoints (the base model 000{fc}, the retrain model a00{fc} and
+the base weights of every unlearning job) are loaded several times per job.
+The pool keeps their state dicts on the CPU, and optionally ready eval()
+modules, keyed by the checkpoint's content hash (see app.utils.model_store),
+so identical checkpoints such as the ten 000{fc} copies share one entry and a
+rewritten file never hits a stale one. The least recently used entries are
+evicted once MODEL_POOL_MAX_BYTES is exceeded.
+
+Everything returned by the pool is shared: state dicts are meant to be passed
+to load_state_dict (which copies them into the caller's model) and borrowed
+modules must only be used for inference.
+"""
+import threading
+from collections import OrderedDict
+
+from app.config import MODEL_POOL_MAX_BYTES
+from app.utils.checkpoint_io import resolve_checkpoint_path
+from app.utils.model_store import checkpoint_sha256
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _content_key(path):
+    resolved = resolve_checkpoint_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"Checkpoint '{path}' not found")
+    return (checkpoint_sha256(resolved),)
+
+
+def _tensor_bytes(tensors):
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+def _lookup(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return entry[0]
+        _stats["misses"] += 1
+        return None
+
+
+def _store(key, value, num_bytes):
+    with _lock:
+        _entries[key] = (value, num_bytes)
+        total = sum(size for _, size in _entries.values())
+        while total > MODEL_POOL_MAX_BYTES and len(_entries) > 1:
+            _, (_, size) = _entries.popitem(last=False)
+            total -= size
+            _stats["evictions"] += 1
+    return value
+
+
+def get_state_dict(path):
+    """
+    Shared CPU state dict of a checkpoint (adapter checkpoints are merged).
+
+    The tensors must not be modified in place; load them with
+    model.load_state_dict, which copies them to the model's device.
+    """
+    from app.utils.helpers import load_model_state_dict
+
+    key = ("state_dict",) + _content_key(path)
+    state_dict = _lookup(key)
+    if state_dict is not None:
+        return state_dict
+
+    state_dict = load_model_state_dict(path, map_location="cpu")
+    return _store(key, state_dict, _tensor_bytes(state_dict.values()))
+
+
+def borrow_eval_model(path, device):
+    """
+    Shared get_resnet18 model in eval mode with the weights of `path` on `device`.
+
+    The model is read-only: it must not be trained, modified or put in train mode.
+    """
+    from app.models import get_resnet18
+
+    key = ("module",) + _content_key(path) + (str(device),)
+    model = _lookup(key)
+    if model is not None:
+        return model
+
+    model = get_resnet18().to(device)
+    model.load_state_dict(get_state_dict(path))
+    model.eval()
+    for param in model.parameters():
+        param.requires_grad_(False)
+    num_bytes = _tensor_bytes(list(model.parameters()) + list(model.buffers()))
+    return _store(key, model, num_bytes)
+
+
+def clear_model_pool():
+    with _lock:
+        _entries.clear()
+
+
+def model_pool_stats():
+    with _lock:
+        return dict(
+            _stats,
+            entries=len(_entries),
+            bytes=sum(size for _, size in _entries.values())
+        )
@@ -0,0 +1,337 @@
+"""
+Content-addressed store for checkpoint files.
+
+Every checkpoint is written once as a blob named by its SHA-256
+(model_store/blobs/ab/abcd....safetensors), and the names the rest of the
+backend uses (unlearned_models/{fc}/{id}, trained_models/0000, uploads) are
+hardlinks to that blob. Identical checkpoints, such as the ten per-class copies
+of the trained model or a re-uploaded custom model, take the disk space of one.
+Linked files are only ever replaced (os.replace), never rewritten in place.
+
+The hash is computed when a blob is written and recorded in a manifest keyed by
+path and inode/size/mtime, so checkpoint_sha256 is a stat and a dictionary
+lookup. It is meant to be used as the cache key of anything derived from a
+checkpoint's weights. Removing the last name of a blob removes the blob.
+
+Usage (from the backend directory):
+    python -m app.utils.model_store dedupe   # link existing identical checkpoints
+    python -m app.utils.model_store gc       # drop unreferenced blobs
+    python -m app.utils.model_store stats
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from app.config import MODEL_STORE_DIR
+
+_lock = threading.RLock()
+_manifest = None
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Return the hex SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _blobs_dir():
+    return os.path.join(MODEL_STORE_DIR, "blobs")
+
+
+def _blob_path(sha256, extension):
+    return os.path.join(_blobs_dir(), sha256[:2], sha256 + extension)
+
+
+def _manifest_path():
+    return os.path.join(MODEL_STORE_DIR, "manifest.json")
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def _load_manifest():
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(_manifest_path(), "r") as f:
+                _manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def _save_manifest():
+    os.makedirs(MODEL_STORE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=MODEL_STORE_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(_manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, _manifest_path())
+
+
+def _record(path, sha256, blob):
+    with _lock:
+        _load_manifest()[os.path.abspath(path)] = {
+            "sha256": sha256,
+            "blob": os.path.abspath(blob) if blob else None,
+            "stamp": _stamp(path),
+        }
+        _save_manifest()
+
+
+def _forget(path):
+    with _lock:
+        entry = _load_manifest().pop(os.path.abspath(path), None)
+        if entry is not None:
+            _save_manifest()
+        return entry
+
+
+def _release_blob(blob):
+    # A blob whose only remaining name is the store's own is unreferenced
+    if blob and os.path.isfile(blob) and os.stat(blob).st_nlink == 1:
+        os.remove(blob)
+        _forget(blob)
+
+
+def _put(write_blob, sha256, extension):
+    blob = _blob_path(sha256, extension)
+    with _lock:
+        if not os.path.isfile(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob), suffix=".tmp")
+            os.close(fd)
+            try:
+                write_blob(tmp_path)
+                os.replace(tmp_path, blob)
+            finally:
+                if os.path.lexists(tmp_path):
+                    os.remove(tmp_path)
+            _record(blob, sha256, blob)
+    return blob
+
+
+def put_bytes(data, extension):
+    """Add file contents to the store and return the blob path."""
+    def write_blob(tmp_path):
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+    return _put(write_blob, hashlib.sha256(data).hexdigest(), extension)
+
+
+def put_file(path, extension=None, link_source=False):
+    """
+    Add an existing file to the store and return the blob path.
+
+    Args:
+        path: File to add
+        extension: Blob extension (defaults to the file's)
+        link_source: Hardlink the file into the store instead of copying it; only
+            for files that are themselves never rewritten in place
+    """
+    extension = os.path.splitext(path)[1] if extension is None else extension
+
+    def write_blob(tmp_path):
+        if link_source:
+            try:
+                os.remove(tmp_path)
+                os.link(path, tmp_path)
+                return
+            except OSError:
+                pass
+        shutil.copyfile(path, tmp_path)
+
+    return _put(write_blob, checkpoint_sha256(path), extension)
+
+
+def link_blob(blob, target):
+    """
+    Atomically point `target` at a blob with a hardlink (a copy if the store is on
+    another filesystem) and return `target`.
+    """
+    target_dir = os.path.dirname(target) or "."
+    os.makedirs(target_dir, exist_ok=True)
+    previous = _forget(target) if os.path.lexists(target) else None
+
+    fd, tmp_path = tempfile.mkstemp(dir=target_dir, suffix=".tmp")
+    os.close(fd)
+    os.remove(tmp_path)
+    try:
+        try:
+            os.link(blob, tmp_path)
+        except OSError:
+            shutil.copyfile(blob, tmp_path)
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+
+    sha256 = os.path.splitext(os.path.basename(blob))[0]
+    _record(target, sha256, blob)
+    if previous is not None and previous["blob"] != os.path.abspath(blob):
+        _release_blob(previous["blob"])
+    return target
+
+
+def store_bytes(data, target):
+    """Write file contents to `target` through the store and return `target`."""
+    return link_blob(put_bytes(data, os.path.splitext(target)[1]), target)
+
+
+def store_fileobj(fileobj, target, chunk_size=1 << 20):
+    """
+    Copy a readable binary file object to `target` through the store, in chunks
+    hashed as they are written, and return `target`.
+    """
+    extension = os.path.splitext(target)[1]
+    os.makedirs(_blobs_dir(), exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=_blobs_dir(), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+                digest.update(chunk)
+                f.write(chunk)
+        # The streamed file becomes the blob unless the contents are already stored
+        blob = _put(lambda blob_tmp_path: os.replace(tmp_path, blob_tmp_path), digest.hexdigest(), extension)
+    finally:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+    return link_blob(blob, target)
+
+
+def adopt_file(path):
+    """Turn an existing file into a name of its blob (adding it if new) and return the blob path."""
+    sha256 = checkpoint_sha256(path)
+    blob = _blob_path(sha256, os.path.splitext(path)[1])
+    if not (os.path.isfile(blob) and os.path.samefile(blob, path)):
+        blob = put_file(path, link_source=True)
+    if os.path.samefile(blob, path):
+        _record(path, sha256, blob)
+    else:
+        link_blob(blob, path)
+    return blob
+
+
+def remove_file(path):
+    """Remove one name of a blob, and the blob once nothing links to it."""
+    entry = _forget(path)
+    os.remove(path)
+    if entry is not None:
+        _release_blob(entry["blob"])
+
+
+def checkpoint_sha256(path):
+    """
+    SHA-256 of a file, read from the manifest when the file is unchanged since it
+    was written through the store (or last hashed).
+    """
+    key = os.path.abspath(path)
+    stamp = _stamp(path)
+    with _lock:
+        entry = _load_manifest().get(key)
+        if entry is not None and entry["stamp"] == stamp:
+            return entry["sha256"]
+
+    sha256 = file_sha256(path)
+    with _lock:
+        blob = entry["blob"] if entry is not None and entry["sha256"] == sha256 else None
+        _record(path, sha256, blob)
+    return sha256
+
+
+def dedupe(directories=("trained_models", "unlearned_models")):
+    """
+    Adopt every checkpoint under `directories` into the store, so identical files
+    become links to one blob.
+
+    Returns:
+        Number of bytes freed
+    """
+    from app.utils.checkpoint_io import CHECKPOINT_EXTENSIONS
+
+    freed = 0
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                if not name.endswith(CHECKPOINT_EXTENSIONS) or os.path.islink(path):
+                    continue
+                linked_before = os.stat(path).st_nlink > 1
+                size = os.path.getsize(path)
+                blob = adopt_file(path)
+                if not linked_before and os.stat(blob).st_nlink > 2:
+                    freed += size
+    return freed
+
+
+def collect_garbage(dry_run=False):
+    """
+    Remove blobs that no name links to and manifest entries of missing files.
+
+    Returns:
+        List of removed blob paths
+    """
+    removed = []
+    with _lock:
+        for root, _, files in os.walk(_blobs_dir()):
+            for name in files:
+                blob = os.path.join(root, name)
+                if name.endswith(".tmp") or os.stat(blob).st_nlink == 1:
+                    removed.append(blob)
+                    if not dry_run:
+                        os.remove(blob)
+
+        if not dry_run:
+            manifest = _load_manifest()
+            for key in [key for key in manifest if not os.path.lexists(key)]:
+                del manifest[key]
+            _save_manifest()
+    return removed
+
+
+def store_stats():
+    blobs = 0
+    num_bytes = 0
+    names = 0
+    for root, _, files in os.walk(_blobs_dir()):
+        for name in files:
+            stat = os.stat(os.path.join(root, name))
+            blobs += 1
+            num_bytes += stat.st_size
+            names += stat.st_nlink - 1
+    return {"blobs": blobs, "bytes": num_bytes, "linked_names": names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed checkpoint store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    dedupe_parser = subparsers.add_parser('dedupe', help="Link identical existing checkpoints to one blob")
+    dedupe_parser.add_argument('directories', nargs='*', default=["trained_models", "unlearned_models"], help="Directories to deduplicate")
+    gc_parser = subparsers.add_parser('gc', help="Remove blobs that no checkpoint links to")
+    gc_parser.add_argument('--dry-run', action='store_true', help="Only list the blobs that would be removed")
+    subparsers.add_parser('stats', help="Show store usage")
+    args = parser.parse_args()
+
+    if args.command == "dedupe":
+        freed = dedupe(args.directories)
+        print(f"Freed {freed / 1024 ** 2:.1f} MB")
+    elif args.command == "gc":
+        removed = collect_garbage(dry_run=args.dry_run)
+        for blob in removed:
+            print(f"{'Would remove' if args.dry_run else 'Removed'} {blob}")
+        print(f"{len(removed)} blob(s) {'to remove' if args.dry_run else 'removed'}")
+    print(json.dumps(store_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Evaluate several checkpoints of the same architecture in one pass over the data.
+
+StackedModelEvaluator stacks the (BatchNorm-folded) parameters of K models with
+torch.func.stack_module_state and runs all of them on every batch with
+vmap(functional_call), so each batch is loaded, decoded and transferred once
+instead of K times. The [K, N, num_classes] logits feed the per-class accuracy
+and privacy-score (entropy/confidence) computations.
+"""
+import copy
+
+import torch
+from torch.func import functional_call, stack_module_state
+
+from app.utils.attack_full_dataset import entropy_and_confidence
+from app.utils.inference import build_inference_model
+from app.utils.quantization import float_cpu_copy
+
+
+class StackedModelEvaluator:
+    """
+    Batched evaluation of K models that share one architecture.
+
+    Args:
+        models: Models to evaluate (left unchanged); LoRA adapters, precision and
+            memory format are normalised by folding each model for inference
+        device: Device to evaluate on
+    """
+
+    def __init__(self, models, device):
+        if not models:
+            raise ValueError("StackedModelEvaluator needs at least one model")
+
+        self.device = device
+        inference_models = [
+            build_inference_model(float_cpu_copy(model)).to(device) for model in models
+        ]
+        self.num_models = len(inference_models)
+        self.params, self.buffers = stack_module_state(inference_models)
+
+        # Stateless skeleton: the stacked tensors are supplied on every call
+        self.base_model = copy.deepcopy(inference_models[0]).to("meta")
+
+        def call_single(params, buffers, inputs):
+            return functional_call(self.base_model, (params, buffers), (inputs,))
+
+        self._call = torch.vmap(call_single, in_dims=(0, 0, None))
+
+    def __call__(self, inputs):
+        """Logits of every model for one batch, shape [K, batch, num_classes]."""
+        with torch.no_grad():
+            return self._call(self.params, self.buffers, inputs.to(self.device))
+
+    def evaluate_logits(self, data_loader):
+        """
+        Run every model over a (non-shuffled) data loader.
+
+        Returns:
+            Tuple of (logits [K, N, num_classes] on CPU, labels [N])
+        """
+        logits = []
+        labels = []
+        for inputs, targets in data_loader:
+            logits.append(self(inputs).cpu())
+            labels.append(targets)
+        return torch.cat(logits, dim=1), torch.cat(labels)
+
+
+def class_accuracies_from_logits(logits, labels, num_classes=10):
+    """
+    Per-class accuracies of every model.
+
+    Args:
+        logits: [K, N, num_classes] tensor
+        labels: [N] tensor
+
+    Returns:
+        List of K lists of per-class accuracies
+    """
+    correct = (logits.argmax(dim=2) == labels.unsqueeze(0)).double()
+    class_total = torch.bincount(labels, minlength=num_classes).double().clamp(min=1)
+    class_correct = torch.zeros(logits.size(0), num_classes, dtype=torch.float64)
+    class_correct.index_add_(1, labels, correct)
+    return (class_correct / class_total).tolist()
+
+
+def model_metrics_from_logits(logits, labels, forget_class, t1=2.0, t2=1.0, dataset_indices=None):
+    """
+    Entropy and confidence metrics on the forget class for every model, in the
+    format returned by calculate_model_metrics.
+
+    Args:
+        logits: [K, N, num_classes] tensor
+        labels: [N] tensor
+        forget_class: Class being forgotten
+        t1: Temperature for the entropy
+        t2: Temperature for the confidence
+        dataset_indices: Dataset index of each of the N samples (defaults to 0..N-1)
+
+    Returns:
+        List of K dictionaries with indices, entropies and confidences
+    """
+    forget_mask = labels == forget_class
+    positions = torch.where(forget_mask)[0].tolist()
+    indices = (
+        [dataset_indices[i] for i in positions] if dataset_indices is not None else positions
+    )
+
+    metrics = []
+    for model_logits in logits:
+        entropies, confidences = entropy_and_confidence(model_logits[forget_mask], t1, t2)
+        metrics.append({
+            "indices": indices,
+            "entropies": list(entropies),
+            "confidences": list(confidences)
+        })
+    return metrics
+
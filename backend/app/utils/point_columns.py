@@ -0,0 +1,173 @@
+"""
+Columnar storage of the detailed per-sample results ("points").
+
+The "points" field of a result is a list of [gt, pred, img, forget, x, y,
+{class: prob}] rows. Here the same data is kept as typed arrays, one per field,
+with the probabilities as a CSR block (a row pointer, then the class and the
+value of every probability above the threshold). The columns are written as a
+compressed NPZ sidecar, data/{fc}/{ID}.points.npz, next to the result JSON.
+NPZ members are read individually, so clients can fetch only the columns they
+render.
+"""
+import io
+import os
+import tempfile
+
+import numpy as np
+import orjson
+
+POINT_COLUMNS = ("gt", "pred", "img", "forget", "x", "y")
+PROB_COLUMNS = ("prob_indptr", "prob_classes", "prob_values")
+ALL_COLUMNS = POINT_COLUMNS + PROB_COLUMNS
+
+
+def points_sidecar_path(result_path):
+    """data/{fc}/{ID}.json -> data/{fc}/{ID}.points.npz"""
+    return os.path.splitext(result_path)[0] + ".points.npz"
+
+
+def build_point_columns(targets, selected_indices, predicted_labels, umap_embedding, probs, forget_class, threshold=0.001):
+    """
+    Columns of the detailed results of the UMAP subset.
+
+    Args:
+        targets: Labels of the dataset the subset was drawn from
+        selected_indices: Dataset index of every subset sample
+        predicted_labels: Model predictions
+        umap_embedding: UMAP coordinates, shape [N, 2]
+        probs: Model probabilities, shape [N, num_classes]
+        forget_class: Class to forget
+        threshold: Probabilities at or below this value are dropped
+
+    Returns:
+        Dictionary of numpy arrays keyed by ALL_COLUMNS
+    """
+    img = np.asarray(selected_indices, dtype=np.int64)
+    gt = np.asarray(targets)[img]
+    embedding = np.asarray(umap_embedding, dtype=np.float64)
+    probs = np.asarray(probs, dtype=np.float32)
+
+    keep = probs > threshold
+    rows, classes = np.nonzero(keep)
+    return {
+        "gt": gt.astype(np.uint8),
+        "pred": np.asarray(predicted_labels).astype(np.uint8),
+        "img": img.astype(np.int32),
+        "forget": (gt == forget_class).astype(np.uint8),
+        "x": np.round(embedding[:, 0], 2).astype(np.float32),
+        "y": np.round(embedding[:, 1], 2).astype(np.float32),
+        "prob_indptr": np.concatenate([[0], np.cumsum(keep.sum(axis=1))]).astype(np.int32),
+        "prob_classes": classes.astype(np.uint8),
+        "prob_values": np.round(probs[rows, classes].astype(np.float64), 3).astype(np.float32),
+    }
+
+
+def columns_to_points(columns):
+    """Rows in the "points" JSON format ([gt, pred, img, forget, x, y, {class: prob}])."""
+    prob_classes = columns["prob_classes"].tolist()
+    prob_values = np.round(columns["prob_values"].astype(np.float64), 3).tolist()
+    indptr = columns["prob_indptr"].tolist()
+    probs = [
+        {str(c): v for c, v in zip(prob_classes[start:end], prob_values[start:end])}
+        for start, end in zip(indptr[:-1], indptr[1:])
+    ]
+    return [
+        list(row) + [prob]
+        for row, prob in zip(
+            zip(
+                columns["gt"].tolist(),
+                columns["pred"].tolist(),
+                columns["img"].tolist(),
+                columns["forget"].tolist(),
+                np.round(columns["x"].astype(np.float64), 2).tolist(),
+                np.round(columns["y"].astype(np.float64), 2).tolist(),
+            ),
+            probs
+        )
+    ]
+
+
+def points_to_columns(points):
+    """Inverse of columns_to_points, for results stored only as JSON."""
+    prob_classes = [int(c) for row in points for c in row[6]]
+    prob_values = [v for row in points for v in row[6].values()]
+    return {
+        "gt": np.array([row[0] for row in points], dtype=np.uint8),
+        "pred": np.array([row[1] for row in points], dtype=np.uint8),
+        "img": np.array([row[2] for row in points], dtype=np.int32),
+        "forget": np.array([row[3] for row in points], dtype=np.uint8),
+        "x": np.array([row[4] for row in points], dtype=np.float32),
+        "y": np.array([row[5] for row in points], dtype=np.float32),
+        "prob_indptr": np.concatenate([[0], np.cumsum([len(row[6]) for row in points])]).astype(np.int32),
+        "prob_classes": np.array(prob_classes, dtype=np.uint8),
+        "prob_values": np.array(prob_values, dtype=np.float32),
+    }
+
+
+def save_point_columns(columns, path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **columns)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_point_columns(path, columns=ALL_COLUMNS):
+    """Read the requested columns of a sidecar; other members are not decompressed."""
+    with np.load(path) as npz:
+        return {name: npz[name] for name in columns}
+
+
+def encode_point_columns(columns, fmt="json"):
+    """Columns as a JSON object of arrays or as an uncompressed NPZ archive."""
+    if fmt == "npz":
+        buffer = io.BytesIO()
+        np.savez(buffer, **columns)
+        return buffer.getvalue()
+    return orjson.dumps(columns, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def save_result_files(results, result_path):
+    """
+    Write a result JSON and, if it has detailed points, their columnar sidecar.
+
+    "points" may hold the columns themselves (see build_point_columns), which
+    are written to the sidecar as they are, or rows in the JSON format. The JSON
+    keeps its "points" field as rows so existing readers are unaffected.
+    """
+    points = results.get("points")
+    if isinstance(points, dict):
+        save_point_columns(points, points_sidecar_path(result_path))
+        results = dict(results, points=columns_to_points(points))
+    elif points:
+        save_point_columns(points_to_columns(points), points_sidecar_path(result_path))
+    with open(result_path, "wb") as f:
+        f.write(orjson.dumps(
+            results,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ))
+
+
+def read_result_columns(result_path, columns=ALL_COLUMNS):
+    """
+    Columns of a result's detailed points, from its sidecar.
+
+    Results saved before sidecars existed are converted from their JSON once and
+    the sidecar is written for later requests.
+
+    Raises:
+        FileNotFoundError: If neither the sidecar nor the result JSON exists
+        KeyError: If the result has no detailed points
+    """
+    sidecar_path = points_sidecar_path(result_path)
+    if not os.path.exists(sidecar_path):
+        from app.utils.results_cache import read_result_bytes
+
+        points = orjson.loads(read_result_bytes(result_path)).get("points")
+        if not points:
+            raise KeyError(f"No detailed points in {os.path.basename(result_path)}")
+        save_point_columns(points_to_columns(points), sidecar_path)
+    return load_point_columns(sidecar_path, columns)
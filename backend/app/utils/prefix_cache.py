@@ -0,0 +1,145 @@
+"""
+Activation caching for frozen layer prefixes.
+
+When the first K layer groups of a model are frozen and the training data is
+not augmented, the prefix produces identical outputs every epoch. These helpers
+run the prefix once, keep its outputs in memory (or in a memory-mapped file for
+large feature maps) and serve them as batches for training the suffix only.
+"""
+import os
+import tempfile
+
+import numpy as np
+import torch
+
+from app.config import (
+    PREFIX_CACHE_DTYPE,
+    PREFIX_CACHE_MAX_MEMORY_BYTES,
+    PREFIX_CACHE_DIR,
+    UNLEARN_SEED
+)
+
+
+class CachedFeatureLoader:
+    """
+    Minimal DataLoader replacement that yields batches of cached prefix outputs.
+
+    Batches are gathered with a single fancy-index per batch instead of
+    collating samples one by one, and cast back to float32 on the fly. Like a
+    DataLoader, it shuffles with `generator` (the global RNG if None).
+    """
+
+    def __init__(self, features, labels, batch_size, shuffle=True, memmap_path=None, generator=None):
+        self.features = features
+        self.labels = labels
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.memmap_path = memmap_path
+        self.generator = generator
+
+    def __len__(self):
+        return (len(self.labels) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        num_samples = len(self.labels)
+        order = (
+            torch.randperm(num_samples, generator=self.generator) if self.shuffle
+            else torch.arange(num_samples)
+        )
+        for start in range(0, num_samples, self.batch_size):
+            batch_indices = order[start:start + self.batch_size]
+            if self.memmap_path is not None:
+                # numpy fancy indexing on a memmap is fastest with sorted indices
+                batch_indices, _ = torch.sort(batch_indices)
+            inputs = torch.from_numpy(self.features[batch_indices.numpy()]).float()
+            yield inputs, self.labels[batch_indices]
+
+    def close(self):
+        """Release the cached features and delete the backing file, if any."""
+        self.features = None
+        if self.memmap_path is not None and os.path.exists(self.memmap_path):
+            os.remove(self.memmap_path)
+            self.memmap_path = None
+
+
+def _numpy_dtype(dtype):
+    return np.float16 if dtype in ("float16", torch.float16) else np.float32
+
+
+def build_prefix_feature_loader(
+    prefix,
+    data_loader,
+    device,
+    batch_size=None,
+    dtype=PREFIX_CACHE_DTYPE,
+    max_memory_bytes=PREFIX_CACHE_MAX_MEMORY_BYTES,
+    cache_dir=PREFIX_CACHE_DIR
+):
+    """
+    Run the frozen prefix once over a data loader and cache its outputs.
+
+    Args:
+        prefix: Frozen prefix module (see split_resnet18_at_group)
+        data_loader: Loader over unaugmented data
+        device: Device to run the prefix on
+        batch_size: Batch size of the returned loader (defaults to the input loader's)
+        dtype: Storage dtype of the cached features ('float16' or 'float32')
+        max_memory_bytes: Above this size the cache is memory-mapped to disk
+        cache_dir: Directory for memory-mapped caches (system temp dir if None)
+
+    Returns:
+        CachedFeatureLoader yielding (features, labels) batches
+    """
+    from app.utils.evaluation import model_eval_mode
+
+    np_dtype = _numpy_dtype(dtype)
+    num_samples = len(data_loader.dataset)
+    features = None
+    labels = torch.empty(num_samples, dtype=torch.long)
+    memmap_path = None
+    offset = 0
+
+    with model_eval_mode(prefix):
+        with torch.no_grad():
+            for inputs, targets in data_loader:
+                outputs = prefix(inputs.to(device)).cpu().numpy().astype(np_dtype, copy=False)
+
+                # Allocate storage once the feature shape is known
+                if features is None:
+                    shape = (num_samples,) + outputs.shape[1:]
+                    total_bytes = int(np.prod(shape)) * np.dtype(np_dtype).itemsize
+                    if total_bytes > max_memory_bytes:
+                        if cache_dir is not None:
+                            os.makedirs(cache_dir, exist_ok=True)
+                        fd, memmap_path = tempfile.mkstemp(
+                            prefix="prefix_", suffix=".dat", dir=cache_dir
+                        )
+                        os.close(fd)
+                        features = np.memmap(memmap_path, dtype=np_dtype, mode="w+", shape=shape)
+                    else:
+                        features = np.empty(shape, dtype=np_dtype)
+                    print(
+                        f"Caching frozen prefix outputs: {num_samples} x {tuple(shape[1:])} "
+                        f"({total_bytes / 1024**2:.1f} MB, {'memmap' if memmap_path else 'in-memory'})"
+                    )
+
+                batch_len = outputs.shape[0]
+                features[offset:offset + batch_len] = outputs
+                labels[offset:offset + batch_len] = targets
+                offset += batch_len
+
+    if isinstance(features, np.memmap):
+        features.flush()
+
+    # Seeded like the generator of get_data_loaders, so the batch order is reproducible
+    generator = torch.Generator()
+    generator.manual_seed(UNLEARN_SEED)
+
+    return CachedFeatureLoader(
+        features[:offset],
+        labels[:offset],
+        batch_size=batch_size or data_loader.batch_size,
+        shuffle=True,
+        memmap_path=memmap_path,
+        generator=generator
+    )
@@ -0,0 +1,187 @@
+"""
+Background pre-warming of the per-forget-class reference artifacts.
+
+The first job of a forget class used to build everything class-specific
+itself. A single low-priority daemon thread builds it ahead of time instead:
+the UMAP subset atlas and /image/all_subset thumbnails once, then for every
+queued class the artifacts of app.utils.reference_cache (retrain
+distribution, CKA samples and reference weights, retrain metrics, MIA
+classifier), which are persisted so later processes only load them.
+
+Before every step the warmer waits while a foreground job runs (routers
+register their status with register_busy_check), so it only uses idle time;
+a job that needs an artifact the warmer is building waits for that build
+instead of repeating it. Classes are queued by POST /prewarm and, with
+PREWARM_ON_IDLE, all ten after the startup warm-up. GET /prewarm reports
+progress.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+from app.config import GPU_ID, PREWARM_POLL_SECONDS
+
+NUM_CLASSES = 10
+
+_lock = threading.Lock()
+_wakeup = threading.Condition(_lock)
+_queue = deque()
+_busy_checks = []
+_thread = None
+_state = {
+    "current": None,
+    "images_done": False,
+    "done": {},
+    "errors": {},
+}
+
+
+def register_busy_check(check):
+    """Register a callable that returns True while a foreground job runs."""
+    _busy_checks.append(check)
+
+
+def foreground_busy():
+    return any(check() for check in _busy_checks)
+
+
+def _wait_for_idle():
+    while foreground_busy():
+        time.sleep(PREWARM_POLL_SECONDS)
+
+
+def _device():
+    import torch
+
+    return torch.device(
+        f"cuda:{GPU_ID}" if torch.cuda.is_available()
+        else "mps" if torch.backends.mps.is_available()
+        else "cpu"
+    )
+
+
+def _build_images():
+    from app.utils.data_loader import get_cifar10_train
+    from app.utils.image_atlas import get_atlas
+    from app.utils.subset_images import build_subset_images
+
+    x_train, y_train = get_cifar10_train()
+    build_subset_images(x_train, y_train)
+    get_atlas(x_train, y_train)
+
+
+def _retrain_distribution(forget_class):
+    from app.utils.reference_cache import get_retrain_distribution
+    get_retrain_distribution(forget_class)
+
+
+def _cka_reference(forget_class):
+    from app.utils.reference_cache import get_cka_indices, load_reference_weights
+    get_cka_indices(forget_class)
+    load_reference_weights(forget_class)
+
+
+def _retrain_metrics(forget_class):
+    from app.utils.reference_cache import get_retrain_metrics
+    asyncio.run(get_retrain_metrics(forget_class, _device()))
+
+
+def _mia_classifier(forget_class):
+    from app.utils.reference_cache import base_checkpoint, get_mia_classifier
+    asyncio.run(get_mia_classifier(forget_class, base_checkpoint(forget_class), _device()))
+
+
+# Cheapest first, so an interrupted class still has its most used artifacts
+PREWARM_STEPS = (
+    ("retrain_distribution", _retrain_distribution),
+    ("cka_reference", _cka_reference),
+    ("retrain_metrics", _retrain_metrics),
+    ("mia_classifier", _mia_classifier),
+)
+
+
+def _run_step(forget_class, name, step):
+    _wait_for_idle()
+    start_time = time.perf_counter()
+    try:
+        step(forget_class)
+    except Exception as e:
+        with _lock:
+            _state["errors"].setdefault(str(forget_class), {})[name] = str(e)
+        print(f"Prewarm: {name} of class {forget_class} failed: {e}")
+        return
+    elapsed = time.perf_counter() - start_time
+    with _lock:
+        _state["done"].setdefault(str(forget_class), {})[name] = round(elapsed, 3)
+    print(f"Prewarm: {name} of class {forget_class} took {elapsed:.3f}s")
+
+
+def _worker():
+    try:
+        # Linux applies nice values per thread: only the warmer is deprioritised
+        os.nice(19)
+    except (AttributeError, OSError):
+        pass
+
+    _wait_for_idle()
+    try:
+        _build_images()
+    except Exception as e:
+        print(f"Prewarm: subset images failed: {e}")
+    with _lock:
+        _state["images_done"] = True
+
+    while True:
+        with _wakeup:
+            while not _queue:
+                _wakeup.wait()
+            forget_class = _queue.popleft()
+            _state["current"] = forget_class
+        for name, step in PREWARM_STEPS:
+            _run_step(forget_class, name, step)
+        with _lock:
+            _state["current"] = None
+
+
+def prewarm(classes=None):
+    """
+    Queue forget classes (all ten by default) for the background warmer,
+    starting it if needed. Classes already queued or being warmed are skipped.
+
+    Returns:
+        The classes that were queued
+    """
+    global _thread
+    classes = range(NUM_CLASSES) if classes is None else classes
+    with _wakeup:
+        queued = [
+            forget_class for forget_class in classes
+            if forget_class not in _queue and forget_class != _state["current"]
+        ]
+        _queue.extend(queued)
+        if _thread is None:
+            _thread = threading.Thread(target=_worker, name="reference-prewarm", daemon=True)
+            _thread.start()
+        _wakeup.notify()
+    return queued
+
+
+def prewarm_status():
+    from app.utils.reference_cache import reference_status
+
+    with _lock:
+        report = {
+            "running": _thread is not None,
+            "foreground_busy": foreground_busy(),
+            "current": _state["current"],
+            "queued": list(_queue),
+            "images_done": _state["images_done"],
+            "done": {key: dict(value) for key, value in _state["done"].items()},
+            "errors": {key: dict(value) for key, value in _state["errors"].items()},
+        }
+    report["cached"] = {
+        str(forget_class): reference_status(forget_class) for forget_class in range(NUM_CLASSES)
+    }
+    return report
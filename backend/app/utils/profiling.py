@@ -0,0 +1,201 @@
+"""
+On-demand torch.profiler capture of one training or unlearning job.
+
+A job whose request sets `profile` is watched through its stage spans (see
+app.utils.instrumentation), so no training loop needs profiler calls of its
+own. Two phases are profiled, with CPU (and CUDA, when available) activity,
+input shapes and memory:
+
+    train        `profile_epochs` training steps after skipping
+                 `profile_start_epoch`; a step is a train_epoch span, or a
+                 train_head / fisher pass of the head-only and Fisher methods
+    evaluation   the next evaluation outside the epoch metrics (the final
+                 train and test set evaluation of the unlearning methods, the
+                 per-epoch evaluation when training), up to the next stage
+
+When the job ends both are written next to its experiment, under
+data/{fc}/profiles/ (experiments are the JSON files directly in data/{fc}):
+
+    {ID}.train.trace.json.gz        Chrome trace (chrome://tracing, Perfetto)
+    {ID}.evaluation.trace.json.gz
+    {ID}.operators.txt              operator summary table of each phase
+
+and served by GET /data/{fc}/{ID}/profile.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+from app.config import PROFILE_ROW_LIMIT, PROFILE_SORT_BY
+from app.utils.instrumentation import add_job_listener
+
+PROFILE_PHASES = ("train", "evaluation")
+
+# Span that makes up one step of the training loop, by service (default train_epoch)
+TRAINING_STAGES = {
+    "unlearning_head": "train_head",
+    "unlearning_fisher": "fisher",
+}
+
+
+def profile_dir(forget_class):
+    return os.path.join('data', str(forget_class), 'profiles')
+
+
+def profile_paths(forget_class, experiment_id):
+    """Files of a job's capture: the operator table and one trace per phase."""
+    directory = profile_dir(forget_class)
+    paths = {"operators": os.path.join(directory, f"{experiment_id}.operators.txt")}
+    paths.update({
+        phase: os.path.join(directory, f"{experiment_id}.{phase}.trace.json.gz")
+        for phase in PROFILE_PHASES
+    })
+    return paths
+
+
+def remove_profile(forget_class, experiment_id):
+    """Delete the capture of a job; returns the names of the removed files."""
+    removed = []
+    for path in profile_paths(forget_class, experiment_id).values():
+        if os.path.exists(path):
+            os.remove(path)
+            removed.append(os.path.basename(path))
+    return removed
+
+
+class JobProfiler:
+    """
+    Job listener (see add_job_listener) that runs torch.profiler over the
+    training window and the evaluation after it.
+    """
+
+    def __init__(self, training_stage="train_epoch", start_step=0, steps=1):
+        self.training_stage = training_stage
+        self.start_step = start_step
+        self.steps = steps
+        self.step = 0
+        self.phases = []
+        self._phase = None
+        self._profiler = None
+        self._evaluation_pending = False
+        self._metrics_depth = 0
+        self._lock = threading.Lock()
+
+    def _start(self, phase):
+        import torch
+        from torch.profiler import ProfilerActivity, profile
+
+        activities = [ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+        self._profiler = profile(activities=activities, record_shapes=True, profile_memory=True)
+        self._profiler.start()
+        self._phase = phase
+
+    def _stop(self):
+        self._profiler.stop()
+        self.phases.append((self._phase, self._profiler))
+        if self._phase == "evaluation":
+            self._evaluation_pending = False
+        self._phase = None
+        self._profiler = None
+
+    def span_started(self, stage_span):
+        with self._lock:
+            stage = stage_span.stage
+            if stage == "epoch_metrics":
+                self._metrics_depth += 1
+            # The evaluation ends where the next stage begins
+            if self._phase == "evaluation" and stage != "evaluation":
+                self._stop()
+
+            if stage == self.training_stage:
+                in_window = self.start_step <= self.step < self.start_step + self.steps
+                if in_window and self._phase is None:
+                    self._start("train")
+                self.step += 1
+            elif (
+                stage == "evaluation" and self._evaluation_pending
+                and self._metrics_depth == 0 and self._phase is None
+            ):
+                self._start("evaluation")
+
+    def span_finished(self, stage_span):
+        with self._lock:
+            stage = stage_span.stage
+            if stage == "epoch_metrics":
+                self._metrics_depth -= 1
+            elif (
+                stage == self.training_stage and self._phase == "train"
+                and self.step >= self.start_step + self.steps
+            ):
+                self._stop()
+                self._evaluation_pending = True
+
+    def close(self):
+        """Stop a phase still being recorded when the job ends."""
+        with self._lock:
+            if self._phase is not None:
+                self._stop()
+
+    def save(self, forget_class, experiment_id):
+        """
+        Write the Chrome trace of every recorded phase and their operator tables.
+
+        Returns:
+            Paths of the written files
+        """
+        paths = profile_paths(forget_class, experiment_id)
+        os.makedirs(profile_dir(forget_class), exist_ok=True)
+        written = []
+        tables = []
+        for phase, profiler in self.phases:
+            profiler.export_chrome_trace(paths[phase])
+            written.append(paths[phase])
+            tables.append(f"== {phase} ==\n")
+            tables.append(profiler.key_averages().table(sort_by=PROFILE_SORT_BY, row_limit=PROFILE_ROW_LIMIT))
+            tables.append(f"\n== {phase}, by input shape ==\n")
+            tables.append(profiler.key_averages(group_by_input_shape=True).table(
+                sort_by=PROFILE_SORT_BY, row_limit=PROFILE_ROW_LIMIT
+            ))
+            tables.append("\n\n")
+        with open(paths["operators"], "w") as f:
+            f.write("".join(tables))
+        written.append(paths["operators"])
+        return written
+
+
+@contextmanager
+def job_profile(name, request, status):
+    """
+    Profile the current job if its request asks for it (`profile`), and save
+    the capture under the experiment's ID when the job ends.
+
+    Args:
+        name: Service name of the job, e.g. unlearning_FT
+        request: Request of the job
+        status: Status object of the job
+    """
+    if not getattr(request, "profile", False):
+        yield None
+        return
+
+    profiler = JobProfiler(
+        TRAINING_STAGES.get(name, "train_epoch"), request.profile_start_epoch, request.profile_epochs
+    )
+    add_job_listener(profiler)
+    try:
+        yield profiler
+    finally:
+        profiler.close()
+        forget_class = getattr(request, "forget_class", -1)
+        # Training has no experiment ID; it saves its model as unlearned_models/-1/ffff
+        experiment_id = getattr(status, "recent_id", None) or "ffff"
+        if not profiler.phases:
+            print(f"Profile of {experiment_id}: no training step in the requested window was recorded")
+        else:
+            try:
+                for path in profiler.save(forget_class, experiment_id):
+                    print(f"Profile saved to {path}")
+            except Exception as e:
+                print(f"Error saving profile of {experiment_id}: {e}")
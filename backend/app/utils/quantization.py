@@ -0,0 +1,166 @@
+"""
+INT8 post-training static quantization for bulk CPU evaluation.
+
+quantize_resnet18 quantizes a copy of a get_resnet18 model with FX graph mode
+(fbgemm/x86 kernels, Conv-BN-ReLU fused), calibrated on a fixed class-balanced
+subset of the unaugmented training set. build_quantized_evaluator then checks
+the per-class accuracies of the INT8 model against the fp32 model on a fixed
+probe subset of the test set and falls back to fp32 if any class moves by more
+than QUANT_MAX_ACCURACY_DELTA, so bulk re-scoring never silently changes the
+metrics it reports.
+"""
+import copy
+
+import torch
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+from torch.utils.data import DataLoader, Subset
+
+from app.config import (
+    UNLEARN_SEED,
+    QUANT_BACKEND,
+    QUANT_CALIBRATION_SIZE,
+    QUANT_PROBE_SIZE,
+    QUANT_MAX_ACCURACY_DELTA
+)
+from app.utils.inference import build_inference_model, merge_lora_layers
+
+_datasets = {}
+
+
+def select_quantized_engine(backend=QUANT_BACKEND):
+    """Activate a quantized CPU engine, preferring `backend` and falling back to fbgemm."""
+    engines = torch.backends.quantized.supported_engines
+    if backend not in engines:
+        if "fbgemm" not in engines:
+            raise RuntimeError(f"No x86 quantized engine available (supported: {engines})")
+        backend = "fbgemm"
+    torch.backends.quantized.engine = backend
+    return backend
+
+
+def _fixed_subset_indices(targets, size, seed=UNLEARN_SEED, num_classes=10):
+    generator = torch.Generator().manual_seed(seed)
+    targets = torch.as_tensor(targets)
+    per_class = max(1, size // num_classes)
+    indices = []
+    for class_idx in range(num_classes):
+        class_indices = (targets == class_idx).nonzero().squeeze(1)
+        order = torch.randperm(len(class_indices), generator=generator)
+        indices.extend(class_indices[order[:per_class]].tolist())
+    return sorted(indices)
+
+
+def get_quantization_loaders(batch_size=256):
+    """
+    Fixed calibration (train set) and probe (test set) loaders without augmentation.
+
+    Returns:
+        Tuple of (calibration_loader, probe_loader)
+    """
+    from app.utils.data_loader import get_data_loaders
+
+    if not _datasets:
+        _, _, train_set, test_set = get_data_loaders(batch_size=batch_size, augmentation=False)
+        _datasets["calibration"] = Subset(
+            train_set, _fixed_subset_indices(train_set.targets, QUANT_CALIBRATION_SIZE)
+        )
+        _datasets["probe"] = Subset(
+            test_set, _fixed_subset_indices(test_set.targets, QUANT_PROBE_SIZE)
+        )
+
+    calibration_loader = DataLoader(_datasets["calibration"], batch_size=batch_size, shuffle=False)
+    probe_loader = DataLoader(_datasets["probe"], batch_size=batch_size, shuffle=False)
+    return calibration_loader, probe_loader
+
+
+def float_cpu_copy(model):
+    """fp32, contiguous-format CPU copy of a get_resnet18 model with LoRA adapters merged."""
+    float_model = copy.deepcopy(model).cpu().eval()
+    merge_lora_layers(float_model)
+    if hasattr(float_model, "precision"):
+        float_model.precision = "fp32"
+    if hasattr(float_model, "channels_last"):
+        float_model.channels_last = False
+    float_model.to(memory_format=torch.contiguous_format)
+    for param in float_model.parameters():
+        param.grad = None
+        param.requires_grad_(False)
+    return float_model
+
+
+def quantize_resnet18(model, calibration_loader, backend=QUANT_BACKEND):
+    """
+    Post-training static INT8 quantization of a get_resnet18 model.
+
+    Args:
+        model: Model to quantize (left unchanged)
+        calibration_loader: Loader used to calibrate the activation observers
+        backend: Quantized engine ('x86' or 'fbgemm')
+
+    Returns:
+        Quantized CPU model
+    """
+    backend = select_quantized_engine(backend)
+    float_model = float_cpu_copy(model)
+    example_inputs = (torch.zeros(1, 3, 32, 32),)
+
+    prepared = prepare_fx(float_model, get_default_qconfig_mapping(backend), example_inputs)
+    with torch.no_grad():
+        for inputs, _ in calibration_loader:
+            prepared(inputs)
+    return convert_fx(prepared)
+
+
+def class_accuracies(model, data_loader, num_classes=10):
+    """Per-class accuracies of `model` on a CPU data loader."""
+    class_correct = torch.zeros(num_classes, dtype=torch.float64)
+    class_total = torch.zeros(num_classes, dtype=torch.float64)
+    with torch.no_grad():
+        for inputs, labels in data_loader:
+            correct = (model(inputs).argmax(1) == labels).double()
+            class_correct.index_add_(0, labels, correct)
+            class_total.index_add_(0, labels, torch.ones_like(correct))
+    return (class_correct / class_total.clamp(min=1)).tolist()
+
+
+def build_quantized_evaluator(model, max_class_delta=QUANT_MAX_ACCURACY_DELTA, backend=QUANT_BACKEND):
+    """
+    INT8 model for CPU evaluation, guarded by a probe-set accuracy check.
+
+    Args:
+        model: get_resnet18 model (any device, precision or adapter state)
+        max_class_delta: Largest allowed per-class accuracy difference to fp32
+        backend: Quantized engine
+
+    Returns:
+        Tuple of (CPU model to evaluate with, report dictionary)
+    """
+    calibration_loader, probe_loader = get_quantization_loaders()
+    float_model = build_inference_model(float_cpu_copy(model))
+    float_accs = class_accuracies(float_model, probe_loader)
+
+    report = {"requested": "int8", "max_class_delta": max_class_delta}
+    try:
+        quantized_model = quantize_resnet18(model, calibration_loader, backend)
+    except Exception as e:
+        print(f"INT8 quantization failed, evaluating in fp32: {e}")
+        report.update({"backend": "fp32", "fallback": True, "error": str(e)})
+        return float_model, report
+
+    quantized_accs = class_accuracies(quantized_model, probe_loader)
+    deltas = [q - f for q, f in zip(quantized_accs, float_accs)]
+    worst_delta = max(abs(delta) for delta in deltas)
+    report["probe_class_deltas"] = [round(delta, 4) for delta in deltas]
+    report["probe_worst_delta"] = round(worst_delta, 4)
+
+    if worst_delta > max_class_delta:
+        print(
+            f"INT8 probe accuracy differs from fp32 by {worst_delta:.4f} "
+            f"(> {max_class_delta}), evaluating in fp32"
+        )
+        report.update({"backend": "fp32", "fallback": True})
+        return float_model, report
+
+    report.update({"backend": "int8", "fallback": False})
+    return quantized_model, report
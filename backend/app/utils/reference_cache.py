@@ -0,0 +1,315 @@
+"""
+Per-forget-class reference artifacts shared by every unlearning job.
+
+Every job of a forget class compares the unlearned model with the same
+references, which only depend on the class and its checkpoints:
+
+    retrain distribution   attack values of data/{fc}/a00{fc}.json (parsed once)
+    CKA reference          the clean CIFAR-10 samples CKA is computed on and the
+                           000{fc}/a00{fc} weights (kept in app.utils.model_pool)
+    retrain metrics        forget-class entropies and confidences of the retrain
+                           model, the PS reference of the epoch metrics
+    MIA classifier         SalUn MIA classifiers fitted on shadow data with the
+                           base model, used by the epoch metrics
+
+They are built once and kept in memory; the last two need forward passes (and
+an SVM fit) and are also persisted under REFERENCE_CACHE_DIR/{fc}/, keyed by
+the SHA-256 of the checkpoint they were computed with, so a replaced checkpoint
+never hits a stale file. Concurrent requests for the same artifact wait for
+the one build in progress, so a job never duplicates the work of the
+background warmer (app.utils.prewarm).
+"""
+import json
+import os
+import pickle
+import random
+import tempfile
+import threading
+
+import numpy as np
+
+from app.config import REFERENCE_CACHE_DIR, UNLEARN_SEED
+
+CKA_BATCH_SIZE = 1000
+MIA_SHADOW_SIZE = 4500
+MIA_BATCH_SIZE = 128
+METRICS_BATCH_SIZE = 1000
+
+_lock = threading.Lock()
+_build_locks = {}
+_entries = {}
+
+
+def reference_file(forget_class, name):
+    return os.path.join(REFERENCE_CACHE_DIR, str(forget_class), name)
+
+
+def base_checkpoint(forget_class):
+    return f"unlearned_models/{forget_class}/000{forget_class}.pth"
+
+
+def retrain_checkpoint(forget_class):
+    return f"unlearned_models/{forget_class}/a00{forget_class}.pth"
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _lookup(key):
+    with _lock:
+        return key in _entries, _entries.get(key)
+
+
+def _build_lock(key):
+    with _lock:
+        return _build_locks.setdefault(key, threading.Lock())
+
+
+def _cached(key, build):
+    """Value of `key`, built by one caller while concurrent callers wait for it."""
+    found, value = _lookup(key)
+    if found:
+        return value
+    with _build_lock(key):
+        found, value = _lookup(key)
+        if not found:
+            value = build()
+            with _lock:
+                _entries[key] = value
+        return value
+
+
+async def _cached_async(key, path, build):
+    """
+    Like _cached for a coroutine `build`, with the value also persisted to
+    `path` and loaded from it by later processes.
+    """
+    found, value = _lookup(key)
+    if found:
+        return value
+    # Worker threads run their own event loop, so blocking one while another
+    # thread builds the same artifact only delays that job
+    with _build_lock(key):
+        found, value = _lookup(key)
+        if found:
+            return value
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        else:
+            value = await build()
+            if value is not None:
+                _write_atomic(path, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        with _lock:
+            _entries[key] = value
+        return value
+
+
+def _checkpoint_digest(path):
+    """Short content hash of a checkpoint, or None if it does not exist."""
+    from app.utils.checkpoint_io import resolve_checkpoint_path
+    from app.utils.model_store import checkpoint_sha256
+
+    resolved = resolve_checkpoint_path(path)
+    if resolved is None:
+        return None
+    return checkpoint_sha256(resolved)[:16]
+
+
+def get_retrain_distribution(forget_class):
+    """
+    Attack values of the retrain model saved in data/{fc}/a00{fc}.json.
+
+    Returns:
+        Dictionary with the image indices (`img`) and the `entropy` and
+        `confidence` arrays
+    """
+    path = f"data/{forget_class}/a00{forget_class}.json"
+    stat = os.stat(path)
+
+    def build():
+        with open(path, "r") as f:
+            # The retrain JSON keeps a list of values under 'attack'
+            values = json.load(f)["attack"]["values"]
+        return {
+            "img": [item["img"] for item in values],
+            "entropy": np.array([item["entropy"] for item in values]),
+            "confidence": np.array([item["confidence"] for item in values]),
+        }
+
+    return _cached(("retrain_distribution", forget_class, stat.st_mtime_ns, stat.st_size), build)
+
+
+def get_clean_datasets():
+    """CIFAR-10 train and test sets without augmentation, loaded once per process."""
+    def build():
+        from torchvision import datasets, transforms
+
+        base_transforms = transforms.Compose(
+            [
+                transforms.ToTensor(),
+                transforms.Normalize((0.4914, 0.4822, 0.4465), (0.2023, 0.1994, 0.2010)),
+            ]
+        )
+        train_set = datasets.CIFAR10(
+            root="./data", train=True, download=False, transform=base_transforms
+        )
+        test_set = datasets.CIFAR10(
+            root="./data", train=False, download=False, transform=base_transforms
+        )
+        return train_set, test_set
+
+    return _cached(("clean_datasets",), build)
+
+
+def get_cka_indices(forget_class):
+    """
+    Dataset indices of the CKA samples: the first tenth (train) or half (test)
+    of the forget class and of the other classes, in index order.
+
+    Returns:
+        {"train" | "test": {"forget_class": tensor, "other_classes": tensor}}
+    """
+    def build():
+        import torch
+
+        train_set, test_set = get_clean_datasets()
+        indices = {}
+        for split, dataset, fraction in (("train", train_set, 10), ("test", test_set, 2)):
+            targets = torch.tensor(dataset.targets)
+            forget_indices = torch.sort((targets == forget_class).nonzero(as_tuple=True)[0])[0]
+            other_indices = torch.sort((targets != forget_class).nonzero(as_tuple=True)[0])[0]
+            indices[split] = {
+                "forget_class": forget_indices[:len(forget_indices) // fraction],
+                "other_classes": other_indices[:len(other_indices) // fraction],
+            }
+        return indices
+
+    return _cached(("cka_indices", forget_class), build)
+
+
+def get_cka_loaders(forget_class, batch_size=CKA_BATCH_SIZE):
+    """Loaders over the CKA samples, in the layout of get_cka_indices."""
+    from torch.utils.data import DataLoader, Subset
+
+    datasets = dict(zip(("train", "test"), get_clean_datasets()))
+    return {
+        split: {
+            group: DataLoader(
+                Subset(datasets[split], indices),
+                batch_size=batch_size,
+                shuffle=False,
+                num_workers=0,
+                pin_memory=True,
+            )
+            for group, indices in groups.items()
+        }
+        for split, groups in get_cka_indices(forget_class).items()
+    }
+
+
+def load_reference_weights(forget_class):
+    """Load the base and retrain checkpoints of a class into the model pool."""
+    from app.utils.checkpoint_io import checkpoint_exists
+    from app.utils.model_pool import get_state_dict
+
+    for path in (base_checkpoint(forget_class), retrain_checkpoint(forget_class)):
+        if checkpoint_exists(path):
+            get_state_dict(path)
+
+
+async def get_retrain_metrics(forget_class, device, create_plots=False):
+    """
+    Forget-class entropies and confidences (t1=2, t2=1) of the retrain model
+    over the clean training set.
+
+    Returns:
+        Dictionary with `indices`, `entropies` and `confidences` (see
+        calculate_model_metrics), or None without a retrain checkpoint
+    """
+    path = retrain_checkpoint(forget_class)
+    digest = _checkpoint_digest(path)
+    if digest is None:
+        return None
+
+    async def build():
+        from torch.utils.data import DataLoader
+        from app.utils.attack_full_dataset import calculate_model_metrics
+        from app.utils.model_pool import borrow_eval_model
+
+        train_set, _ = get_clean_datasets()
+        loader = DataLoader(train_set, batch_size=METRICS_BATCH_SIZE, shuffle=False, num_workers=0)
+        return await calculate_model_metrics(
+            borrow_eval_model(path, device), loader, device, forget_class, 2.0, 1.0,
+            create_plots=create_plots, model_name="Retrain"
+        )
+
+    return await _cached_async(
+        ("retrain_metrics", forget_class, digest),
+        reference_file(forget_class, f"retrain_metrics_{digest}.pkl"),
+        build
+    )
+
+
+def get_shadow_loaders(forget_class):
+    """
+    Shadow member (train) and non-member (test) loaders of the MIA classifier:
+    up to MIA_SHADOW_SIZE samples of the other classes, drawn with a per-class seed.
+    """
+    from torch.utils.data import DataLoader, Subset
+
+    rng = random.Random(UNLEARN_SEED + forget_class)
+    loaders = []
+    for dataset in get_clean_datasets():
+        remaining = [i for i, target in enumerate(dataset.targets) if target != forget_class]
+        sampled = rng.sample(remaining, min(MIA_SHADOW_SIZE, len(remaining)))
+        loaders.append(DataLoader(Subset(dataset, sampled), batch_size=MIA_BATCH_SIZE, shuffle=False))
+    return tuple(loaders)
+
+
+async def get_mia_classifier(forget_class, baseline_path, device):
+    """
+    MIA classifiers (see train_mia_classifier_once) of the baseline checkpoint,
+    or None if it does not exist or the classifiers could not be trained.
+    """
+    digest = _checkpoint_digest(baseline_path)
+    if digest is None:
+        return None
+
+    async def build():
+        from app.utils.model_pool import borrow_eval_model
+        from app.utils.salun_mia import train_mia_classifier_once
+
+        shadow_train_loader, shadow_test_loader = get_shadow_loaders(forget_class)
+        return await train_mia_classifier_once(
+            baseline_model=borrow_eval_model(baseline_path, device),
+            shadow_train_loader=shadow_train_loader,
+            shadow_test_loader=shadow_test_loader,
+            device=device,
+            forget_class=forget_class
+        )
+
+    return await _cached_async(
+        ("mia_classifier", forget_class, digest),
+        reference_file(forget_class, f"mia_classifier_{digest}.pkl"),
+        build
+    )
+
+
+def reference_status(forget_class):
+    """Which reference artifacts of a class are in memory."""
+    with _lock:
+        kinds = {key[0] for key in _entries if len(key) > 1 and key[1] == forget_class}
+    return {
+        kind: kind in kinds
+        for kind in ("retrain_distribution", "cka_indices", "retrain_metrics", "mia_classifier")
+    }
@@ -0,0 +1,218 @@
+"""
+Re-score stored checkpoints on the CIFAR-10 test set.
+
+Usage (from the backend directory):
+    python -m app.utils.rescore --backend int8 --forget-class 0 1 --write
+
+Every checkpoint under unlearned_models/{fc}/ is evaluated with the chosen
+backend. The batched backend evaluates --models-per-pass checkpoints at once
+on each data batch and, with --privacy, also scores the forget-class train
+samples against the retrain model a00{fc}. With --write, the test metrics
+(t_accs, TUA, TRA) of the matching data/{fc}/{ID}.json results are replaced
+and the backend used is recorded under "rescore".
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import torch
+from torch.utils.data import DataLoader, Subset
+
+from app.config import QUANT_MAX_ACCURACY_DELTA
+from app.models import get_resnet18
+from app.utils.attack_full_dataset import calculate_attack_scores_original_logic
+from app.utils.checkpoint_io import checkpoint_stem, list_checkpoint_files, resolve_checkpoint_path
+from app.utils.experiment_index import index_result
+from app.utils.helpers import load_model_state_dict
+from app.utils.inference import build_inference_model
+from app.utils.multi_model import (
+    StackedModelEvaluator,
+    class_accuracies_from_logits,
+    model_metrics_from_logits
+)
+from app.utils.quantization import build_quantized_evaluator, class_accuracies, float_cpu_copy
+
+BACKENDS = ("fp32", "int8", "batched")
+
+
+def list_checkpoints(forget_class):
+    model_dir = os.path.join("unlearned_models", str(forget_class))
+    if not os.path.isdir(model_dir):
+        return []
+    return [os.path.join(model_dir, name) for name in list_checkpoint_files(model_dir)]
+
+
+def load_checkpoint_model(path):
+    model = get_resnet18()
+    model.load_state_dict(load_model_state_dict(path, map_location="cpu"))
+    return model.eval()
+
+
+def build_evaluator(model, backend, max_class_delta=QUANT_MAX_ACCURACY_DELTA):
+    """Return (model to evaluate with, report dictionary) for a rescoring backend."""
+    if backend == "int8":
+        return build_quantized_evaluator(model, max_class_delta=max_class_delta)
+    return build_inference_model(float_cpu_copy(model)), {"backend": "fp32"}
+
+
+def summarize_test_accuracies(test_accs, forget_class):
+    remain = [i for i in range(len(test_accs)) if i != forget_class]
+    return {
+        "t_accs": [round(v, 3) for v in test_accs],
+        "TUA": round(test_accs[forget_class], 3),
+        "TRA": round(sum(test_accs[i] for i in remain) / len(remain), 3),
+    }
+
+
+def rescore_checkpoint(path, forget_class, test_loader, backend, max_class_delta=QUANT_MAX_ACCURACY_DELTA):
+    model = load_checkpoint_model(path)
+    evaluator, report = build_evaluator(model, backend, max_class_delta)
+
+    start_time = time.time()
+    test_accs = class_accuracies(evaluator, test_loader)
+    report["eval_seconds"] = round(time.time() - start_time, 2)
+
+    entry = summarize_test_accuracies(test_accs, forget_class)
+    entry["ID"] = checkpoint_stem(os.path.basename(path))
+    entry["rescore"] = report
+    return entry
+
+
+def rescore_checkpoints_batched(
+    paths,
+    forget_class,
+    test_loader,
+    forget_train_loader=None,
+    models_per_pass=8,
+    device=torch.device("cpu")
+):
+    """
+    Re-score checkpoints `models_per_pass` at a time with a StackedModelEvaluator.
+
+    If `forget_train_loader` is given and the retrain checkpoint a00{fc} is among
+    `paths`, the privacy score of every checkpoint against it is included.
+    """
+    retrain_path = resolve_checkpoint_path(
+        os.path.join("unlearned_models", str(forget_class), f"a00{forget_class}")
+    )
+    if forget_train_loader is not None and retrain_path in paths:
+        # Evaluate the retrain model in the first pass so later passes can be scored against it
+        paths = [retrain_path] + [path for path in paths if path != retrain_path]
+
+    retrain_metrics = None
+    entries = []
+    for start in range(0, len(paths), models_per_pass):
+        chunk = paths[start:start + models_per_pass]
+        evaluator = StackedModelEvaluator([load_checkpoint_model(path) for path in chunk], device)
+
+        start_time = time.time()
+        logits, labels = evaluator.evaluate_logits(test_loader)
+        chunk_accs = class_accuracies_from_logits(logits, labels)
+
+        privacy_scores = [None] * len(chunk)
+        if forget_train_loader is not None:
+            forget_logits, forget_labels = evaluator.evaluate_logits(forget_train_loader)
+            metrics = model_metrics_from_logits(
+                forget_logits, forget_labels, forget_class,
+                dataset_indices=forget_train_loader.dataset.indices
+            )
+            if retrain_metrics is None and chunk[0] == retrain_path:
+                retrain_metrics = metrics[0]
+            if retrain_metrics is not None:
+                privacy_scores = [
+                    round(calculate_attack_scores_original_logic(
+                        model_metrics, retrain_metrics, use_epoch_bins=True
+                    ), 3)
+                    for model_metrics in metrics
+                ]
+        eval_seconds = round(time.time() - start_time, 2)
+
+        for path, test_accs, privacy_score in zip(chunk, chunk_accs, privacy_scores):
+            entry = summarize_test_accuracies(test_accs, forget_class)
+            entry["ID"] = checkpoint_stem(os.path.basename(path))
+            entry["rescore"] = {
+                "backend": "batched",
+                "models_per_pass": len(chunk),
+                "eval_seconds": eval_seconds
+            }
+            if privacy_score is not None:
+                entry["rescore"]["privacy_score"] = privacy_score
+            entries.append(entry)
+    return entries
+
+
+def update_result_json(forget_class, entry):
+    result_path = os.path.join("data", str(forget_class), f"{entry['ID']}.json")
+    if not os.path.exists(result_path):
+        return False
+
+    with open(result_path, "r") as f:
+        results = json.load(f)
+    for key in ("t_accs", "TUA", "TRA", "rescore"):
+        results[key] = entry[key]
+    # Written atomically: /data/{fc}/all and the summary index read these files concurrently
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(result_path), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(results, f, indent=2)
+    os.replace(tmp_path, result_path)
+    index_result(forget_class, results, result_path)
+    return True
+
+
+def main():
+    from app.utils.data_loader import get_data_loaders
+
+    parser = argparse.ArgumentParser(description="Re-score stored checkpoints on the CIFAR-10 test set")
+    parser.add_argument('--backend', choices=BACKENDS, default="int8", help="Evaluation backend")
+    parser.add_argument('--forget-class', type=int, nargs='+', default=list(range(10)), help="Forget classes to re-score")
+    parser.add_argument('--max-delta', type=float, default=QUANT_MAX_ACCURACY_DELTA, help="INT8 guardrail: largest per-class probe accuracy delta")
+    parser.add_argument('--models-per-pass', type=int, default=8, help="Batched backend: checkpoints evaluated together")
+    parser.add_argument('--privacy', action='store_true', help="Batched backend: also compute privacy scores against the retrain model")
+    parser.add_argument('--write', action='store_true', help="Update the stored result JSON files")
+    parser.add_argument('--output', help="Write all rescored entries to this JSON file")
+    args = parser.parse_args()
+
+    _, _, train_set, test_set = get_data_loaders(batch_size=256, augmentation=False)
+    test_loader = DataLoader(test_set, batch_size=500, shuffle=False)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    rescored = {}
+    for forget_class in args.forget_class:
+        paths = list_checkpoints(forget_class)
+        if args.backend == "batched":
+            forget_train_loader = None
+            if args.privacy:
+                forget_indices = [i for i, label in enumerate(train_set.targets) if label == forget_class]
+                forget_train_loader = DataLoader(
+                    Subset(train_set, forget_indices), batch_size=500, shuffle=False
+                )
+            entries = rescore_checkpoints_batched(
+                paths, forget_class, test_loader, forget_train_loader,
+                models_per_pass=args.models_per_pass, device=device
+            )
+        else:
+            entries = [
+                rescore_checkpoint(path, forget_class, test_loader, args.backend, args.max_delta)
+                for path in paths
+            ]
+
+        for entry in entries:
+            rescored.setdefault(str(forget_class), []).append(entry)
+
+            updated = args.write and update_result_json(forget_class, entry)
+            print(
+                f"[{forget_class}] {entry['ID']}: TUA {entry['TUA']:.3f}, TRA {entry['TRA']:.3f} "
+                f"({entry['rescore']['backend']}, {entry['rescore']['eval_seconds']}s)"
+                f"{' - updated' if updated else ''}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rescored, f, indent=2)
+        print(f"Rescored entries saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
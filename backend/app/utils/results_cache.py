@@ -0,0 +1,302 @@
+"""
+In-memory cache of the experiment results served by /data/{forget_class}/all.
+
+Each data/{fc}/*.json file is parsed once and kept as compact JSON bytes, keyed
+by its modification time and size. A request only scans the directory: when
+nothing changed, the previously assembled response body, its gzip encoding and
+its ETag are returned as they are; when files were added, changed or removed,
+only those files are read again.
+
+Listing queries (field projection, sorting, pagination) are served from a
+per-class summary index, data/{fc}/.index/summaries.json, which holds the
+scalar fields of every result (ID, Method, UA, RA, TUA, TRA, PA, RTE, ...).
+A result file is parsed once when it appears or changes; after that, listing
+never reads the heavy fields (points, attack, cka, distributions) unless they
+are requested for the rows of the current page.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+
+import orjson
+
+from app.config import RESULTS_GZIP_LEVEL
+
+SUMMARY_INDEX = os.path.join('.index', 'summaries.json')
+# Special `fields` value selecting every summary field
+SUMMARY_FIELDS = "summary"
+
+_lock = threading.Lock()
+_files = {}
+_responses = {}
+_summaries = {}
+
+
+def _directory_signature(data_dir):
+    entries = []
+    with os.scandir(data_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.json') and entry.is_file():
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+
+def _last_modified(data_dir, signature):
+    # Removing a result leaves the newest file mtime unchanged but updates the
+    # directory's, so a deletion is newer than any If-Modified-Since sent before it
+    newest = max([os.stat(data_dir).st_mtime_ns] + [mtime_ns for _, mtime_ns, _ in signature])
+    return newest // 10 ** 9
+
+
+def read_result_bytes(path, stamp=None):
+    """Compact JSON bytes of a result file, re-read only when its mtime or size changes."""
+    if stamp is None:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _files.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # json.dump writes NaN/Infinity, which orjson rejects (and serialises as null)
+        data = json.loads(raw)
+    body = orjson.dumps(data)
+
+    with _lock:
+        _files[path] = (stamp, body)
+    return body
+
+
+def result_sort_key(filename, forget_class):
+    """Base model results first, then the retrain model, then the experiments by name."""
+    if filename.startswith(f'000{forget_class}'):
+        return (0, filename)
+    elif filename.startswith(f'a00{forget_class}'):
+        return (1, filename)
+    return (2, filename)
+
+
+def get_all_results(forget_class):
+    """
+    Cached response of every result file of a forget class.
+
+    Returns:
+        Dictionary with the JSON `body`, its `gzip` encoding, `etag` and
+        `last_modified`, or None if the directory holds no result files
+
+    Raises:
+        FileNotFoundError: If data/{forget_class} does not exist
+    """
+    data_dir = os.path.join('data', forget_class)
+    signature = _directory_signature(data_dir)
+    if not signature:
+        return None
+
+    with _lock:
+        cached = _responses.get(forget_class)
+        if cached is not None and cached["signature"] == signature:
+            return cached
+
+    stamps = {name: (mtime_ns, size) for name, mtime_ns, size in signature}
+    names = sorted(stamps, key=lambda name: result_sort_key(name, forget_class))
+    parts = []
+    for name in names:
+        try:
+            result = read_result_bytes(os.path.join(data_dir, name), stamps[name])
+        except Exception as e:
+            raise ValueError(f"Error reading file {name}: {str(e)}") from e
+        parts.append(orjson.dumps(name[:-5]) + b":" + result)
+    response = _build_response(b"{" + b",".join(parts) + b"}", signature, _last_modified(data_dir, signature))
+
+    with _lock:
+        _responses[forget_class] = response
+        # Forget files that were removed from this directory
+        for path in [path for path in _files if os.path.dirname(path) == data_dir]:
+            if os.path.basename(path) not in stamps:
+                del _files[path]
+    return response
+
+
+def _build_response(body, signature, last_modified):
+    return {
+        "signature": signature,
+        "body": body,
+        "gzip": gzip.compress(body, compresslevel=RESULTS_GZIP_LEVEL),
+        "etag": '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"',
+        "last_modified": last_modified,
+    }
+
+
+def _split_result(data):
+    summary = {key: value for key, value in data.items() if not isinstance(value, (list, dict))}
+    heavy_fields = [key for key in data if key not in summary]
+    return summary, heavy_fields
+
+
+def _load_summary_index(index_path):
+    try:
+        with open(index_path, 'rb') as f:
+            return orjson.loads(f.read()).get("files", {})
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+
+
+def _save_summary_index(index_path, files):
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(index_path), suffix=".tmp")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(orjson.dumps({"version": 1, "files": files}))
+    os.replace(tmp_path, index_path)
+
+
+def get_summaries(forget_class):
+    """
+    Summary index entries of a forget class in the default result order.
+
+    Returns:
+        Tuple of (directory signature, list of (file name, index entry), index
+        entries by file name) where an entry holds the scalar `summary` fields and
+        the names of the `heavy_fields`, or None if the directory holds no result
+        files
+
+    Raises:
+        FileNotFoundError: If data/{forget_class} does not exist
+    """
+    data_dir = os.path.join('data', forget_class)
+    signature = _directory_signature(data_dir)
+    if not signature:
+        return None
+
+    with _lock:
+        cached = _summaries.get(forget_class)
+    if cached is not None and cached[0] == signature:
+        return cached
+
+    index_path = os.path.join(data_dir, SUMMARY_INDEX)
+    files = dict(cached[2]) if cached is not None else _load_summary_index(index_path)
+    stamps = {name: [mtime_ns, size] for name, mtime_ns, size in signature}
+    changed = set(files) - set(stamps)
+    for name in list(changed):
+        del files[name]
+    for name, stamp in stamps.items():
+        entry = files.get(name)
+        if entry is not None and entry["stamp"] == stamp:
+            continue
+        try:
+            data = orjson.loads(read_result_bytes(os.path.join(data_dir, name), tuple(stamp)))
+        except Exception as e:
+            raise ValueError(f"Error reading file {name}: {str(e)}") from e
+        summary, heavy_fields = _split_result(data)
+        files[name] = {"stamp": stamp, "summary": summary, "heavy_fields": heavy_fields}
+        changed.add(name)
+    if changed:
+        _save_summary_index(index_path, files)
+
+    names = sorted(stamps, key=lambda name: result_sort_key(name, forget_class))
+    result = (signature, [(name, files[name]) for name in names], files)
+    with _lock:
+        _summaries[forget_class] = result
+    return result
+
+
+def _sort_entries(entries, sort):
+    # Numbers in the requested order, then other values ("N/A", names), then missing fields
+    field = sort.lstrip("-")
+    descending = sort.startswith("-")
+    groups = ([], [], [])
+    for item in entries:
+        value = item[1]["summary"].get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            groups[0].append(item)
+        elif value is not None:
+            groups[1].append(item)
+        else:
+            groups[2].append(item)
+    groups[0].sort(key=lambda item: item[1]["summary"][field], reverse=descending)
+    groups[1].sort(key=lambda item: str(item[1]["summary"][field]), reverse=descending)
+    return groups[0] + groups[1] + groups[2]
+
+
+def query_results(forget_class, fields=None, sort=None, offset=0, limit=None):
+    """
+    Projected, sorted and paginated results of a forget class.
+
+    Args:
+        forget_class: Forget class directory under data/
+        fields: Field names to include, ["summary"] for every summary field, or
+            None for complete results
+        sort: Field to sort by ("-" prefix for descending); None keeps the
+            default order (base model, retrain model, experiments by name)
+        offset: Number of results to skip
+        limit: Maximum number of results to return
+
+    Returns:
+        Response dictionary as returned by get_all_results plus the `total`
+        number of results before pagination, or None if there are no results
+    """
+    summaries = get_summaries(forget_class)
+    if summaries is None:
+        return None
+    signature, entries, _ = summaries
+
+    if sort:
+        entries = _sort_entries(entries, sort)
+
+    page = entries[offset:offset + limit if limit is not None else None]
+    data_dir = os.path.join('data', forget_class)
+    parts = []
+    for name, entry in page:
+        key = orjson.dumps(name[:-5])
+        if fields is None:
+            parts.append(key + b":" + read_result_bytes(os.path.join(data_dir, name), tuple(entry["stamp"])))
+            continue
+
+        if fields == [SUMMARY_FIELDS]:
+            record = entry["summary"]
+        elif any(field in entry["heavy_fields"] for field in fields):
+            # Only the rows of this page that need heavy fields are parsed
+            data = orjson.loads(read_result_bytes(os.path.join(data_dir, name), tuple(entry["stamp"])))
+            record = {field: data[field] for field in fields if field in data}
+        else:
+            record = {field: entry["summary"][field] for field in fields if field in entry["summary"]}
+        parts.append(key + b":" + orjson.dumps(record))
+
+    response = _build_response(b"{" + b",".join(parts) + b"}", signature, _last_modified(data_dir, signature))
+    response["total"] = len(entries)
+    return response
+
+
+def cache_headers(response):
+    return {
+        "ETag": response["etag"],
+        "Last-Modified": formatdate(response["last_modified"], usegmt=True),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+
+
+def is_not_modified(request_headers, response):
+    """Whether a conditional request (If-None-Match / If-Modified-Since) can be answered with 304."""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or response["etag"] in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return response["last_modified"] <= since
+    return False
@@ -4,6 +4,8 @@ import torch.nn.functional as F
 from sklearn.svm import SVC
 from typing import Tuple, Dict
 
+from app.utils.instrumentation import loader_samples, timed
+
 
 def entropy(p, dim=-1, keepdim=False):
     """Calculate entropy of probability distribution."""
@@ -15,6 +17,7 @@ def entropy(p, dim=-1, keepdim=False):
 def collect_prob(data_loader, model, device, target_class=None):
     """Collect probability predictions from model."""
     from app.utils.evaluation import model_eval_mode
+    from app.utils.inference import get_inference_model
     
     if data_loader is None:
         return torch.zeros([0, 10]), torch.zeros([0])
@@ -23,6 +26,7 @@ def collect_prob(data_loader, model, device, target_class=None):
     targets = []
 
     with model_eval_mode(model):
+        inference_model = get_inference_model(model)
         with torch.no_grad():
             for batch_idx, (data, target) in enumerate(data_loader):
                 data, target = data.to(device), target.to(device)
@@ -35,7 +39,7 @@ def collect_prob(data_loader, model, device, target_class=None):
                     data = data[mask]
                     target = target[mask]
                 
-                output = model(data)
+                output = inference_model(data)
                 prob.append(F.softmax(output, dim=-1).data)
                 targets.append(target)
 
@@ -90,6 +94,7 @@ def SVC_fit_predict(shadow_train, shadow_test, target_train, target_test):
     return np.mean(accs) if accs else 0.5
 
 
+@timed("mia")
 async def calculate_salun_mia_efficacy(
     unlearn_model,
     shadow_train_loader,
@@ -169,6 +174,7 @@ async def calculate_salun_mia_efficacy(
     return results
 
 
+@timed("mia")
 async def train_mia_classifier_once(
     baseline_model,
     shadow_train_loader,
@@ -239,6 +245,7 @@ async def train_mia_classifier_once(
         return None
 
 
+@timed("mia", samples=loader_samples("forget_loader"))
 async def predict_mia_efficacy(
     current_model,
     mia_classifier,
@@ -0,0 +1,130 @@
+"""
+Startup timing and background warm-up of the API process.
+
+Importing main loads only the web stack and light utilities: torch,
+torchvision, umap, matplotlib/seaborn, sklearn, the CKA package, the service
+and thread modules and CIFAR-10 are loaded on first use. The lifespan handler
+starts a warm-up thread that does this work ahead of the first request
+(hub download, experiment index, CIFAR-10, /image/all_subset responses,
+service modules) while the server already accepts connections, then queues
+the per-class reference artifacts for app.utils.prewarm.
+
+The duration of every phase is recorded in a report served by GET /startup,
+which also tells readiness probes when the warm-up has finished.
+"""
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+
+from app.config import PREWARM_ON_IDLE, STARTUP_WARMUP
+
+_lock = threading.Lock()
+_report = {
+    "phases": {},
+    "warmup": {},
+    "warmup_done": False,
+    "warmup_errors": {},
+}
+
+
+@contextmanager
+def startup_phase(name, section="phases"):
+    """Record the wall time of a startup phase in the report."""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start_time
+        with _lock:
+            _report[section][name] = round(elapsed, 3)
+        print(f"Startup: {name} took {elapsed:.3f}s")
+
+
+def record_phase(name, seconds):
+    with _lock:
+        _report["phases"][name] = round(seconds, 3)
+    print(f"Startup: {name} took {seconds:.3f}s")
+
+
+def startup_report():
+    with _lock:
+        return {
+            "phases": dict(_report["phases"]),
+            "warmup": dict(_report["warmup"]),
+            "warmup_done": _report["warmup_done"],
+            "warmup_errors": dict(_report["warmup_errors"]),
+        }
+
+
+def _download_weights():
+    from app.utils.helpers import download_weights_from_hub
+    download_weights_from_hub()
+
+
+def _build_experiment_index():
+    from app.utils.experiment_index import ensure_experiment_index
+    ensure_experiment_index()
+
+
+def _load_cifar10():
+    from app.utils.data_loader import get_cifar10_train
+    get_cifar10_train()
+
+
+def _build_subset_images():
+    from app.utils.data_loader import get_cifar10_train
+    from app.utils.subset_images import build_subset_images
+    build_subset_images(*get_cifar10_train())
+
+
+def _queue_prewarm():
+    # Only queues the classes: the warmer runs on its own thread while no job runs
+    from app.utils.prewarm import prewarm
+    if PREWARM_ON_IDLE:
+        prewarm()
+
+
+def _import_services():
+    # Importing every service pulls in torch, the thread modules, umap, matplotlib and sklearn
+    services = importlib.import_module("app.services")
+    for name in services.__all__:
+        getattr(services, name)
+
+
+# Checkpoints first: unlearning requests need the base weights
+WARMUP_STEPS = (
+    ("download_weights", _download_weights),
+    ("experiment_index", _build_experiment_index),
+    ("load_cifar10", _load_cifar10),
+    ("subset_images", _build_subset_images),
+    ("import_services", _import_services),
+    ("reference_prewarm", _queue_prewarm),
+)
+
+
+def run_warmup(steps=WARMUP_STEPS):
+    """Run the warm-up steps in order; a failed step is reported and skipped."""
+    with startup_phase("total", section="warmup"):
+        for name, step in steps:
+            try:
+                with startup_phase(name, section="warmup"):
+                    step()
+            except Exception as e:
+                with _lock:
+                    _report["warmup_errors"][name] = str(e)
+                print(f"Startup: warm-up step {name} failed: {e}")
+    with _lock:
+        _report["warmup_done"] = True
+
+
+def start_warmup():
+    """Run the warm-up on a background thread (or not at all if STARTUP_WARMUP is off)."""
+    if not STARTUP_WARMUP:
+        with _lock:
+            _report["warmup_done"] = True
+        return None
+    thread = threading.Thread(target=run_warmup, name="startup-warmup", daemon=True)
+    thread.start()
+    return thread
+
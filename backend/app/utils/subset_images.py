@@ -0,0 +1,116 @@
+"""
+Pre-serialised responses of /image/all_subset/{forget_class}.
+
+Every class's 200 images of the fixed subset (get_fixed_umap_indices with
+2000 samples and seed 2048) are resized to 30x30, PNG-encoded and base64-
+encoded into {"images": [{"index", "base64"}]}. All ten classes are built in
+parallel, either in the background at startup or on the first request, and
+kept in memory as JSON bytes with their gzip encoding and ETag, so requests
+touch neither the disk nor a JSON parser. The JSON is also written to
+data/subset/{c}/{c}_base64.json, which later processes load without
+re-encoding.
+"""
+import base64
+import gzip
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+from PIL import Image
+
+from app.config import RESULTS_GZIP_LEVEL
+
+SUBSET_TOTAL_SAMPLES = 2000
+SUBSET_SEED = 2048
+THUMBNAIL_SIZE = (30, 30)
+NUM_CLASSES = 10
+
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+_responses = {}
+
+
+def subset_cache_file(class_id):
+    return os.path.join("data", "subset", str(class_id), f"{class_id}_base64.json")
+
+
+def _encode_thumbnail(image):
+    img = Image.fromarray(image).resize(THUMBNAIL_SIZE, Image.BILINEAR)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def _build_class(x_train, class_id, selected_indices):
+    cache_file = subset_cache_file(class_id)
+    if os.path.exists(cache_file):
+        with open(cache_file, "rb") as f:
+            body = f.read()
+    else:
+        images = [
+            {"index": int(idx), "base64": _encode_thumbnail(x_train[idx])}
+            for idx in selected_indices
+        ]
+        body = orjson.dumps({"images": images})
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_file), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, cache_file)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    return {
+        "body": body,
+        "gzip": gzip.compress(body, compresslevel=RESULTS_GZIP_LEVEL),
+        "etag": '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"',
+    }
+
+
+def build_subset_images(x_train, y_train, max_workers=None):
+    """
+    Build the responses of every class that is not in memory yet, in parallel.
+
+    PIL releases the GIL while resizing and compressing, so the classes are
+    encoded on a thread pool.
+    """
+    with _build_lock:
+        with _lock:
+            missing = [class_id for class_id in range(NUM_CLASSES) if class_id not in _responses]
+        if not missing:
+            return
+
+        from app.utils.data_loader import get_fixed_umap_indices
+
+        indices_dict = get_fixed_umap_indices(
+            total_samples=SUBSET_TOTAL_SAMPLES, seed=SUBSET_SEED, y_train=y_train
+        )
+        max_workers = max_workers or min(len(missing), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            built = executor.map(
+                lambda class_id: (class_id, _build_class(x_train, class_id, indices_dict[class_id])),
+                missing
+            )
+            for class_id, response in built:
+                with _lock:
+                    _responses[class_id] = response
+
+
+def get_subset_images(x_train, y_train, class_id):
+    """
+    Response of one class: a dictionary with the JSON `body`, its `gzip`
+    encoding and `etag`. Waits for the build if it is still running.
+    """
+    with _lock:
+        response = _responses.get(class_id)
+    if response is None:
+        build_subset_images(x_train, y_train)
+        with _lock:
+            response = _responses[class_id]
+    return response
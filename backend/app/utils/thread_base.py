@@ -3,6 +3,7 @@ Base classes for thread operations to reduce code duplication.
 """
 import threading
 import asyncio
+import contextvars
 from typing import Any
 
 
@@ -16,6 +17,8 @@ class BaseUnlearningThread(threading.Thread):
         self.exception = None
         self.loop = None
         self._stop_event = threading.Event()
+        # Run in the creator's context, so spans are recorded to its job
+        self._context = contextvars.copy_context()
     
     def stop(self):
         """Stop the thread execution."""
@@ -30,7 +33,7 @@ class BaseUnlearningThread(threading.Thread):
         try:
             self.loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
-            self.loop.run_until_complete(self.async_main())
+            self._context.run(self.loop.run_until_complete, self.async_main())
         except Exception as e:
             self.exception = e
         finally:
@@ -68,6 +71,8 @@ class BaseTrainingThread(threading.Thread):
         self.exception = None
         self.loop = None
         self._stop_event = threading.Event()
+        # Run in the creator's context, so spans are recorded to its job
+        self._context = contextvars.copy_context()
     
     def stop(self):
         """Stop the thread execution."""
@@ -82,7 +87,7 @@ class BaseTrainingThread(threading.Thread):
         try:
             self.loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
-            self.loop.run_until_complete(self.async_main())
+            self._context.run(self.loop.run_until_complete, self.async_main())
         except Exception as e:
             self.exception = e
         finally:
@@ -1,12 +1,16 @@
 """
 Utility functions for thread operations to reduce code duplication in _thread files.
 """
+import asyncio
 import torch
 import time
 from torch.utils.data import DataLoader, Subset
 from app.config import UMAP_DATA_SIZE, UMAP_DATASET, UNLEARN_SEED
+from app.utils.instrumentation import job_summary, job_timings, span, timed
+from app.utils.profiling import job_profile
 
 
+@timed("index_building")
 def setup_umap_subset(
     train_set, 
     test_set, 
@@ -125,26 +129,22 @@ def prepare_detailed_results(
         forget_class: Class to forget
     
     Returns:
-        List of detailed results in standard format
+        Columns of the detailed results (see build_point_columns); the result
+        JSON stores them in the standard row format
+        [gt, pred, img, forget (0/1), x, y, {class: prob}]
     """
-    from app.utils.helpers import compress_prob_array
-    
-    detailed_results = []
-    for i in range(len(umap_subset)):
-        original_index = selected_indices[i]
-        ground_truth = umap_subset.dataset.targets[original_index]
-        is_forget = (ground_truth == forget_class)
-        detailed_results.append([
-            int(ground_truth),                             # gt
-            int(predicted_labels[i]),                      # pred
-            int(original_index),                           # img
-            1 if is_forget else 0,                         # forget as binary
-            round(float(umap_embedding[i][0]), 2),         # x coordinate
-            round(float(umap_embedding[i][1]), 2),         # y coordinate
-            compress_prob_array(probs[i].tolist()),        # compressed probabilities
-        ])
-    
-    return detailed_results
+    from app.utils.point_columns import build_point_columns
+    
+    # Built column-wise; predictions may extend past the subset (last batch)
+    num_samples = len(umap_subset)
+    return build_point_columns(
+        umap_subset.dataset.targets,
+        selected_indices[:num_samples],
+        predicted_labels[:num_samples],
+        umap_embedding[:num_samples],
+        probs[:num_samples],
+        forget_class
+    )
 
 
 def create_base_results_dict(
@@ -170,13 +170,14 @@ def create_base_results_dict(
         Base results dictionary
     """
     import os
+    from app.utils.checkpoint_io import checkpoint_stem
     
     results = {
         "CreatedAt": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
         "ID": status.recent_id,
         "FC": "N/A" if is_training_eval else forget_class,
         "Type": "Pretrained" if is_training_eval else "Unlearned",
-        "Base": os.path.basename(base_weights_path).replace('.pth', ''),
+        "Base": checkpoint_stem(os.path.basename(base_weights_path)),
         "Method": method,
     }
     
@@ -196,6 +197,61 @@ def create_base_results_dict(
     return results
 
 
+def calculate_precision_delta(model, results, forget_class, batch_size=1000):
+    """
+    Compare the reported test accuracies of a reduced-precision model with an
+    fp32 evaluation of the same weights.
+    
+    Args:
+        model: Model with a non-fp32 execution precision
+        results: Results dictionary containing "t_accs"
+        forget_class: Class to forget
+        batch_size: Evaluation batch size
+    
+    Returns:
+        Dictionary with the fp32 test accuracies and per-class deltas
+    """
+    from torchvision import datasets, transforms
+    from app.models import fp32_execution
+    from app.utils.evaluation import model_eval_mode
+    from app.utils.inference import get_inference_model
+    
+    test_set = datasets.CIFAR10(
+        root='./data', 
+        train=False, 
+        download=False, 
+        transform=transforms.Compose([
+            transforms.ToTensor(),
+            transforms.Normalize((0.4914, 0.4822, 0.4465), (0.2023, 0.1994, 0.2010))
+        ])
+    )
+    test_loader = DataLoader(test_set, batch_size=batch_size, shuffle=False)
+    device = next(model.parameters()).device
+    
+    class_correct = torch.zeros(10, dtype=torch.float64)
+    class_total = torch.zeros(10, dtype=torch.float64)
+    with fp32_execution(model), model_eval_mode(model), torch.no_grad():
+        inference_model = get_inference_model(model)
+        for inputs, labels in test_loader:
+            predicted = inference_model(inputs.to(device)).argmax(1).cpu()
+            correct = (predicted == labels).double()
+            class_correct.index_add_(0, labels, correct)
+            class_total.index_add_(0, labels, torch.ones_like(correct))
+    
+    fp32_accs = (class_correct / class_total.clamp(min=1)).tolist()
+    remain = [i for i in range(10) if i != forget_class]
+    fp32_tra = sum(fp32_accs[i] for i in remain) / len(remain)
+    return {
+        "t_accs_fp32": [round(v, 3) for v in fp32_accs],
+        "t_accs_delta": [
+            round(reported - reference, 3)
+            for reported, reference in zip(results["t_accs"], fp32_accs)
+        ],
+        "TUA_delta": round(results["TUA"] - fp32_accs[forget_class], 3),
+        "TRA_delta": round(results["TRA"] - fp32_tra, 3),
+    }
+
+
 def save_results_and_model(
     results,
     model,
@@ -203,7 +259,8 @@ def save_results_and_model(
     status
 ):
     """
-    Save results to JSON and model weights with consistent file structure.
+    Save model weights and results JSON (with the job's stage timings) with
+    consistent file structure.
     
     Args:
         results: Results dictionary to save
@@ -215,25 +272,52 @@ def save_results_and_model(
         Path to saved results file
     """
     import os
-    import json
+    from app.models import has_lora_adapters
+    from app.utils.experiment_index import index_result
     from app.utils.helpers import save_model
+    from app.utils.point_columns import save_result_files
     
     # Create directory structure
     os.makedirs('data', exist_ok=True)
     forget_class_dir = os.path.join('data', str(forget_class))
     os.makedirs(forget_class_dir, exist_ok=True)
     
-    # Save results
+    # Record the execution mode and its accuracy cost relative to fp32
+    precision = getattr(model, "precision", "fp32")
+    if precision != "fp32" or getattr(model, "channels_last", False):
+        results["Precision"] = precision
+        results["ChannelsLast"] = getattr(model, "channels_last", False)
+    if precision != "fp32" and "t_accs" in results:
+        results["precision_delta"] = calculate_precision_delta(
+            model, results, forget_class
+        )
+    
+    # Only methods that attached adapters trained them (see attach_lora_adapters)
+    if has_lora_adapters(model):
+        results["AdapterRank"] = model.lora_config["rank"]
+    
+    # Save model (as a delta to the base weights it was unlearned from)
+    base_weights_path = None
+    if results.get("Base"):
+        base_weights_path = os.path.join('unlearned_models', str(forget_class), results["Base"])
+    with span("model_save"):
+        save_model(
+            model=model,
+            forget_class=forget_class,
+            model_name=status.recent_id,
+            base_weights_path=base_weights_path
+        )
+    
+    # Stage timings of the job so far (serialisation itself only shows in /metrics)
+    timings = job_summary()
+    if timings is not None:
+        results["timings"] = timings
+    
+    # Save results (and the columnar sidecar of the detailed points)
     result_path = os.path.join(forget_class_dir, f'{results["ID"]}.json')
-    with open(result_path, 'w') as f:
-        json.dump(results, f, indent=2)
-    
-    # Save model
-    save_model(
-        model=model,
-        forget_class=forget_class,
-        model_name=status.recent_id
-    )
+    with span("serialize"):
+        save_result_files(results, result_path)
+        index_result(forget_class, results, result_path)
     
     return result_path
 
@@ -291,16 +375,18 @@ def evaluate_on_forget_set(
         Tuple of (loss, accuracy)
     """
     from app.utils.evaluation import model_eval_mode
+    from app.utils.inference import get_inference_model
     
     running_loss = 0.0
     correct = 0
     total = 0
     
     with model_eval_mode(model):
+        inference_model = get_inference_model(model)
         with torch.no_grad():
             for inputs, labels in forget_loader:
                 inputs, labels = inputs.to(device), labels.to(device)
-                outputs = model(inputs)
+                outputs = inference_model(inputs)
                 loss = criterion(outputs, labels)
                 running_loss += loss.item()
                 
@@ -314,6 +400,7 @@ def evaluate_on_forget_set(
     return epoch_loss, epoch_acc
 
 
+@timed("epoch_metrics")
 async def calculate_comprehensive_epoch_metrics(
     model,
     train_loader,
@@ -448,7 +535,8 @@ async def initialize_epoch_metrics_system(
     device,
     forget_class,
     enable_ps=False,
-    enable_mia=False
+    enable_mia=False,
+    baseline_path=None
 ):
     """
     Initialize components needed for comprehensive epoch metrics calculation.
@@ -462,6 +550,8 @@ async def initialize_epoch_metrics_system(
         forget_class: Class to forget
         enable_ps: Whether PS calculation will be needed
         enable_mia: Whether MIA calculation will be needed
+        baseline_path: Checkpoint `model` was loaded from, unmodified; its MIA
+            classifier is then shared through app.utils.reference_cache
         
     Returns:
         Dictionary with initialized components
@@ -475,68 +565,68 @@ async def initialize_epoch_metrics_system(
     # Initialize retrain cache for PS if enabled
     if enable_ps:
         try:
-            from app.utils.attack_full_dataset import calculate_model_metrics
-            from app.models import get_resnet18
-            import os
+            from app.utils.reference_cache import get_retrain_metrics
             
-            retrain_model_path = f"unlearned_models/{forget_class}/a00{forget_class}.pth"
-            if os.path.exists(retrain_model_path):
-                print("Pre-calculating retrain metrics for PS optimization...")
-                retrain_model = get_resnet18().to(device)
-                retrain_model.load_state_dict(torch.load(retrain_model_path, map_location=device))
-                retrain_model.eval()
-                
-                components['retrain_metrics_cache'] = await calculate_model_metrics(
-                    retrain_model, train_loader, device, forget_class, 2.0, 1.0,
-                    create_plots=True, model_name="Retrain"
-                )
+            # Computed once per retrain checkpoint (or by the background warmer)
+            components['retrain_metrics_cache'] = await get_retrain_metrics(
+                forget_class, device, create_plots=True
+            )
+            if components['retrain_metrics_cache'] is not None:
                 print(f"Retrain metrics cached: {len(components['retrain_metrics_cache']['entropies'])} samples")
-                
-                # Free memory
-                del retrain_model
-                if device.type == 'cuda':
-                    torch.cuda.empty_cache()
         except Exception as e:
             print(f"Error pre-calculating retrain metrics: {e}")
     
     # Initialize MIA classifier if enabled
     if enable_mia:
         try:
-            from app.utils.salun_mia import train_mia_classifier_once
-            from torch.utils.data import DataLoader, Subset
-            import random
-            
             print("Initializing MIA classifier...")
             
-            # Create shadow loaders
-            remaining_train_indices = [i for i, target in enumerate(train_set.targets) 
-                                      if target != forget_class]
-            shadow_train_size = min(4500, len(remaining_train_indices))
-            shadow_train_indices = random.sample(remaining_train_indices, shadow_train_size)
-            shadow_train_subset = Subset(train_set, shadow_train_indices)
-            shadow_train_loader = DataLoader(shadow_train_subset, batch_size=128, shuffle=False)
+            if baseline_path is not None:
+                from app.utils.reference_cache import get_mia_classifier, get_shadow_loaders
+                
+                shadow_train_loader, shadow_test_loader = get_shadow_loaders(forget_class)
+                components['shadow_loaders'] = {
+                    'shadow_train': shadow_train_loader,
+                    'shadow_test': shadow_test_loader
+                }
+                components['mia_classifier'] = await get_mia_classifier(
+                    forget_class, baseline_path, device
+                )
+                print("MIA classifier ready!")
+            else:
+                from app.utils.salun_mia import train_mia_classifier_once
+                from torch.utils.data import DataLoader, Subset
+                import random
+                
+                # Create shadow loaders
+                remaining_train_indices = [i for i, target in enumerate(train_set.targets) 
+                                          if target != forget_class]
+                shadow_train_size = min(4500, len(remaining_train_indices))
+                shadow_train_indices = random.sample(remaining_train_indices, shadow_train_size)
+                shadow_train_subset = Subset(train_set, shadow_train_indices)
+                shadow_train_loader = DataLoader(shadow_train_subset, batch_size=128, shuffle=False)
             
-            remaining_test_indices = [i for i, target in enumerate(test_set.targets) 
-                                     if target != forget_class]
-            shadow_test_size = min(4500, len(remaining_test_indices))
-            shadow_test_indices = random.sample(remaining_test_indices, shadow_test_size)
-            shadow_test_subset = Subset(test_set, shadow_test_indices)
-            shadow_test_loader = DataLoader(shadow_test_subset, batch_size=128, shuffle=False)
+                remaining_test_indices = [i for i, target in enumerate(test_set.targets) 
+                                         if target != forget_class]
+                shadow_test_size = min(4500, len(remaining_test_indices))
+                shadow_test_indices = random.sample(remaining_test_indices, shadow_test_size)
+                shadow_test_subset = Subset(test_set, shadow_test_indices)
+                shadow_test_loader = DataLoader(shadow_test_subset, batch_size=128, shuffle=False)
             
-            components['shadow_loaders'] = {
-                'shadow_train': shadow_train_loader,
-                'shadow_test': shadow_test_loader
-            }
+                components['shadow_loaders'] = {
+                    'shadow_train': shadow_train_loader,
+                    'shadow_test': shadow_test_loader
+                }
             
-            # Train MIA classifier
-            components['mia_classifier'] = await train_mia_classifier_once(
-                baseline_model=model,
-                shadow_train_loader=shadow_train_loader,
-                shadow_test_loader=shadow_test_loader,
-                device=device,
-                forget_class=forget_class
-            )
-            print("MIA classifier training completed!")
+                # Train MIA classifier
+                components['mia_classifier'] = await train_mia_classifier_once(
+                    baseline_model=model,
+                    shadow_train_loader=shadow_train_loader,
+                    shadow_test_loader=shadow_test_loader,
+                    device=device,
+                    forget_class=forget_class
+                )
+                print("MIA classifier training completed!")
             
         except Exception as e:
             print(f"Error initializing MIA classifier: {e}")
@@ -597,4 +687,29 @@ def save_epoch_plots(
         
     except Exception as e:
         print(f"Error generating epoch plot: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+async def run_in_worker_loop(service, *args):
+    """
+    Run a service coroutine on its own event loop in a worker thread.
+
+    The services do their setup (data loaders, dataset scans, checkpoint
+    loading) synchronously before starting their training thread, then poll it.
+    Running them off the API's event loop keeps every other request
+    responsive while a job is being set up. The call is one instrumentation
+    job named after the service, so its stage timings end up in its results,
+    and is profiled when its request asks for it (see app.utils.profiling).
+
+    Args:
+        service: Coroutine function, e.g. unlearning_FT
+        *args: Arguments passed to `service` (its request and status first)
+
+    Returns:
+        The coroutine's return value
+    """
+    def run_job():
+        with job_timings(service.__name__), job_profile(service.__name__, *args[:2]):
+            return asyncio.run(service(*args))
+
+    return await asyncio.to_thread(run_job)
@@ -12,7 +12,9 @@ from app.config import (
     UMAP_INIT,
     UMAP_N_JOBS
 )
+from app.utils.instrumentation import timed
 
+@timed("umap", samples=lambda arguments: len(arguments["activation"]))
 async def compute_umap_embedding(
     activation,
     labels,
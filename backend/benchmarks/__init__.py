@@ -0,0 +1,6 @@
+"""
+Benchmarks for the backend, run from the backend directory:
+
+    python -m benchmarks.startup
+    python -m benchmarks.pipeline
+"""
@@ -0,0 +1,477 @@
+"""
+Offline benchmark of the training and unlearning pipeline stages.
+
+Runs on synthetic CIFAR-shaped data and random ResNet-18 weights (see
+benchmarks.synthetic), so it needs neither network access nor the real
+dataset and checkpoints. Every stage is timed in isolation, --repeat times:
+
+    loader                    one pass over the augmented training loader
+    evaluate_model            evaluate_model on the test set
+    calculate_model_metrics   forget-class entropies/confidences over the training set
+    calculate_scores          the four attack score sweeps of process_attack_metrics
+    mia_training              train_mia_classifier_once on the shadow loaders
+    cka                       calculate_cka_similarity against the base and retrain models
+    umap                      compute_umap_embedding of the UMAP subset activations
+    prepare_detailed_results  detailed points of the UMAP subset
+    json_save                 save_result_files of a full result (JSON and sidecar)
+
+Every unlearning method then runs one job with a single epoch, of which the
+training stage recorded by app.utils.instrumentation (train_epoch, or
+train_head and fisher for the head-only and Fisher methods) is reported
+together with the job's total time.
+
+The results are printed as JSON on stdout (the pipeline's own log goes to
+stderr) and written to --output. With --baseline, every stage is compared
+with a stored run and the process exits with status 1 when one is slower by
+more than --tolerance, so it can gate performance work.
+
+Usage (from the backend directory):
+    python -m benchmarks.pipeline
+    python -m benchmarks.pipeline --output benchmarks/baseline.json
+    python -m benchmarks.pipeline --baseline benchmarks/baseline.json --stages loader,cka --methods FT,GA
+    python -m benchmarks.pipeline --train-size 50000 --test-size 10000
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from benchmarks.synthetic import (
+    synthetic_workspace,
+    write_reference_checkpoints,
+    write_retrain_distribution,
+)
+
+UNLEARNING_METHODS = (
+    "GA",
+    "RL",
+    "FT",
+    "GA_FT",
+    "GA_SL_FT",
+    "GA_SL_FT_V2",
+    "SCRUB",
+    "SalUn",
+    "fisher",
+    "head",
+    "retrain",
+)
+
+# Training stage of an unlearning job, in order of preference
+UNLEARNING_STAGES = ("train_epoch", "train_head", "fisher")
+
+
+class _Context:
+    """Models, loaders and inputs shared by the stages, built once by _prepare."""
+
+
+def _device():
+    from app.config import GPU_ID
+
+    return torch.device(
+        f"cuda:{GPU_ID}" if torch.cuda.is_available()
+        else "mps" if torch.backends.mps.is_available()
+        else "cpu"
+    )
+
+
+def _synchronize(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+    elif device.type == "mps":
+        torch.mps.synchronize()
+
+
+async def _prepare(ctx):
+    from app.models import get_resnet18
+    from app.utils.data_loader import get_data_loaders
+    from app.utils.evaluation import get_layer_activations_and_predictions
+    from app.utils.model_pool import get_state_dict
+    from app.utils.thread_operations import setup_umap_subset
+
+    ctx.base_path, _ = write_reference_checkpoints(ctx.forget_class, ctx.seed)
+    await write_retrain_distribution(ctx.forget_class, ctx.device)
+
+    ctx.model = get_resnet18().to(ctx.device)
+    ctx.model.load_state_dict(get_state_dict(ctx.base_path))
+    ctx.criterion = nn.CrossEntropyLoss()
+    ctx.train_loader, ctx.test_loader, ctx.train_set, ctx.test_set = get_data_loaders(
+        batch_size=ctx.batch_size, augmentation=False
+    )
+
+    ctx.umap_subset, ctx.umap_loader, ctx.selected_indices = setup_umap_subset(ctx.train_set, ctx.test_set)
+    ctx.activations, ctx.predicted_labels, ctx.probs = await get_layer_activations_and_predictions(
+        ctx.model, ctx.umap_loader, ctx.device
+    )
+    ctx.forget_labels = torch.tensor([
+        ctx.umap_subset.dataset.targets[i] == ctx.forget_class for i in ctx.selected_indices
+    ])
+    # A fixed embedding keeps the result stages independent of the UMAP stage
+    rng = np.random.default_rng(ctx.seed)
+    ctx.umap_embedding = rng.normal(size=(len(ctx.activations), 2)).astype(np.float32)
+
+    num_forget = sum(target == ctx.forget_class for target in ctx.train_set.targets)
+    ctx.attack_values = {
+        "unlearn_entropy": rng.uniform(0.0, 2.5, num_forget),
+        "retrain_entropy": rng.uniform(0.0, 2.5, num_forget),
+        "unlearn_confidence": rng.uniform(-2.5, 10.0, num_forget),
+        "retrain_confidence": rng.uniform(-2.5, 10.0, num_forget),
+    }
+
+
+async def bench_loader(ctx):
+    from app.utils.data_loader import get_data_loaders
+
+    train_loader, _, train_set, _ = get_data_loaders(batch_size=ctx.batch_size, augmentation=True)
+    for inputs, labels in train_loader:
+        inputs.to(ctx.device)
+        labels.to(ctx.device)
+    return len(train_set)
+
+
+async def bench_evaluate_model(ctx):
+    from app.utils.evaluation import evaluate_model
+
+    await evaluate_model(ctx.model, ctx.test_loader, ctx.criterion, ctx.device)
+    return len(ctx.test_set)
+
+
+async def bench_calculate_model_metrics(ctx):
+    from app.utils.attack_full_dataset import calculate_model_metrics
+
+    await calculate_model_metrics(ctx.model, ctx.train_loader, ctx.device, ctx.forget_class, 2.0, 1.0)
+    return len(ctx.train_set)
+
+
+def _attack_scores(ctx):
+    from app.utils.attack import CONFIDENCE_CONFIG, ENTROPY_CONFIG, calculate_scores
+
+    values = ctx.attack_values
+    return {
+        f"{mode}_above_{direction}": calculate_scores(
+            values[f"unlearn_{mode}"],
+            values[f"retrain_{mode}"],
+            config["bins"],
+            config["range"],
+            mode=mode,
+            direction=direction
+        )
+        for mode, config in (("entropy", ENTROPY_CONFIG), ("confidence", CONFIDENCE_CONFIG))
+        for direction in ("unlearn", "retrain")
+    }
+
+
+async def bench_calculate_scores(ctx):
+    _attack_scores(ctx)
+    return len(ctx.attack_values["unlearn_entropy"])
+
+
+async def bench_mia_training(ctx):
+    from app.utils.reference_cache import get_shadow_loaders
+    from app.utils.salun_mia import train_mia_classifier_once
+
+    shadow_train_loader, shadow_test_loader = get_shadow_loaders(ctx.forget_class)
+    await train_mia_classifier_once(
+        baseline_model=ctx.model,
+        shadow_train_loader=shadow_train_loader,
+        shadow_test_loader=shadow_test_loader,
+        device=ctx.device,
+        forget_class=ctx.forget_class
+    )
+    return len(shadow_train_loader.dataset) + len(shadow_test_loader.dataset)
+
+
+async def bench_cka(ctx):
+    from app.utils.evaluation import calculate_cka_similarity
+    from app.utils.reference_cache import get_cka_indices
+
+    await calculate_cka_similarity(ctx.model, ctx.forget_class, ctx.device)
+    return sum(
+        len(indices) for groups in get_cka_indices(ctx.forget_class).values() for indices in groups.values()
+    )
+
+
+async def bench_umap(ctx):
+    from app.utils.visualization import compute_umap_embedding
+
+    await compute_umap_embedding(
+        activation=ctx.activations,
+        labels=ctx.predicted_labels,
+        forget_class=ctx.forget_class,
+        forget_labels=ctx.forget_labels
+    )
+    return len(ctx.activations)
+
+
+def _detailed_results(ctx):
+    from app.utils.thread_operations import prepare_detailed_results
+
+    return prepare_detailed_results(
+        ctx.umap_subset, ctx.selected_indices, ctx.predicted_labels,
+        ctx.umap_embedding, ctx.probs, ctx.forget_class
+    )
+
+
+async def bench_prepare_detailed_results(ctx):
+    _detailed_results(ctx)
+    return len(ctx.umap_subset)
+
+
+async def bench_json_save(ctx):
+    from app.utils.point_columns import save_result_files
+
+    if not hasattr(ctx, "result"):
+        values = ctx.attack_values
+        ctx.result = {
+            "ID": "bench",
+            "FC": ctx.forget_class,
+            "Type": "Unlearned",
+            "Method": "Benchmark",
+            "points": _detailed_results(ctx),
+            "attack": {
+                "values": [
+                    {"img": i, "entropy": round(float(entropy), 2), "confidence": round(float(confidence), 2)}
+                    for i, (entropy, confidence) in enumerate(
+                        zip(values["unlearn_entropy"], values["unlearn_confidence"])
+                    )
+                ],
+                "results": _attack_scores(ctx),
+            },
+        }
+    os.makedirs(f"data/{ctx.forget_class}", exist_ok=True)
+    save_result_files(ctx.result, f"data/{ctx.forget_class}/bench.json")
+    return len(ctx.result["points"]["img"])
+
+
+STAGES = (
+    ("loader", bench_loader),
+    ("evaluate_model", bench_evaluate_model),
+    ("calculate_model_metrics", bench_calculate_model_metrics),
+    ("calculate_scores", bench_calculate_scores),
+    ("mia_training", bench_mia_training),
+    ("cka", bench_cka),
+    ("umap", bench_umap),
+    ("prepare_detailed_results", bench_prepare_detailed_results),
+    ("json_save", bench_json_save),
+)
+
+
+async def measure_stage(ctx, stage, repeat):
+    """Median, min and max wall time of `repeat` runs of a stage and its throughput."""
+    times = []
+    samples = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        samples = await stage(ctx)
+        _synchronize(ctx.device)
+        times.append(time.perf_counter() - start_time)
+    median = statistics.median(times)
+    result = {
+        "median_seconds": round(median, 4),
+        "min_seconds": round(min(times), 4),
+        "max_seconds": round(max(times), 4),
+    }
+    if samples:
+        result["samples"] = samples
+        result["samples_per_second"] = round(samples / median, 1) if median > 0 else None
+    return result
+
+
+async def measure_unlearning(ctx, method):
+    """Training stage and total time of a one-epoch job of an unlearning method."""
+    from app.models import UnlearningStatus
+    from app.routers.unlearn import HeadOnlyUnlearningRequest, UnlearningRequest
+    from app.utils.instrumentation import job_summary, job_timings
+
+    service = getattr(importlib.import_module(f"app.services.unlearn_{method}"), f"unlearning_{method}")
+    request_class = HeadOnlyUnlearningRequest if method == "head" else UnlearningRequest
+    request = request_class(
+        epochs=1,
+        batch_size=ctx.batch_size,
+        forget_class=ctx.forget_class,
+        base_weights=os.path.basename(ctx.base_path)
+    )
+    args = (request, UnlearningStatus()) if method == "retrain" else (request, UnlearningStatus(), ctx.base_path)
+
+    with job_timings(f"unlearning_{method}") as job:
+        await service(*args)
+    summary = job_summary(job)
+
+    # Services log a failed thread instead of raising, so check what was recorded
+    stage = next((name for name in UNLEARNING_STAGES if name in summary["stages"]), None)
+    if stage is None:
+        raise RuntimeError(f"{method} recorded no training stage (see its log above)")
+    entry = summary["stages"][stage]
+    result = {
+        "stage": stage,
+        "seconds": entry["seconds"],
+        "job_seconds": summary["total_seconds"],
+    }
+    if "samples" in entry:
+        result["samples"] = entry["samples"]
+        result["samples_per_second"] = entry.get("samples_per_second")
+    return result
+
+
+def _timings(results):
+    """Flat {name: seconds} of a run, the values compared with a baseline."""
+    timings = {
+        f"stages.{name}": result["median_seconds"]
+        for name, result in results.get("stages", {}).items() if "median_seconds" in result
+    }
+    timings.update({
+        f"unlearning.{method}": result["seconds"]
+        for method, result in results.get("unlearning", {}).items() if "seconds" in result
+    })
+    return timings
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Compare the timings of a run with a baseline run.
+
+    Returns:
+        Tuple of (comparison per timing present in both runs, names of the
+        timings slower than the baseline by more than `tolerance`)
+    """
+    current = _timings(results)
+    previous = _timings(baseline)
+    comparison = {}
+    regressions = []
+    for name, seconds in current.items():
+        if not previous.get(name):
+            continue
+        ratio = seconds / previous[name]
+        comparison[name] = {
+            "baseline_seconds": previous[name],
+            "seconds": seconds,
+            "ratio": round(ratio, 3),
+        }
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return comparison, regressions
+
+
+def _environment(ctx, args):
+    return {
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "device": str(ctx.device),
+        "device_name": torch.cuda.get_device_name(ctx.device) if ctx.device.type == "cuda" else None,
+        "train_size": args.train_size,
+        "test_size": args.test_size,
+        "batch_size": args.batch_size,
+        "forget_class": args.forget_class,
+        "repeat": args.repeat,
+    }
+
+
+async def run_benchmarks(args, stages, methods):
+    ctx = _Context()
+    ctx.forget_class = args.forget_class
+    ctx.batch_size = args.batch_size
+    ctx.seed = args.seed
+    ctx.device = _device()
+
+    results = {}
+    with synthetic_workspace(args.train_size, args.test_size, args.seed, args.workdir):
+        start_time = time.perf_counter()
+        await _prepare(ctx)
+        results["environment"] = _environment(ctx, args)
+        results["setup_seconds"] = round(time.perf_counter() - start_time, 3)
+
+        results["stages"] = {}
+        for name, stage in STAGES:
+            if name not in stages:
+                continue
+            print(f"Benchmark: {name}")
+            try:
+                results["stages"][name] = await measure_stage(ctx, stage, args.repeat)
+            except Exception as e:
+                results["stages"][name] = {"error": f"{type(e).__name__}: {e}"}
+
+        results["unlearning"] = {}
+        for method in methods:
+            print(f"Benchmark: one epoch of {method}")
+            try:
+                results["unlearning"][method] = await measure_unlearning(ctx, method)
+            except Exception as e:
+                results["unlearning"][method] = {"error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+def _names(value, known, kind):
+    names = [name for name in value.split(",") if name] if value is not None else list(known)
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise SystemExit(f"Unknown {kind}: {', '.join(unknown)} (choose from {', '.join(known)})")
+    return names
+
+
+def main():
+    stage_names = [name for name, _ in STAGES]
+    parser = argparse.ArgumentParser(description="Offline pipeline stage benchmark on synthetic CIFAR-10")
+    parser.add_argument('--stages', help=f"Comma-separated stages to time (default: all of {','.join(stage_names)})")
+    parser.add_argument('--methods', help="Comma-separated unlearning methods to run for one epoch (default: all, '' for none)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage; the median is reported")
+    parser.add_argument('--train-size', type=int, default=10000, help="Synthetic training images (CIFAR-10 has 50000)")
+    parser.add_argument('--test-size', type=int, default=2000, help="Synthetic test images (CIFAR-10 has 10000)")
+    parser.add_argument('--batch-size', type=int, default=128, help="Batch size of the training loaders and jobs")
+    parser.add_argument('--forget-class', type=int, default=4, help="Forget class of the benchmarked jobs")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic data and weights")
+    parser.add_argument('--workdir', help="Working directory to keep the generated files in (default: a temporary one)")
+    parser.add_argument('--output', help="Also write the results JSON to this file (e.g. a new baseline)")
+    parser.add_argument('--baseline', help="Results JSON of an earlier run to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed slowdown against the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    stages = _names(args.stages, stage_names, "stages")
+    methods = _names(args.methods, UNLEARNING_METHODS, "methods")
+    # Relative to the launch directory: the benchmark itself runs in the workspace
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    # The pipeline logs to stdout; keep it for the results JSON
+    with redirect_stdout(sys.stderr):
+        results = asyncio.run(run_benchmarks(args, stages, methods))
+
+    failures = [
+        f"{kind} {name} failed: {result['error']}"
+        for kind in ("stages", "unlearning")
+        for name, result in results[kind].items() if "error" in result
+    ]
+    if baseline is not None:
+        comparison, regressions = compare_with_baseline(results, baseline, args.tolerance)
+        results["baseline"] = {"path": args.baseline, "tolerance": args.tolerance, "comparison": comparison}
+        failures += [
+            f"{name} took {comparison[name]['seconds']:.3f}s, "
+            f"{comparison[name]['ratio']:.2f}x the baseline {comparison[name]['baseline_seconds']:.3f}s"
+            for name in regressions
+        ]
+
+    print(json.dumps(results, indent=2))
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Startup-time regression benchmark for the API process.
+
+Measures, each in a fresh interpreter:
+    import      wall time of `import main` (median over --repeat runs), and the
+                heavy modules it loaded: none of HEAVY_MODULES may be imported
+                before first use
+    ready       time from launching uvicorn until GET / answers
+    warm-up     the /startup report once the background warm-up has finished
+                (with --warmup)
+
+Exits with status 1 when the median import time exceeds --budget or a heavy
+module is imported at startup, so it can run as a CI or pre-deploy check.
+
+Usage (from the backend directory):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget 1.5 --repeat 10 --serve --warmup
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+HEAVY_MODULES = (
+    "torch",
+    "torchvision",
+    "umap",
+    "matplotlib",
+    "seaborn",
+    "sklearn",
+    "cka",
+    "huggingface_hub",
+    "app.services.train",
+    "app.threads",
+)
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def _backend_dir():
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(repeat):
+    """Median `import main` time over `repeat` fresh interpreters and the heavy modules loaded."""
+    times = []
+    heavy = set()
+    probe = _IMPORT_PROBE.format(heavy=HEAVY_MODULES)
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=_backend_dir(), capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["seconds"])
+        heavy.update(result["heavy"])
+    return {
+        "median_seconds": round(statistics.median(times), 3),
+        "min_seconds": round(min(times), 3),
+        "max_seconds": round(max(times), 3),
+        "heavy_modules": sorted(heavy),
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get_json(url, timeout=1.0):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def measure_serve(warmup=False, timeout=600.0):
+    """Seconds until a fresh uvicorn process answers GET /, and optionally the warm-up report."""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    start_time = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=_backend_dir(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        ready_seconds = None
+        while time.perf_counter() - start_time < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+            try:
+                _get_json(base_url + "/")
+                ready_seconds = time.perf_counter() - start_time
+                break
+            except OSError:
+                time.sleep(0.05)
+        if ready_seconds is None:
+            raise TimeoutError(f"API not ready after {timeout:.0f}s")
+
+        result = {"ready_seconds": round(ready_seconds, 3)}
+        if warmup:
+            report = _get_json(base_url + "/startup")
+            while not report["warmup_done"] and time.perf_counter() - start_time < timeout:
+                time.sleep(0.5)
+                report = _get_json(base_url + "/startup")
+            result["warmup_seconds"] = round(time.perf_counter() - start_time, 3)
+            result["report"] = report
+        return result
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API startup-time benchmark")
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters to time `import main` in")
+    parser.add_argument('--budget', type=float, default=2.0, help="Maximum median import time in seconds")
+    parser.add_argument('--serve', action='store_true', help="Also time a uvicorn process until GET / answers")
+    parser.add_argument('--warmup', action='store_true', help="With --serve, wait for the background warm-up and show its report")
+    args = parser.parse_args()
+
+    results = {"import": measure_import(args.repeat)}
+    if args.serve:
+        results["serve"] = measure_serve(warmup=args.warmup)
+    print(json.dumps(results, indent=2))
+
+    failures = []
+    if results["import"]["median_seconds"] > args.budget:
+        failures.append(
+            f"median import time {results['import']['median_seconds']:.3f}s exceeds the {args.budget:.3f}s budget"
+        )
+    if results["import"]["heavy_modules"]:
+        failures.append(f"heavy modules imported at startup: {', '.join(results['import']['heavy_modules'])}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
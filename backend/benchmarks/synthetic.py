@@ -0,0 +1,151 @@
+"""
+Synthetic CIFAR-10 data and checkpoints for offline benchmarks.
+
+synthetic_workspace() switches to a scratch directory (every data, model and
+result path of the app is relative to the working directory) and replaces
+torchvision's CIFAR10 with SyntheticCIFAR10, so get_data_loaders, the
+reference cache and the UMAP subset run unchanged on random CIFAR-shaped
+images, without network access or a downloaded dataset.
+write_reference_checkpoints and write_retrain_distribution then create what a
+forget class needs: random ResNet-18 weights as its base (000{fc}) and
+retrain (a00{fc}) checkpoints and the retrain attack distribution
+data/{fc}/a00{fc}.json.
+"""
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+from PIL import Image
+from torch.utils.data import Dataset
+
+NUM_CLASSES = 10
+
+# Images and labels of the train (True) and test (False) split of the workspace
+_arrays = {}
+
+
+def generate_cifar10(num_samples, seed=0):
+    """
+    Random CIFAR-shaped images with balanced labels: a random mean colour per
+    class plus uniform noise, so the classes are separable like real data.
+
+    Returns:
+        Tuple of (uint8 images of shape (N, 32, 32, 3), list of labels)
+    """
+    rng = np.random.default_rng(seed)
+    targets = rng.permutation(np.arange(num_samples) % NUM_CLASSES)
+    means = rng.integers(48, 208, size=(NUM_CLASSES, 1, 1, 3), dtype=np.int16)
+    data = rng.integers(-48, 49, size=(num_samples, 32, 32, 3), dtype=np.int16)
+    data += means[targets]
+    return np.clip(data, 0, 255).astype(np.uint8), targets.tolist()
+
+
+class SyntheticCIFAR10(Dataset):
+    """Drop-in for torchvision.datasets.CIFAR10 serving the workspace's synthetic split."""
+
+    def __init__(self, root=None, train=True, transform=None, target_transform=None, download=False):
+        if train not in _arrays:
+            raise RuntimeError("SyntheticCIFAR10 is only available inside synthetic_workspace()")
+        self.root = root
+        self.train = train
+        self.transform = transform
+        self.target_transform = target_transform
+        self.data, targets = _arrays[train]
+        self.targets = list(targets)
+
+    def __getitem__(self, index):
+        img, target = Image.fromarray(self.data[index]), self.targets[index]
+        if self.transform is not None:
+            img = self.transform(img)
+        if self.target_transform is not None:
+            target = self.target_transform(target)
+        return img, target
+
+    def __len__(self):
+        return len(self.data)
+
+
+@contextmanager
+def synthetic_workspace(train_size=10000, test_size=2000, seed=0, directory=None):
+    """
+    Run the app on synthetic CIFAR-10 in a scratch working directory.
+
+    Args:
+        train_size: Number of synthetic training images
+        test_size: Number of synthetic test images
+        seed: Seed of the generated images
+        directory: Working directory to use and keep; a temporary one that is
+            removed afterwards by default
+
+    Yields:
+        Path of the working directory
+    """
+    import torchvision
+
+    _arrays[True] = generate_cifar10(train_size, seed)
+    _arrays[False] = generate_cifar10(test_size, seed + 1)
+    scratch = directory or tempfile.mkdtemp(prefix="mu-benchmark-")
+    os.makedirs(scratch, exist_ok=True)
+    previous_dir = os.getcwd()
+    original_cifar10 = torchvision.datasets.CIFAR10
+    torchvision.datasets.CIFAR10 = SyntheticCIFAR10
+    os.chdir(scratch)
+    try:
+        yield scratch
+    finally:
+        os.chdir(previous_dir)
+        torchvision.datasets.CIFAR10 = original_cifar10
+        _arrays.clear()
+        if directory is None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def write_reference_checkpoints(forget_class, seed=0):
+    """
+    Save random ResNet-18 weights as the base and retrain checkpoints of a class.
+
+    Returns:
+        Tuple of (base checkpoint path, retrain checkpoint path)
+    """
+    import torch
+    from app.models import get_resnet18
+    from app.utils.helpers import save_model
+
+    torch.manual_seed(seed)
+    return tuple(
+        save_model(get_resnet18(), forget_class=forget_class, model_name=name)
+        for name in (f"000{forget_class}", f"a00{forget_class}")
+    )
+
+
+async def write_retrain_distribution(forget_class, device):
+    """
+    Write data/{fc}/a00{fc}.json with the attack values of the retrain
+    checkpoint over the forget class of the training set.
+
+    Returns:
+        Path of the written file
+    """
+    from torch.utils.data import DataLoader
+    from app.utils.attack_full_dataset import calculate_model_metrics
+    from app.utils.model_pool import borrow_eval_model
+    from app.utils.reference_cache import get_clean_datasets, retrain_checkpoint
+
+    train_set, _ = get_clean_datasets()
+    metrics = await calculate_model_metrics(
+        borrow_eval_model(retrain_checkpoint(forget_class), device),
+        DataLoader(train_set, batch_size=1000, shuffle=False),
+        device, forget_class, 2.0, 1.0
+    )
+    values = [
+        {"img": int(index), "entropy": round(float(entropy), 2), "confidence": round(float(confidence), 2)}
+        for index, entropy, confidence in zip(metrics["indices"], metrics["entropies"], metrics["confidences"])
+    ]
+    path = f"data/{forget_class}/a00{forget_class}.json"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"attack": {"values": values}}, f)
+    return path
@@ -1,15 +1,21 @@
+import time
+
+_import_start = time.perf_counter()
+
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import train, unlearn, data
-from app.utils.helpers import download_weights_from_hub
+from app.routers import train, unlearn, data, metrics
+from app.utils.startup import record_phase, start_warmup, startup_phase, startup_report
 
 # Constants
 ALLOW_ORIGINS = ["*"]  # TODO: Update URL after deployment
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    download_weights_from_hub()
+    # Heavy work (hub download, datasets, ML imports) runs in the background warm-up
+    with startup_phase("lifespan"):
+        start_warmup()
     yield
 
 def setup_middleware(app: FastAPI) -> None:
@@ -25,6 +31,7 @@ def register_routers(app: FastAPI) -> None:
     app.include_router(train.router)
     app.include_router(unlearn.router)
     app.include_router(data.router)
+    app.include_router(metrics.router)
 
 def create_app() -> FastAPI:
     app = FastAPI(lifespan=lifespan)
@@ -37,4 +44,11 @@ app = create_app()
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to the MU Dashboard API"}
\ No newline at end of file
+    return {"message": "Welcome to the MU Dashboard API"}
+
+@app.get("/startup")
+async def get_startup_report():
+    """Startup phase timings and whether the background warm-up has finished."""
+    return startup_report()
+
+record_phase("import", time.perf_counter() - _import_start)
@@ -13,8 +13,9 @@ import * as d3 from "d3";
 
 import Tooltip from "./Tooltip";
 import { calculateZoom } from "../../../utils/util";
+import { fetchCifar10Image } from "../../../utils/api/images";
 import { COLORS } from "../../../constants/colors";
-import { API_URL, ANIMATION_DURATION } from "../../../constants/common";
+import { ANIMATION_DURATION } from "../../../constants/common";
 import { VIEW_MODES } from "../../../constants/embeddings";
 import { useForgetClassStore } from "../../../stores/forgetClassStore";
 import { useModelDataStore } from "../../../stores/modelDataStore";
@@ -328,15 +329,15 @@ const ScatterPlot = forwardRef(
         fetchControllerRef.current = controller;
 
         try {
-          const response = await fetch(`${API_URL}/image/cifar10/${d[2]}`, {
-            signal: controller.signal,
-          });
-
-          if (!response.ok) throw new Error("Failed to fetch image");
-          if (controller.signal.aborted) return;
+          const imageUrl = await fetchCifar10Image(
+            d[2] as number,
+            controller.signal
+          );
 
-          const blob = await response.blob();
-          const imageUrl = URL.createObjectURL(blob);
+          if (controller.signal.aborted) {
+            URL.revokeObjectURL(imageUrl);
+            return;
+          }
 
           const currentHoveredInstance = hoveredInstanceRef.current;
 
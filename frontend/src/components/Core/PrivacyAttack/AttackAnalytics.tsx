@@ -4,12 +4,12 @@ import { createRoot } from "react-dom/client";
 import AttackPlot from "./AttackPlot";
 import AttackSuccessFailure from "./AttackSuccessFailure";
 import Tooltip from "./Tooltip";
-import { API_URL } from "../../../constants/common";
 import { useForgetClassStore } from "../../../stores/forgetClassStore";
 import { useAttackStateStore } from "../../../stores/attackStore";
 import { THRESHOLD_STRATEGIES } from "../../../constants/privacyAttack";
 import { Prob } from "../../../types/embeddings";
 import { fetchAllSubsetImages } from "../../../utils/api/attackSimulations";
+import { fetchCifar10Image } from "../../../utils/api/images";
 import { calculateZoom } from "../../../utils/util";
 import { useModelDataStore } from "../../../stores/modelDataStore";
 import { useThresholdStore } from "../../../stores/thresholdStore";
@@ -174,18 +174,15 @@ export default function AttackAnalytics({
       fetchControllerRef.current = controller;
 
       try {
-        const response = await fetch(
-          `${API_URL}/image/cifar10/${elementData.img_idx}`,
-          {
-            signal: controller.signal,
-          }
+        const imageUrl = await fetchCifar10Image(
+          elementData.img_idx,
+          controller.signal
         );
 
-        if (!response.ok) throw new Error("Failed to fetch tooltip data");
-        if (controller.signal.aborted) return;
-
-        const blob = await response.blob();
-        const imageUrl = URL.createObjectURL(blob);
+        if (controller.signal.aborted) {
+          URL.revokeObjectURL(imageUrl);
+          return;
+        }
 
         const retrainedPoint = retrainPoints.find((point) => {
           return point[2] === elementData.img_idx;
@@ -15,7 +15,7 @@ export default function CustomUnlearning({ fileName, ...props }: Props) {
         <Input
           type="file"
           name="custom_file"
-          accept=".pth"
+          accept=".pth,.safetensors"
           className="h-[25px] py-0.5 px-[7px] opacity-0 absolute inset-0"
           {...props}
         />
@@ -0,0 +1,94 @@
+import { API_URL } from "../../constants/common";
+
+type AtlasMap = {
+  version: string;
+  tile_size: number;
+  columns: number;
+  sheets: Record<string, { count: number; width: number; height: number }>;
+  offsets: Record<string, [number, number, number]>;
+};
+
+let atlasMapPromise: Promise<AtlasMap> | null = null;
+const sheetPromises = new Map<number, Promise<ImageBitmap>>();
+
+function fetchAtlasMap() {
+  if (!atlasMapPromise) {
+    atlasMapPromise = fetch(`${API_URL}/image/cifar10/atlas`).then(
+      (response) => {
+        if (!response.ok) {
+          throw new Error(
+            `Status Code: ${response.status}, Message: ${response.statusText}`
+          );
+        }
+        return response.json();
+      }
+    );
+    atlasMapPromise.catch(() => {
+      atlasMapPromise = null;
+    });
+  }
+  return atlasMapPromise;
+}
+
+function fetchAtlasSheet(classId: number, version: string) {
+  let sheetPromise = sheetPromises.get(classId);
+  if (!sheetPromise) {
+    sheetPromise = fetch(
+      `${API_URL}/image/cifar10/atlas/${classId}?v=${version}`
+    )
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(
+            `Status Code: ${response.status}, Message: ${response.statusText}`
+          );
+        }
+        return response.blob();
+      })
+      .then((blob) => createImageBitmap(blob));
+    sheetPromise.catch(() => {
+      sheetPromises.delete(classId);
+    });
+    sheetPromises.set(classId, sheetPromise);
+  }
+  return sheetPromise;
+}
+
+async function cropAtlasTile(index: number) {
+  const atlas = await fetchAtlasMap();
+  const offset = atlas.offsets[index];
+  if (!offset) return null;
+
+  const [classId, x, y] = offset;
+  const size = atlas.tile_size;
+  const sheet = await fetchAtlasSheet(classId, atlas.version);
+
+  const canvas = document.createElement("canvas");
+  canvas.width = size;
+  canvas.height = size;
+  canvas.getContext("2d")?.drawImage(sheet, x, y, size, size, 0, 0, size, size);
+
+  const blob = await new Promise<Blob | null>((resolve) =>
+    canvas.toBlob(resolve, "image/png")
+  );
+  return blob ? URL.createObjectURL(blob) : null;
+}
+
+// Object URL of a CIFAR-10 training image. Images of the UMAP subset are cut
+// from the per-class sprite sheets, which are fetched once and then cached.
+export async function fetchCifar10Image(index: number, signal?: AbortSignal) {
+  try {
+    const imageUrl = await cropAtlasTile(index);
+    if (imageUrl) return imageUrl;
+  } catch (error) {
+    console.error("Failed to read the image atlas:", error);
+  }
+
+  const response = await fetch(`${API_URL}/image/cifar10/${index}`, {
+    signal,
+  });
+
+  if (!response.ok) throw new Error("Failed to fetch image");
+
+  const blob = await response.blob();
+  return URL.createObjectURL(blob);
+}